@@ -1,42 +1,66 @@
 from schemas import FAQOutput, ProductPageOutput, ComparisonOutput
-from utils import load_json_file, save_json_file, logger
+from template_registry import TemplateRegistry
+from output_sink import FileSink
+from utils import logger
+
+FAQ_FIELDS = {"faqs": ("questions",)}
+PRODUCT_FIELDS = {
+    "name": ("model", "name"),
+    "highlights": ("blocks", "benefits"),
+    "usage_block": ("blocks", "usage_block"),
+    "ingredient_block": ("blocks", "ingredients_block"),
+    "pricing": ("blocks", "price_block")
+}
+COMPARISON_FIELDS = {
+    "product_a": ("product_a",),
+    "product_b": ("product_b",),
+    "comparison": ("comparison",)
+}
 
 class AssemblyAgent:
-    def assemble_faq(self, questions, template_path, output_path):
+    def __init__(self, registry=None, sink=None):
+        self.registry = registry or TemplateRegistry()
+        self.sink = sink or FileSink()
+    
+    def build_faq(self, questions, template_path):
         try:
-            template = load_json_file(template_path)
-            template["faqs"] = questions
-            faq_output = FAQOutput(**template)
-            save_json_file(faq_output.dict(), output_path)
+            faq_output = self.registry.assemble(template_path, FAQ_FIELDS, FAQOutput, {"questions": questions})
             logger.info("FAQ assembled successfully")
+            return faq_output
         except Exception as e:
             logger.error(f"FAQ assembly failed: {e}")
             raise
-
-    def assemble_product(self, model, blocks, template_path, output_path):
+    
+    def build_product(self, model, blocks, template_path):
         try:
-            template = load_json_file(template_path)
-            template["name"] = model["name"]
-            template["highlights"] = blocks["benefits"]
-            template["usage_block"] = blocks["usage_block"]
-            template["ingredient_block"] = blocks["ingredients_block"]
-            template["pricing"] = blocks["price_block"]
-            product_output = ProductPageOutput(**template)
-            save_json_file(product_output.dict(), output_path)
+            product_output = self.registry.assemble(
+                template_path, PRODUCT_FIELDS, ProductPageOutput, {"model": model, "blocks": blocks}
+            )
             logger.info("Product page assembled successfully")
+            return product_output
         except Exception as e:
             logger.error(f"Product page assembly failed: {e}")
             raise
-
-    def assemble_comparison(self, product_a, product_b, comparison, template_path, output_path):
+    
+    def build_comparison(self, product_a, product_b, comparison, template_path):
         try:
-            template = load_json_file(template_path)
-            template["product_a"] = product_a
-            template["product_b"] = product_b
-            template["comparison"] = comparison
-            comparison_output = ComparisonOutput(**template)
-            save_json_file(comparison_output.dict(), output_path)
+            comparison_output = self.registry.assemble(
+                template_path,
+                COMPARISON_FIELDS,
+                ComparisonOutput,
+                {"product_a": product_a, "product_b": product_b, "comparison": comparison}
+            )
             logger.info("Comparison page assembled successfully")
+            return comparison_output
         except Exception as e:
             logger.error(f"Comparison page assembly failed: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def assemble_faq(self, questions, template_path, output_path):
+        self.sink.write(output_path, self.build_faq(questions, template_path))
+    
+    def assemble_product(self, model, blocks, template_path, output_path):
+        self.sink.write(output_path, self.build_product(model, blocks, template_path))
+    
+    def assemble_comparison(self, product_a, product_b, comparison, template_path, output_path):
+        self.sink.write(output_path, self.build_comparison(product_a, product_b, comparison, template_path))
\ No newline at end of file
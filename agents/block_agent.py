@@ -1,48 +1,113 @@
-import json
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from schemas import ContentBlocks, PriceBlock
-from utils import parse_json_with_retry, logger
-import time
+from schemas import ContentBlocks
+from utils import logger
+from config import Config
+from json_extract import extract_json
+from prompting import PromptRenderer, estimate_tokens
+from metrics import metrics
+from retry_policy import RetryPolicy
+from logic.deterministic import build_content_blocks
+from batch_prompting import BatchPrompter
+
+USAGE_FIELDS = ["name", "concentration", "skin_type", "usage"]
+USAGE_TOKENS = 60
 
 class BlockAgent:
-    def __init__(self, llm, max_retries=3):
+    def __init__(self, llm, max_retries=3, retry_policy=None, usage_llm=None):
         self.llm = llm
         self.max_retries = max_retries
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
+        self.usage_llm = Config.BLOCK_USAGE_LLM if usage_llm is None else usage_llm
         self.prompt = PromptTemplate(
-            input_variables=["product"],
+            input_variables=["product", "feedback"],
             template="""Create content blocks for this product.
 
 Product: {product}
 
-Generate these blocks:
-1. benefits: Array of benefit strings
-2. usage_block: Single usage instruction string
-3. ingredients_block: Array of ingredient strings
-4. price_block: Object with price (number) and currency (always "INR")
+Write usage_block: a single clear usage instruction string based on the product's usage.
 
-Return ONLY a JSON object with these exact keys: benefits, usage_block, ingredients_block, price_block.
-No markdown, no explanations, only JSON."""
+Return ONLY a JSON object with this exact key: usage_block.
+No markdown, no explanations, only JSON.
+{feedback}"""
         )
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        self.renderer = PromptRenderer(self.prompt, "BlockAgent")
+        self.batch_prompt = PromptTemplate(
+            input_variables=["products", "feedback"],
+            template="""Create content blocks for each of the following products.
+
+Products: {products}
+
+For every product write usage_block: a single clear usage instruction string based on that product's usage.
+
+Return ONLY a JSON object keyed by product id, where each value is an object with this exact key: usage_block.
+No markdown, no explanations, only JSON.
+{feedback}"""
+        )
+        self.batch_chain = LLMChain(llm=self.llm, prompt=self.batch_prompt)
+        self.batch_renderer = PromptRenderer(self.batch_prompt, "BlockAgent")
     
     def execute(self, product):
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"BlockAgent attempt {attempt + 1}")
-                product_str = json.dumps(product, indent=2)
-                result = self.chain.run(product=product_str)
-                
-                parsed = parse_json_with_retry(result)
-                
-                blocks = ContentBlocks(**parsed)
-                logger.info("Content blocks created and validated successfully")
-                return blocks.dict()
-                
-            except Exception as e:
-                logger.error(f"BlockAgent attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
-                    raise
-                time.sleep(2)
+        blocks = build_content_blocks(product)
+        if self.usage_llm:
+            blocks["usage_block"] = self.usage_block(product)
+        
+        content_blocks = ContentBlocks(**blocks)
+        logger.info("Content blocks created and validated successfully")
+        return content_blocks.dict()
+    
+    def usage_block(self, product, feedback=""):
+        return self.retry_policy.call(
+            lambda state: self.attempt(product, "\n".join(filter(None, [feedback, state.feedback]))),
+            "BlockAgent"
+        )
+    
+    def execute_batch(self, products, batch_size=None):
+        if not self.usage_llm:
+            return {product_id: self.execute(product) for product_id, product in products.items()}
+        
+        def validate(product, response):
+            blocks = build_content_blocks(product)
+            blocks["usage_block"] = self.read_usage_block(response)
+            return ContentBlocks(**blocks).dict()
+        
+        prompter = BatchPrompter(
+            "BlockAgent",
+            self.batch_attempt,
+            validate,
+            USAGE_TOKENS,
+            self.retry_policy,
+            max_size=batch_size
+        )
+        return prompter.run(products)
+    
+    def batch_attempt(self, products, feedback=""):
+        payload = {
+            product_id: {field: product.get(field) for field in USAGE_FIELDS}
+            for product_id, product in products.items()
+        }
+        variables = self.batch_renderer.render("products", payload, feedback=feedback)
+        with metrics.timer("llm_call_seconds", agent="BlockAgent"):
+            result = self.batch_chain.run(**variables)
+        metrics.observe("llm_completion_tokens", estimate_tokens(result), agent="BlockAgent")
+        
+        parsed = extract_json(result)
+        if not isinstance(parsed, dict):
+            raise ValueError("Batched response must be a JSON object keyed by product id")
+        return parsed
+    
+    def read_usage_block(self, response):
+        usage_block = response.get("usage_block") if isinstance(response, dict) else None
+        if not isinstance(usage_block, str) or not usage_block.strip():
+            raise ValueError("Response is missing a usage_block string")
+        return usage_block.strip()
+    
+    def attempt(self, product, feedback=""):
+        payload = {field: product.get(field) for field in USAGE_FIELDS}
+        variables = self.renderer.render("product", payload, feedback=feedback)
+        with metrics.timer("llm_call_seconds", agent="BlockAgent"):
+            result = self.chain.run(**variables)
+        metrics.observe("llm_completion_tokens", estimate_tokens(result), agent="BlockAgent")
         
-        raise RuntimeError("BlockAgent failed after all retries")
\ No newline at end of file
+        return self.read_usage_block(extract_json(result))
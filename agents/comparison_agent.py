@@ -1,21 +1,25 @@
-import json
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 from schemas import Product, Comparison
-from utils import parse_json_with_retry, logger
+from utils import logger
+from json_extract import extract_json
+from prompting import PromptRenderer, estimate_tokens
+from metrics import metrics
 from logic.deterministic import (
     calculate_price_difference,
     compare_concentrations,
     determine_better_for_skin_type
 )
-import time
+from retry_policy import RetryPolicy
 
 class ComparisonAgent:
-    def __init__(self, llm, max_retries=3):
+    def __init__(self, llm, max_retries=3, retry_policy=None, pool=None):
         self.llm = llm
         self.max_retries = max_retries
+        self.pool = pool
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
         self.prompt = PromptTemplate(
-            input_variables=["product_a"],
+            input_variables=["product_a", "feedback"],
             template="""Create a fictional competing product for comparison.
 
 Real Product A: {product_a}
@@ -34,56 +38,64 @@ Return ONLY a JSON object with this exact structure:
   "price": number
 }}
 
-No markdown, no explanations, only JSON."""
+No markdown, no explanations, only JSON.
+{feedback}"""
         )
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        self.renderer = PromptRenderer(self.prompt, "ComparisonAgent")
     
-    def execute(self, product_a):
-        for attempt in range(self.max_retries):
+    def execute(self, product_a, exclude=(), feedback=""):
+        product_b = self.pool.find(product_a, exclude) if self.pool is not None else None
+        if product_b is not None:
+            logger.info(f"Reusing pooled competitor {product_b['name']}")
+        else:
+            product_b = self.retry_policy.call(
+                lambda state: self.attempt(product_a, "\n".join(filter(None, [feedback, state.feedback]))),
+                "ComparisonAgent"
+            )
+            if self.pool is not None and self.pool.is_usable(product_a, product_b):
+                self.pool.add(product_a, product_b)
+        
+        comparison = self.compare(product_a, product_b)
+        logger.info("Comparison generated and validated successfully")
+        return product_b, comparison
+    
+    def attempt(self, product_a, feedback=""):
+        variables = self.renderer.render("product_a", product_a, feedback=feedback)
+        with metrics.timer("llm_call_seconds", agent="ComparisonAgent"):
+            result = self.chain.run(**variables)
+        metrics.observe("llm_completion_tokens", estimate_tokens(result), agent="ComparisonAgent")
+        
+        parsed = extract_json(result)
+        
+        if isinstance(parsed.get("price"), str):
             try:
-                logger.info(f"ComparisonAgent attempt {attempt + 1}")
-                product_str = json.dumps(product_a, indent=2)
-                result = self.chain.run(product_a=product_str)
-                
-                parsed = parse_json_with_retry(result)
-                
-                if isinstance(parsed.get("price"), str):
-                    try:
-                        parsed["price"] = int(parsed["price"])
-                    except ValueError:
-                        raise ValueError(f"Invalid price format in product B")
-                
-                product_b = Product(**parsed)
-                
-                price_diff = calculate_price_difference(product_a["price"], product_b.price)
-                
-                concentration_result = compare_concentrations(
-                    product_a.get("concentration", "0%"),
-                    product_b.concentration
-                )
-                
-                if concentration_result == "a":
-                    stronger = product_a["name"]
-                elif concentration_result == "b":
-                    stronger = product_b.name
-                else:
-                    stronger = ""
-                
-                better_oily = determine_better_for_skin_type(product_a, product_b.dict(), "Oily")
-                
-                comparison = Comparison(
-                    stronger_formulation=stronger,
-                    price_difference=price_diff,
-                    better_for_oily_skin=better_oily
-                )
-                
-                logger.info("Comparison generated and validated successfully")
-                return product_b.dict(), comparison.dict()
-                
-            except Exception as e:
-                logger.error(f"ComparisonAgent attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
-                    raise
-                time.sleep(2)
+                parsed["price"] = int(parsed["price"])
+            except ValueError:
+                raise ValueError(f"Invalid price format in product B")
+        
+        return Product(**parsed).dict()
+    
+    def compare(self, product_a, product_b):
+        price_diff = calculate_price_difference(product_a["price"], product_b["price"])
         
-        raise RuntimeError("ComparisonAgent failed after all retries")
\ No newline at end of file
+        concentration_result = compare_concentrations(
+            product_a.get("concentration", "0%"),
+            product_b["concentration"]
+        )
+        
+        if concentration_result == "a":
+            stronger = product_a["name"]
+        elif concentration_result == "b":
+            stronger = product_b["name"]
+        else:
+            stronger = ""
+        
+        better_oily = determine_better_for_skin_type(product_a, product_b, "Oily")
+        
+        comparison = Comparison(
+            stronger_formulation=stronger,
+            price_difference=price_diff,
+            better_for_oily_skin=better_oily
+        )
+        return comparison.dict()
@@ -1,12 +1,22 @@
-import json
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from schemas import Product
+from utils import logger
+from config import Config
+from prompting import PromptRenderer, estimate_tokens
+from metrics import metrics
+from json_extract import extract_json
+from retry_policy import RetryPolicy
+from logic.deterministic import normalize_product
 
 class ProductParserAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, max_retries=3, retry_policy=None, fast_path=None):
         self.llm = llm
+        self.max_retries = max_retries
+        self.fast_path = Config.PARSER_FAST_PATH if fast_path is None else fast_path
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
         self.prompt = PromptTemplate(
-            input_variables=["product_json"],
+            input_variables=["product_json", "feedback"],
             template="""Parse and normalize the following product JSON data.
 Extract all fields and convert them to a clean structured format.
 Ensure price is an integer.
@@ -15,26 +25,41 @@ Product JSON:
 {product_json}
 
 Return ONLY a valid JSON object with these exact keys: name, concentration, skin_type, ingredients, benefits, usage, side_effects, price.
-No markdown, no explanations, only JSON."""
+No markdown, no explanations, only JSON.
+{feedback}"""
         )
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        self.renderer = PromptRenderer(self.prompt, "ProductParserAgent", trimmable_fields=())
+    
+    def normalize(self, raw_product):
+        try:
+            return Product(**normalize_product(raw_product)).dict()
+        except (TypeError, ValueError) as e:
+            logger.info(f"Deterministic normalization failed: {e}")
+            return None
     
     def execute(self, raw_product):
-        product_str = json.dumps(raw_product)
-        result = self.chain.run(product_json=product_str)
-        
-        cleaned = result.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
+        if self.fast_path:
+            product = self.normalize(raw_product)
+            metrics.increment("parser_fast_path_total", result="miss" if product is None else "hit")
+            if product is not None:
+                logger.info("Product normalized deterministically, skipping LLM parse")
+                return product
+            logger.info("Falling back to LLM parser")
+        return self.retry_policy.call(
+            lambda state: self.attempt(raw_product, state.feedback),
+            "ProductParserAgent"
+        )
+    
+    def attempt(self, raw_product, feedback=""):
+        variables = self.renderer.render("product_json", raw_product, feedback=feedback)
+        with metrics.timer("llm_call_seconds", agent="ProductParserAgent"):
+            result = self.chain.run(**variables)
+        metrics.observe("llm_completion_tokens", estimate_tokens(result), agent="ProductParserAgent")
         
-        parsed = json.loads(cleaned)
+        parsed = extract_json(result)
         
         if isinstance(parsed["price"], str):
             parsed["price"] = int(parsed["price"])
         
-        return parsed
\ No newline at end of file
+        return parsed
@@ -1,43 +1,198 @@
 import json
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from schemas import Question
+from utils import logger
+from prompting import PromptRenderer, estimate_tokens
+from metrics import metrics
+from json_extract import extract_json, StreamingArrayParser
+from retry_policy import RetryPolicy
+from batch_prompting import BatchPrompter
+from errors import RecoverableError
+from llm_cache import store_response, uncached
+
+QUESTION_TOKENS = 60
 
 class QuestionAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, max_retries=3, retry_policy=None):
         self.llm = llm
+        self.max_retries = max_retries
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
         self.prompt = PromptTemplate(
-            input_variables=["product"],
-            template="""Based on this product data, generate exactly 15 frequently asked questions with answers.
+            input_variables=["product", "count", "exclusions", "feedback"],
+            template="""Based on this product data, generate exactly {count} frequently asked questions with answers.
 
 Product: {product}
 
 Categories must be one of: informational, usage, safety, purchase
 
 Each question should be practical and directly answerable from the product data.
-
+{exclusions}
 Return ONLY a JSON array with this exact structure:
 [
   {{"question": "...", "answer": "...", "category": "..."}},
   ...
 ]
 
-No markdown, no explanations, only the JSON array with exactly 15 items."""
+No markdown, no explanations, only the JSON array with exactly {count} items.
+{feedback}"""
         )
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        self.fresh_chain = LLMChain(llm=uncached(self.llm), prompt=self.prompt)
+        self.renderer = PromptRenderer(self.prompt, "QuestionAgent")
+        self.batch_prompt = PromptTemplate(
+            input_variables=["products", "count", "feedback"],
+            template="""Based on this product data, generate exactly {count} frequently asked questions with answers for each of the following products.
+
+Products: {products}
+
+Categories must be one of: informational, usage, safety, purchase
+
+Each question should be practical and directly answerable from that product's data.
+
+Return ONLY a JSON object keyed by product id, where each value is a JSON array with this exact structure:
+{{
+  "<product id>": [
+    {{"question": "...", "answer": "...", "category": "..."}},
+    ...
+  ],
+  ...
+}}
+
+No markdown, no explanations, only the JSON object with exactly {count} items for every product id.
+{feedback}"""
+        )
+        self.batch_chain = LLMChain(llm=self.llm, prompt=self.batch_prompt)
+        self.batch_renderer = PromptRenderer(self.batch_prompt, "QuestionAgent")
     
-    def execute(self, product):
-        product_str = json.dumps(product, indent=2)
-        result = self.chain.run(product=product_str)
+    def format_exclusions(self, exclude):
+        if not exclude:
+            return ""
+        existing = "\n".join(f"- {question}" for question in exclude)
+        return f"\nThese questions are already answered. Do not repeat or rephrase any of them:\n{existing}\n"
+    
+    def execute(self, product, count=15, exclude=None, fresh=False):
+        questions = self.request(product, count, exclude, fresh)
+        for _ in range(self.max_retries):
+            missing = count - len(questions)
+            if missing <= 0:
+                break
+            logger.warning(f"QuestionAgent got {len(questions)} of {count} questions, requesting {missing} more")
+            metrics.increment("question_top_ups_total", agent="QuestionAgent")
+            answered = list(exclude or []) + [q.get("question", "") for q in questions]
+            questions = questions + self.request(product, missing, answered, fresh)[:missing]
         
-        cleaned = result.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
+        if len(questions) < count:
+            raise RecoverableError(f"QuestionAgent got {len(questions)} of {count} questions after top-ups", accepted=questions)
+        return questions[:count]
+    
+    def request(self, product, count, exclude, fresh=False):
+        return self.retry_policy.call(
+            lambda state: self.attempt(product, count, exclude, state.feedback, fresh),
+            "QuestionAgent"
+        )
+    
+    def attempt(self, product, count, exclude, feedback="", fresh=False):
+        logger.info(f"QuestionAgent requesting {count} questions")
+        variables = self.renderer.render(
+            "product",
+            product,
+            count=count,
+            exclusions=self.format_exclusions(exclude),
+            feedback=feedback
+        )
+        with metrics.timer("llm_call_seconds", agent="QuestionAgent"):
+            result = (self.fresh_chain if fresh else self.chain).run(**variables)
+        metrics.observe("llm_completion_tokens", estimate_tokens(result), agent="QuestionAgent")
+        
+        questions = extract_json(result)
+        if not isinstance(questions, list):
+            raise ValueError(f"Expected a JSON array of questions, got {type(questions).__name__}")
+        
+        items = [q for q in questions if isinstance(q, dict)]
+        if len(items) < len(questions):
+            logger.warning(f"QuestionAgent dropped {len(questions) - len(items)} items that are not objects")
+        return items
+    
+    def remember(self, product, questions):
+        variables, _, _ = self.renderer.fit("product", product, count=len(questions), exclusions="", feedback="")
+        if store_response(self.llm, self.prompt.format(**variables), json.dumps(questions)):
+            logger.info("QuestionAgent replaced the cached reply with the accepted questions")
+    
+    def execute_batch(self, products, count=15, batch_size=None):
+        def validate(product, questions):
+            if not isinstance(questions, list) or len(questions) != count:
+                raise ValueError(f"Expected {count} questions, got {len(questions) if isinstance(questions, list) else type(questions).__name__}")
+            return [Question(**q).dict() for q in questions]
         
-        questions = json.loads(cleaned)
+        prompter = BatchPrompter(
+            "QuestionAgent",
+            lambda payload, feedback: self.batch_attempt(payload, count, feedback),
+            validate,
+            count * QUESTION_TOKENS,
+            self.retry_policy,
+            max_size=batch_size
+        )
+        return prompter.run(products)
+    
+    def batch_attempt(self, products, count, feedback=""):
+        logger.info(f"QuestionAgent requesting {count} questions for each of {len(products)} products")
+        variables = self.batch_renderer.render("products", products, count=count, feedback=feedback)
+        with metrics.timer("llm_call_seconds", agent="QuestionAgent"):
+            result = self.batch_chain.run(**variables)
+        metrics.observe("llm_completion_tokens", estimate_tokens(result), agent="QuestionAgent")
+        
+        parsed = extract_json(result)
+        if not isinstance(parsed, dict):
+            raise ValueError("Batched response must be a JSON object keyed by product id")
+        return parsed
+    
+    def stream(self, product, count=15, exclude=None, check=None):
+        accepted = []
+        rejected = []
+        for _ in range(self.max_retries):
+            missing = count - len(accepted)
+            if missing <= 0:
+                break
+            answered = list(exclude or []) + [q["question"] for q in accepted] + rejected
+            self.retry_policy.call(
+                lambda state: self.stream_attempt(product, missing, answered, check, accepted, rejected, state.feedback),
+                "QuestionAgent"
+            )
+        return accepted[:count]
+    
+    def stream_attempt(self, product, count, exclude, check, accepted, rejected, feedback=""):
+        logger.info(f"QuestionAgent streaming {count} questions")
+        variables = self.renderer.render(
+            "product",
+            product,
+            count=count,
+            exclusions=self.format_exclusions(exclude),
+            feedback=feedback
+        )
+        target = len(accepted) + count
+        parser = StreamingArrayParser()
+        received = []
+        stream = self.llm.stream(self.prompt.format(**variables))
+        try:
+            with metrics.timer("llm_call_seconds", agent="QuestionAgent"):
+                for chunk in stream:
+                    text = chunk.content if hasattr(chunk, "content") else str(chunk)
+                    received.append(text)
+                    for item in parser.feed(text):
+                        reason = check(item) if check else None
+                        if reason:
+                            if isinstance(item, dict) and isinstance(item.get("question"), str):
+                                rejected.append(item["question"])
+                            logger.warning(f"Streamed question rejected ({reason}), aborting stream with {len(accepted)} accepted")
+                            metrics.increment("faq_stream_rejections_total", agent="QuestionAgent", reason=reason)
+                            return
+                        accepted.append(item)
+                        if len(accepted) >= target:
+                            return
+        finally:
+            stream.close()
+            metrics.observe("llm_completion_tokens", estimate_tokens("".join(received)), agent="QuestionAgent")
         
-        return questions
\ No newline at end of file
+        if not parser.started:
+            raise json.JSONDecodeError("No JSON array in streamed response", "".join(received), 0)
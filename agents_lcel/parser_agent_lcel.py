@@ -1,16 +1,17 @@
-import json
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
-from langchain_core.runnables import RunnablePassthrough
 from schemas import Product
 from utils import logger
-import time
+from prompting import PromptRenderer, estimate_tokens, get_format_instructions
+from metrics import metrics
+from json_extract import extract_json
+from retry_policy import RetryPolicy
 
 class ProductParserAgentLCEL:
-    def __init__(self, llm, max_retries=3):
+    def __init__(self, llm, max_retries=3, retry_policy=None):
         self.llm = llm
         self.max_retries = max_retries
-        self.parser = PydanticOutputParser(pydantic_object=Product)
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
+        self.format_instructions = get_format_instructions(Product)
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", "You are a product data parser. Parse the input and return valid JSON."),
@@ -20,50 +21,40 @@ Product: {product_json}
 
 {format_instructions}
 
-Return only valid JSON matching the schema.""")
+Return only valid JSON matching the schema.
+{feedback}""")
         ])
         
-        self.chain = (
-            {"product_json": RunnablePassthrough(), 
-             "format_instructions": lambda x: self.parser.get_format_instructions()}
-            | self.prompt
-            | self.llm
-        )
+        self.chain = self.prompt | self.llm
+        self.renderer = PromptRenderer(self.prompt, "ProductParserAgentLCEL", trimmable_fields=())
     
     def execute(self, raw_product):
-        for attempt in range(self.max_retries):
+        return self.retry_policy.call(
+            lambda state: self.attempt(raw_product, state.feedback),
+            "ProductParserAgentLCEL"
+        )
+    
+    def attempt(self, raw_product, feedback=""):
+        variables = self.renderer.render(
+            "product_json",
+            raw_product,
+            format_instructions=self.format_instructions,
+            feedback=feedback
+        )
+        with metrics.timer("llm_call_seconds", agent="ProductParserAgentLCEL"):
+            result = self.chain.invoke(variables)
+        
+        content = result.content if hasattr(result, 'content') else str(result)
+        metrics.observe("llm_completion_tokens", estimate_tokens(content), agent="ProductParserAgentLCEL")
+        
+        parsed = extract_json(content)
+        
+        if isinstance(parsed.get("price"), str):
             try:
-                logger.info(f"ProductParserAgentLCEL attempt {attempt + 1}")
-                product_str = json.dumps(raw_product)
-                result = self.chain.invoke(product_str)
-                
-                content = result.content if hasattr(result, 'content') else str(result)
-                
-                cleaned = content.strip()
-                if cleaned.startswith("```json"):
-                    cleaned = cleaned[7:]
-                if cleaned.startswith("```"):
-                    cleaned = cleaned[3:]
-                if cleaned.endswith("```"):
-                    cleaned = cleaned[:-3]
-                cleaned = cleaned.strip()
-                
-                parsed = json.loads(cleaned)
-                
-                if isinstance(parsed.get("price"), str):
-                    try:
-                        parsed["price"] = int(parsed["price"])
-                    except ValueError:
-                        raise ValueError(f"Invalid price format: {parsed.get('price')}")
-                
-                product = Product(**parsed)
-                logger.info("Product parsed with LCEL successfully")
-                return product.dict()
-                
-            except Exception as e:
-                logger.error(f"ProductParserAgentLCEL attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
-                    raise
-                time.sleep(2)
+                parsed["price"] = int(parsed["price"])
+            except ValueError:
+                raise ValueError(f"Invalid price format: {parsed.get('price')}")
         
-        raise RuntimeError("ProductParserAgentLCEL failed after all retries")
\ No newline at end of file
+        product = Product(**parsed)
+        logger.info("Product parsed with LCEL successfully")
+        return product.dict()
@@ -0,0 +1,187 @@
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from orchestrator import PipelineOrchestrator, NonRecoverableError
+from config import Config
+from metrics import metrics
+from output_sink import open_sink
+from utils import load_json_file, save_json_file, logger
+
+def slugify(value: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '-', str(value).lower()).strip('-')
+    return slug or "product"
+
+def iter_products(source: str) -> Iterator[Tuple[Optional[str], Optional[Dict[str, Any]], Optional[str]]]:
+    path = Path(source)
+    if not path.exists():
+        raise NonRecoverableError(f"Batch source not found: {source}")
+    
+    if path.is_dir():
+        for product_file in sorted(path.glob("*.json")):
+            try:
+                yield product_file.stem, load_json_file(str(product_file)), None
+            except Exception as e:
+                yield product_file.stem, None, f"Cannot load {product_file}: {e}"
+    
+    elif path.suffix == ".jsonl":
+        with open(path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield None, json.loads(line), None
+                except json.JSONDecodeError as e:
+                    yield f"line-{line_number}", None, f"Invalid JSON on line {line_number}: {e}"
+    
+    else:
+        products = load_json_file(source)
+        if isinstance(products, dict):
+            products = [products]
+        for product in products:
+            yield None, product, None
+
+class BatchRunner:
+    def __init__(self, orchestrator: PipelineOrchestrator = None, workers: int = None, output_dir: str = None, llm=None, batch_size: int = None):
+        self.orchestrator = orchestrator or PipelineOrchestrator()
+        self.llm = llm
+        self.workers = max(1, workers or Config.BATCH_WORKERS)
+        self.batch_size = Config.BATCH_PROMPT_SIZE if batch_size is None else batch_size
+        self.output_dir = output_dir or Config.OUTPUT_DIR
+        self.used_ids = set()
+    
+    def assign_product_id(self, hint: Optional[str], product: Optional[Dict[str, Any]], index: int) -> str:
+        if hint:
+            base = slugify(hint)
+        elif isinstance(product, dict):
+            base = slugify(product.get("id") or product.get("sku") or product.get("name") or f"product-{index}")
+        else:
+            base = f"product-{index}"
+        
+        product_id = base
+        suffix = 2
+        while product_id in self.used_ids:
+            product_id = f"{base}-{suffix}"
+            suffix += 1
+        self.used_ids.add(product_id)
+        return product_id
+    
+    def use_batched_prompts(self) -> bool:
+        return self.batch_size > 1 and not self.orchestrator.incremental and not self.orchestrator.resume
+    
+    def prefetch(self, window: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        if not self.use_batched_prompts():
+            return {}
+        try:
+            return self.orchestrator.prefetch_content(dict(window), self.batch_size)
+        except Exception as e:
+            logger.error(f"Batched prefetch failed, processing products individually: {e}")
+            return {}
+    
+    def process_prefetched(self, product_id: str, raw_product: Dict[str, Any], prefetch: Future) -> Dict[str, Any]:
+        return self.process(product_id, raw_product, prefetch.result().get(product_id))
+    
+    def process(self, product_id: str, raw_product: Dict[str, Any], prefetched: Dict[str, Any] = None) -> Dict[str, Any]:
+        output_dir = f"{self.output_dir}/{product_id}"
+        try:
+            outputs = self.orchestrator.process_product(raw_product, output_dir, prefetched=prefetched)
+            logger.info(f"[{product_id}] Product completed")
+            return {"product_id": product_id, "status": "succeeded", "outputs": outputs}
+        except Exception as e:
+            logger.error(f"[{product_id}] Product failed: {e}")
+            self.orchestrator.cleanup_outputs(list(self.orchestrator.get_output_paths(output_dir).values()))
+            return {"product_id": product_id, "status": "failed", "error": str(e)}
+    
+    def run(self, source: str) -> Dict[str, Any]:
+        if self.orchestrator.output_sink is None:
+            self.orchestrator.output_sink = open_sink(self.output_dir)
+        self.orchestrator.initialize_agents(self.llm)
+        
+        window_size = self.batch_size * self.workers if self.use_batched_prompts() else 1
+        max_pending = max(self.workers * 2, window_size)
+        
+        results = []
+        pending = set()
+        window = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="product") as executor:
+            def submit_window():
+                if not self.use_batched_prompts():
+                    pending.update(executor.submit(self.process, product_id, raw_product) for product_id, raw_product in window)
+                    window.clear()
+                    return
+                
+                chunks = [window[start:start + self.batch_size] for start in range(0, len(window), self.batch_size)]
+                prefetches = [executor.submit(self.prefetch, chunk) for chunk in chunks]
+                for chunk, prefetch in zip(chunks, prefetches):
+                    pending.update(
+                        executor.submit(self.process_prefetched, product_id, raw_product, prefetch)
+                        for product_id, raw_product in chunk
+                    )
+                window.clear()
+            
+            for index, (hint, raw_product, error) in enumerate(iter_products(source)):
+                product_id = self.assign_product_id(hint, raw_product, index)
+                
+                if error or not isinstance(raw_product, dict):
+                    error = error or f"Product record must be a JSON object, got {type(raw_product).__name__}"
+                    logger.error(f"[{product_id}] Skipped: {error}")
+                    results.append({"product_id": product_id, "status": "failed", "error": error})
+                    continue
+                
+                window.append((product_id, raw_product))
+                if len(window) < window_size:
+                    continue
+                submit_window()
+                
+                while len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+            
+            submit_window()
+            results.extend(future.result() for future in pending)
+        
+        try:
+            self.orchestrator.close_outputs()
+        except Exception as e:
+            logger.error(f"Writing batch outputs failed: {e}")
+            raise NonRecoverableError(f"Cannot write batch outputs: {e}")
+        
+        succeeded = sum(1 for r in results if r["status"] == "succeeded")
+        summary = {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
+        }
+        save_json_file(summary, f"{self.output_dir}/batch_summary.json")
+        logger.info(f"Batch completed: {succeeded}/{len(results)} products succeeded")
+        return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate content pages for a catalog of products")
+    parser.add_argument("source", help="Directory of product JSON files, a JSON array file or a JSONL file")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_WORKERS, help="Number of products processed in parallel")
+    parser.add_argument("--batch-size", type=int, default=Config.BATCH_PROMPT_SIZE, help="Products packed into one question and block prompt (1 or less disables)")
+    parser.add_argument("--output-dir", default=Config.OUTPUT_DIR, help="Root directory for per-product outputs")
+    parser.add_argument("--incremental", action="store_true", default=None, help="Skip products whose inputs, templates, prompts and model are unchanged")
+    parser.add_argument("--resume", action="store_true", help="Continue failed products from their last completed stage")
+    args = parser.parse_args()
+    if Config.METRICS_DIR:
+        metrics.stream_events(f"{Config.METRICS_DIR}/metrics.jsonl")
+    
+    try:
+        orchestrator = PipelineOrchestrator(incremental=args.incremental, resume=args.resume)
+        summary = BatchRunner(orchestrator, workers=args.workers, output_dir=args.output_dir, batch_size=args.batch_size).run(args.source)
+    except NonRecoverableError as e:
+        logger.error(f"NON-RECOVERABLE ERROR: {e}")
+        sys.exit(1)
+    finally:
+        metrics.export(Config.METRICS_DIR)
+    
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from typing import Any, Callable, Dict, List, Tuple
+from config import Config
+from metrics import metrics
+from prompting import estimate_tokens, serialize_compact
+from utils import logger
+
+def plan_batches(items: List[Tuple[str, Any]], cost: Callable[[Any], int], token_limit: int, max_size: int) -> List[List[Tuple[str, Any]]]:
+    batches = []
+    current = []
+    current_cost = 0
+    for item in items:
+        item_cost = cost(item[1])
+        if current and (len(current) >= max_size or current_cost + item_cost > token_limit):
+            batches.append(current)
+            current = []
+            current_cost = 0
+        current.append(item)
+        current_cost += item_cost
+    if current:
+        batches.append(current)
+    return batches
+
+class BatchPrompter:
+    def __init__(
+        self,
+        name: str,
+        call: Callable[[Dict[str, Any], str], Dict[str, Any]],
+        validate: Callable[[Any, Any], Any],
+        output_tokens: int,
+        retry_policy,
+        max_size: int = None,
+        token_limit: int = None
+    ):
+        self.name = name
+        self.call = call
+        self.validate = validate
+        self.output_tokens = output_tokens
+        self.retry_policy = retry_policy
+        self.max_size = max(1, Config.BATCH_PROMPT_SIZE if max_size is None else max_size)
+        self.token_limit = Config.BATCH_PROMPT_TOKEN_LIMIT if token_limit is None else token_limit
+    
+    def cost(self, item: Any) -> int:
+        return estimate_tokens(serialize_compact(item)) + self.output_tokens
+    
+    def request(self, batch: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        payload = dict(batch)
+        try:
+            response = self.retry_policy.call(lambda state: self.call(payload, state.feedback), self.name)
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+            return {}
+        return response if isinstance(response, dict) else {}
+    
+    def run(self, items: Dict[str, Any]) -> Dict[str, Any]:
+        results = {}
+        queue = plan_batches(list(items.items()), self.cost, self.token_limit, self.max_size)
+        logger.info(f"{self.name} packing {len(items)} products into {len(queue)} batched requests")
+        
+        while queue:
+            batch = queue.pop(0)
+            response = self.request(batch)
+            metrics.observe("batch_prompt_size", len(batch), agent=self.name)
+            
+            failed = []
+            for item_id, item in batch:
+                try:
+                    results[item_id] = self.validate(item, response.get(item_id))
+                except (TypeError, ValueError, KeyError) as e:
+                    logger.warning(f"{self.name} batched item {item_id} failed validation: {e}")
+                    failed.append((item_id, item))
+            
+            if not failed:
+                continue
+            metrics.increment("batch_prompt_failed_items_total", len(failed), agent=self.name)
+            if len(batch) == 1:
+                continue
+            middle = (len(failed) + 1) // 2
+            queue.extend(part for part in (failed[:middle], failed[middle:]) if part)
+        
+        return results
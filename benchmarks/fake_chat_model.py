@@ -0,0 +1,213 @@
+import re
+import json
+import time
+import random
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.pydantic_v1 import PrivateAttr
+from logic.deterministic import extract_concentration_value, normalize_price_format
+
+PROMPT_PARSE = "parse"
+PROMPT_QUESTIONS = "questions"
+PROMPT_BLOCKS = "blocks"
+PROMPT_COMPARISON = "comparison"
+
+PROMPT_MARKERS = [
+    (PROMPT_PARSE, ("Parse and normalize", "Parse this product data"), ("Product JSON:", "Product:")),
+    (PROMPT_QUESTIONS, ("frequently asked questions",), ("Product:",)),
+    (PROMPT_BLOCKS, ("Create content blocks",), ("Product:",)),
+    (PROMPT_COMPARISON, ("fictional competing product",), ("Real Product A:",))
+]
+
+BATCH_MARKER = "Products:"
+
+QUESTION_TEMPLATES = [
+    ("What is {name} and what does it do for the skin?", "informational"),
+    ("What concentration of active ingredient does {name} contain?", "informational"),
+    ("Which skin types is {name} suitable for?", "informational"),
+    ("What are the key ingredients in {name}?", "informational"),
+    ("What benefits can I expect from using {name}?", "informational"),
+    ("How should I apply {name} in my routine?", "usage"),
+    ("When is the best time of day to use {name}?", "usage"),
+    ("How many drops of {name} should I use each time?", "usage"),
+    ("Can I layer {name} with sunscreen?", "usage"),
+    ("Does {name} cause any side effects?", "safety"),
+    ("Is {name} safe for sensitive skin?", "safety"),
+    ("What should I do if {name} causes tingling?", "safety"),
+    ("How much does {name} cost?", "purchase"),
+    ("Why is {name} priced the way it is?", "purchase"),
+    ("Where does {name} sit compared with similar serums?", "purchase"),
+    ("Should I patch test {name} before first use?", "safety"),
+    ("Can {name} be used every day?", "usage"),
+    ("What makes {name} different from other products?", "informational"),
+    ("How long does a bottle of {name} last?", "purchase"),
+    ("Which products should I avoid mixing with {name}?", "safety")
+]
+
+class FakeTransportError(Exception):
+    pass
+
+def detect_prompt_kind(prompt: str) -> Optional[str]:
+    for kind, phrases, _ in PROMPT_MARKERS:
+        if any(phrase in prompt for phrase in phrases):
+            return kind
+    return None
+
+def extract_payload(prompt: str, markers) -> Any:
+    decoder = json.JSONDecoder()
+    for marker in markers:
+        index = prompt.find(marker)
+        if index == -1:
+            continue
+        start = index + len(marker)
+        while start < len(prompt) and prompt[start] not in "{[":
+            start += 1
+        try:
+            return decoder.raw_decode(prompt, start)[0]
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Fake model could not find a product payload in the prompt")
+
+def normalize_fake_product(raw: Dict[str, Any]) -> Dict[str, Any]:
+    product = {key: raw.get(key) for key in ("name", "concentration", "skin_type", "ingredients", "benefits", "usage", "side_effects")}
+    product["price"] = normalize_price_format(raw.get("price", 0))
+    return product
+
+class FakeCatalogChatModel(BaseChatModel):
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 0
+    stream_chunk_size: int = 64
+    
+    _rng: Any = PrivateAttr()
+    _lock: Any = PrivateAttr()
+    _calls: Dict[str, int] = PrivateAttr()
+    
+    def __init__(self, **kwargs: Any):
+        kwargs.setdefault("cache", False)
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-catalog-chat-model"
+    
+    @property
+    def call_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._calls)
+    
+    def draw(self):
+        with self._lock:
+            return self._rng.random(), self._rng.random(), self._rng.uniform(-1, 1)
+    
+    def prepare(self, messages: List[BaseMessage]) -> Tuple[str, float]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        kind = detect_prompt_kind(prompt)
+        with self._lock:
+            self._calls[kind] = self._calls.get(kind, 0) + 1
+        
+        failure_draw, malformed_draw, jitter_draw = self.draw()
+        delay = max(0.0, self.latency + self.jitter * jitter_draw)
+        
+        if failure_draw < self.failure_rate:
+            time.sleep(delay)
+            raise FakeTransportError("503 Service Unavailable (simulated)")
+        
+        text = self.respond(kind, prompt)
+        if malformed_draw < self.malformed_rate:
+            text = text[:max(1, len(text) // 2)]
+        
+        return text, delay
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        text, delay = self.prepare(messages)
+        if delay:
+            time.sleep(delay)
+        
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+    
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        text, delay = self.prepare(messages)
+        chunks = [text[i:i + self.stream_chunk_size] for i in range(0, len(text), self.stream_chunk_size)]
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+    
+    def respond(self, kind: Optional[str], prompt: str) -> str:
+        if kind is None:
+            raise ValueError("Fake model received an unrecognized prompt")
+        if kind in (PROMPT_QUESTIONS, PROMPT_BLOCKS) and BATCH_MARKER in prompt:
+            products = extract_payload(prompt, (BATCH_MARKER,))
+            return json.dumps({
+                product_id: self.questions(product, prompt) if kind == PROMPT_QUESTIONS else self.blocks(product)
+                for product_id, product in products.items()
+            })
+        
+        markers = next(markers for k, _, markers in PROMPT_MARKERS if k == kind)
+        product = extract_payload(prompt, markers)
+        
+        if kind == PROMPT_PARSE:
+            return json.dumps(normalize_fake_product(product))
+        if kind == PROMPT_QUESTIONS:
+            return json.dumps(self.questions(product, prompt))
+        if kind == PROMPT_BLOCKS:
+            return json.dumps(self.blocks(product))
+        return json.dumps(self.competitor(product))
+    
+    def questions(self, product: Dict[str, Any], prompt: str) -> List[Dict[str, str]]:
+        match = re.search(r"generate exactly (\d+)", prompt)
+        count = int(match.group(1)) if match else 15
+        excluded = set(re.findall(r"^- (.+)$", prompt, re.MULTILINE))
+        name = product.get("name", "this product")
+        
+        questions = []
+        for template, category in QUESTION_TEMPLATES:
+            question = template.format(name=name)
+            if question in excluded:
+                continue
+            questions.append({
+                "question": question,
+                "answer": f"{name} is answered here using its documented {category} details.",
+                "category": category
+            })
+            if len(questions) == count:
+                break
+        return questions
+    
+    def blocks(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        return {"usage_block": product.get("usage", "")}
+    
+    def competitor(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        concentration = extract_concentration_value(product.get("concentration", "")) + 5
+        return {
+            "name": f"{product.get('name', 'Product')} Rival",
+            "concentration": f"{concentration:g}% Active",
+            "skin_type": ["Dry", "Normal"],
+            "ingredients": list(product.get("ingredients", []))[:1] + ["Glycerin"],
+            "benefits": ["Hydration", "Smoother texture"],
+            "usage": "Apply 3 drops at night after cleansing",
+            "side_effects": "May cause dryness",
+            "price": int(product.get("price", 500)) + 200
+        }
@@ -0,0 +1,176 @@
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+from typing import Any, Dict, List
+from batch import BatchRunner
+from orchestrator import PipelineOrchestrator
+from competitor_pool import CompetitorPool
+from utils import load_json_file
+from config import Config
+from metrics import metrics
+from benchmarks.fake_chat_model import FakeCatalogChatModel
+
+STAGES = ("parse_product", "generate_validated_questions", "generate_blocks", "generate_comparison", "assemble_outputs")
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def make_catalog(size: int) -> List[Dict[str, Any]]:
+    base = load_json_file(Config.INPUT_FILE)
+    catalog = []
+    for index in range(size):
+        product = dict(base)
+        product["name"] = f"{base['name']} #{index}"
+        product["price"] = 300 + (index * 37) % 2500
+        product["concentration"] = f"{5 + index % 20}% Vitamin C"
+        catalog.append(product)
+    return catalog
+
+class TimedOrchestrator(PipelineOrchestrator):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.timings = {stage: [] for stage in STAGES}
+        self.timings_lock = threading.Lock()
+    
+    def timed(self, stage: str, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return getattr(super(), stage)(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.timings_lock:
+                self.timings[stage].append(elapsed)
+    
+    def parse_product(self, *args, **kwargs):
+        return self.timed("parse_product", *args, **kwargs)
+    
+    def generate_validated_questions(self, *args, **kwargs):
+        return self.timed("generate_validated_questions", *args, **kwargs)
+    
+    def generate_blocks(self, *args, **kwargs):
+        return self.timed("generate_blocks", *args, **kwargs)
+    
+    def generate_comparison(self, *args, **kwargs):
+        return self.timed("generate_comparison", *args, **kwargs)
+    
+    def assemble_outputs(self, *args, **kwargs):
+        return self.timed("assemble_outputs", *args, **kwargs)
+
+def run_benchmark(size: int, workers: int = 4, concurrent_stages: bool = False, stream_faqs: bool = False, batch_size: int = 0, competitor_pool: bool = False, **fake_options) -> Dict[str, Any]:
+    metrics.reset()
+    llm = FakeCatalogChatModel(**fake_options)
+    with tempfile.TemporaryDirectory() as workdir:
+        orchestrator = TimedOrchestrator(
+            concurrent_stages=concurrent_stages,
+            incremental=False,
+            stream_faqs=stream_faqs,
+            competitor_pool=CompetitorPool(f"{workdir}/competitor_pool.jsonl") if competitor_pool else None
+        )
+        
+        source = f"{workdir}/catalog.jsonl"
+        with open(source, "w") as f:
+            for product in make_catalog(size):
+                f.write(json.dumps(product) + "\n")
+        
+        runner = BatchRunner(orchestrator, workers=workers, output_dir=f"{workdir}/output", llm=llm, batch_size=batch_size)
+        start = time.perf_counter()
+        summary = runner.run(source)
+        wall_time = time.perf_counter() - start
+    
+    calls = llm.call_counts
+    
+    return {
+        "products": size,
+        "workers": workers,
+        "batch_size": batch_size,
+        "succeeded": summary["succeeded"],
+        "failed": summary["failed"],
+        "wall_time_s": round(wall_time, 3),
+        "products_per_s": round(size / wall_time, 2) if wall_time else 0.0,
+        "llm_calls": sum(calls.values()),
+        "retries": int(metrics.counter_total("agent_retries_total") + metrics.counter_total("faq_quality_retries_total")),
+        "json_parse_failures": int(metrics.counter_total("json_parse_failures_total")),
+        "validation_failures": int(metrics.counter_total("validation_failures_total")),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2)
+            }
+            for stage, values in orchestrator.timings.items()
+        }
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"products={report['products']} workers={report['workers']} batch_size={report['batch_size']} succeeded={report['succeeded']} failed={report['failed']}",
+        f"  wall={report['wall_time_s']}s throughput={report['products_per_s']} products/s "
+        f"llm_calls={report['llm_calls']} retries={report['retries']} json_failures={report['json_parse_failures']} "
+        f"validation_failures={report['validation_failures']} peak_rss={report['peak_rss_mb']}MB"
+    ]
+    for stage, stats in report["stages"].items():
+        lines.append(
+            f"  {stage:<30} n={stats['count']:<6} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against an offline fake LLM")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000], help="Catalog sizes to run")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_WORKERS)
+    parser.add_argument("--concurrent-stages", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=0, help="Products packed into one question and block prompt")
+    parser.add_argument("--competitor-pool", action="store_true", help="Reuse generated competitors across products")
+    parser.add_argument("--stream-faqs", action="store_true", help="Stream FAQ generation with per-item checks")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum latency deviation in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of calls raising a transport error")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of calls returning truncated JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Write the reports to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Keep pipeline INFO logging")
+    args = parser.parse_args()
+    
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    
+    reports = []
+    for size in args.sizes:
+        report = run_benchmark(
+            size,
+            workers=args.workers,
+            concurrent_stages=args.concurrent_stages,
+            stream_faqs=args.stream_faqs,
+            batch_size=args.batch_size,
+            competitor_pool=args.competitor_pool,
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            malformed_rate=args.malformed_rate,
+            seed=args.seed
+        )
+        reports.append(report)
+        print(format_report(report), flush=True)
+    
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=4)
+
+if __name__ == "__main__":
+    main()
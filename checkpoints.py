@@ -0,0 +1,46 @@
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional
+from utils import load_json_file, save_json_file, logger
+
+class CheckpointStore:
+    CHECKPOINT_DIR = ".checkpoints"
+    STAGES = ("parsed_product", "questions", "blocks", "comparison")
+    
+    def __init__(self, output_dir: str, input_hash: str):
+        self.directory = Path(output_dir) / self.CHECKPOINT_DIR
+        self.input_hash = input_hash
+    
+    def path(self, stage: str) -> Path:
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        return self.directory / f"{stage}.json"
+    
+    def load(self, stage: str) -> Optional[Any]:
+        path = self.path(stage)
+        if not path.exists():
+            return None
+        try:
+            checkpoint = load_json_file(str(path))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+        if checkpoint.get("input") != self.input_hash:
+            logger.info(f"Checkpoint {stage} belongs to a different input, ignoring")
+            return None
+        return checkpoint.get("data")
+    
+    def save(self, stage: str, data: Any) -> None:
+        save_json_file({"input": self.input_hash, "data": data}, str(self.path(stage)))
+    
+    def load_all(self) -> Dict[str, Any]:
+        completed = {}
+        for stage in self.STAGES:
+            data = self.load(stage)
+            if data is not None:
+                completed[stage] = data
+        return completed
+    
+    def clear(self) -> None:
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
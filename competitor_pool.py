@@ -0,0 +1,95 @@
+import copy
+import json
+import bisect
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from schemas import Product
+from config import Config
+from metrics import metrics
+from utils import ensure_directory, logger
+from logic.deterministic import categorize_price_range, extract_concentration_value, normalize_price_format
+
+CONCENTRATION_BUCKET_WIDTH = 5
+MAX_PROBES = 8
+
+def segment_keys(product: Dict[str, Any]) -> List[Tuple[int, str, str]]:
+    bucket = int(extract_concentration_value(product.get("concentration", "")) // CONCENTRATION_BUCKET_WIDTH)
+    tier = categorize_price_range(normalize_price_format(product["price"]))
+    return [(bucket, skin_type.strip().lower(), tier) for skin_type in product.get("skin_type", [])]
+
+class CompetitorPool:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.products: List[Dict[str, Any]] = []
+        self.index: Dict[Tuple[int, str, str], List[Tuple[int, int]]] = {}
+        self.load()
+    
+    @classmethod
+    def from_config(cls) -> Optional["CompetitorPool"]:
+        if not Config.COMPETITOR_POOL_ENABLED:
+            return None
+        return cls(Config.COMPETITOR_POOL_PATH)
+    
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    product = Product(**record["product"]).dict()
+                    keys = [tuple(key) for key in record["segments"]]
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Skipping invalid competitor on line {line_number} of {self.path}: {e}")
+                    continue
+                self.insert(product, keys)
+        logger.info(f"Loaded {len(self.products)} competitors from {self.path}")
+    
+    def insert(self, product: Dict[str, Any], keys: List[Tuple[int, str, str]]) -> None:
+        position = len(self.products)
+        self.products.append(product)
+        for key in keys:
+            bisect.insort(self.index.setdefault(key, []), (product["price"], position))
+    
+    def is_usable(self, product_a: Dict[str, Any], product_b: Dict[str, Any]) -> bool:
+        return (
+            product_b["name"] != product_a.get("name")
+            and product_b["price"] != normalize_price_format(product_a["price"])
+            and extract_concentration_value(product_b["concentration"]) != extract_concentration_value(product_a.get("concentration", ""))
+        )
+    
+    def find(self, product_a: Dict[str, Any], exclude: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+        price = normalize_price_format(product_a["price"])
+        with self.lock:
+            for key in segment_keys(product_a):
+                entries = self.index.get(key)
+                if not entries:
+                    continue
+                position = bisect.bisect_left(entries, (price, -1))
+                candidates = [
+                    entry for entry in entries[max(0, position - MAX_PROBES):position + MAX_PROBES]
+                    if self.is_usable(product_a, self.products[entry[1]]) and self.products[entry[1]]["name"] not in exclude
+                ]
+                if candidates:
+                    best = min(candidates, key=lambda entry: (abs(entry[0] - price), entry[1]))
+                    metrics.increment("competitor_pool_lookups_total", result="hit")
+                    return copy.deepcopy(self.products[best[1]])
+        
+        metrics.increment("competitor_pool_lookups_total", result="miss")
+        return None
+    
+    def add(self, product_a: Dict[str, Any], product_b: Dict[str, Any]) -> None:
+        product = Product(**product_b).dict()
+        keys = segment_keys(product_a)
+        with self.lock:
+            self.insert(product, keys)
+            ensure_directory(self.path.parent)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({"segments": keys, "product": product}, ensure_ascii=False) + "\n")
+    
+    def __len__(self) -> int:
+        return len(self.products)
@@ -8,11 +8,55 @@ class Config:
     MODEL_NAME = os.getenv("MODEL_NAME", "gemini-2.5-flash")
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0"))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
-    RETRY_DELAY = int(os.getenv("RETRY_DELAY", "2"))
+    RETRY_DELAY = float(os.getenv("RETRY_DELAY", "2"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+    RETRY_DEADLINE_SECONDS = float(os.getenv("RETRY_DEADLINE_SECONDS", "0"))
+    SCHEMA_RETRY_ATTEMPTS = int(os.getenv("SCHEMA_RETRY_ATTEMPTS", "2"))
+    CONCURRENT_STAGES = os.getenv("CONCURRENT_STAGES", "false").lower() == "true"
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+    BATCH_PROMPT_SIZE = int(os.getenv("BATCH_PROMPT_SIZE", "0"))
+    BATCH_PROMPT_TOKEN_LIMIT = int(os.getenv("BATCH_PROMPT_TOKEN_LIMIT", "8000"))
+    INCREMENTAL = os.getenv("INCREMENTAL", "false").lower() == "true"
+    PARSER_FAST_PATH = os.getenv("PARSER_FAST_PATH", "true").lower() == "true"
+    BLOCK_USAGE_LLM = os.getenv("BLOCK_USAGE_LLM", "true").lower() == "true"
+    STREAM_FAQS = os.getenv("STREAM_FAQS", "false").lower() == "true"
+    FAQ_REPAIR = os.getenv("FAQ_REPAIR", "true").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.6"))
+    NEAR_DUPLICATE_NUM_PERM = int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "128"))
+    NEAR_DUPLICATE_SHINGLES = os.getenv("NEAR_DUPLICATE_SHINGLES", "word")
+    NEAR_DUPLICATE_SHINGLE_SIZE = int(os.getenv("NEAR_DUPLICATE_SHINGLE_SIZE", "1"))
+    QUALITY_RETRY_BUDGET = int(os.getenv("QUALITY_RETRY_BUDGET", "4"))
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "0"))
+    
+    LLM_GOVERNOR_ENABLED = os.getenv("LLM_GOVERNOR_ENABLED", "true").lower() == "true"
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+    LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "4"))
+    
+    COMPETITOR_POOL_ENABLED = os.getenv("COMPETITOR_POOL_ENABLED", "true").lower() == "true"
+    COMPETITOR_POOL_PATH = os.getenv("COMPETITOR_POOL_PATH", ".cache/competitor_pool.jsonl")
+    FAQ_STORE_ENABLED = os.getenv("FAQ_STORE_ENABLED", "false").lower() == "true"
+    FAQ_STORE_PATH = os.getenv("FAQ_STORE_PATH", ".cache/faq_store.jsonl")
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    LLM_CACHE_MAX_AGE_SECONDS = int(os.getenv("LLM_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
     
     INPUT_FILE = "data/input_product.json"
     OUTPUT_DIR = "generated_output"
     TEMPLATES_DIR = "templates"
+    QUALITY_RULES_PATH = os.getenv("QUALITY_RULES_PATH", "quality/quality_rules.json")
+    METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+    METRICS_MAX_EVENTS = int(os.getenv("METRICS_MAX_EVENTS", "10000"))
+    OUTPUT_SINK = os.getenv("OUTPUT_SINK", "files")
+    OUTPUT_JSON_INDENT = int(os.getenv("OUTPUT_JSON_INDENT", "4"))
+    OUTPUT_FSYNC = os.getenv("OUTPUT_FSYNC", "false").lower() == "true"
+    OUTPUT_BACKGROUND = os.getenv("OUTPUT_BACKGROUND", "false").lower() == "true"
+    OUTPUT_QUEUE_SIZE = int(os.getenv("OUTPUT_QUEUE_SIZE", "256"))
+    OUTPUT_SHARD_SIZE = int(os.getenv("OUTPUT_SHARD_SIZE", "10000"))
+    OUTPUT_COMMIT_RECORDS = int(os.getenv("OUTPUT_COMMIT_RECORDS", "500"))
     
     @classmethod
     def validate(cls):
@@ -0,0 +1,9 @@
+from typing import Any, Dict, List
+
+class RecoverableError(Exception):
+    def __init__(self, message: str = "", accepted: List[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.accepted = accepted or []
+
+class NonRecoverableError(Exception):
+    pass
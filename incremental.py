@@ -0,0 +1,87 @@
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config import Config
+from utils import load_json_file, save_json_file, logger
+
+PLAN_SKIP = "skip"
+PLAN_ASSEMBLE = "assemble"
+PLAN_FULL = "full"
+
+def hash_payload(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def hash_file(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def hash_templates(templates_dir: str = None) -> str:
+    templates = sorted(Path(templates_dir or Config.TEMPLATES_DIR).glob("*.json"))
+    return hash_payload({template.name: hash_file(str(template)) for template in templates})
+
+def model_settings() -> Dict[str, Any]:
+    return {"model": Config.MODEL_NAME, "temperature": Config.TEMPERATURE}
+
+def compute_fingerprint(raw_product: Dict[str, Any], prompt_templates: List[str]) -> Dict[str, str]:
+    return {
+        "input": hash_payload(raw_product),
+        "templates": hash_templates(),
+        "prompts": hash_payload(prompt_templates),
+        "model": hash_payload(model_settings())
+    }
+
+def compute_generation_key(raw_product: Dict[str, Any], prompt_templates: List[str]) -> str:
+    return hash_payload({"input": raw_product, "prompts": prompt_templates, "model": model_settings()})
+
+class ManifestStore:
+    MANIFEST_FILE = ".manifest.json"
+    
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.manifest_path = f"{output_dir}/{self.MANIFEST_FILE}"
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not Path(self.manifest_path).exists():
+            return None
+        try:
+            return load_json_file(self.manifest_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return None
+    
+    def save(self, fingerprint: Dict[str, str], output_files: List[str]) -> None:
+        manifest = {
+            "fingerprint": fingerprint,
+            "outputs": {path: hash_file(path) for path in output_files}
+        }
+        save_json_file(manifest, self.manifest_path)
+    
+    def outputs_intact(self, manifest: Dict[str, Any]) -> bool:
+        outputs = manifest.get("outputs", {})
+        if not outputs:
+            return False
+        for path, digest in outputs.items():
+            if not Path(path).exists() or hash_file(path) != digest:
+                logger.info(f"Output changed or missing: {path}")
+                return False
+        return True
+    
+    def plan(self, fingerprint: Dict[str, str]) -> str:
+        manifest = self.load()
+        if manifest is None:
+            return PLAN_FULL
+        
+        previous = manifest.get("fingerprint", {})
+        changed = [key for key in fingerprint if previous.get(key) != fingerprint[key]]
+        
+        if not changed:
+            return PLAN_SKIP if self.outputs_intact(manifest) else PLAN_ASSEMBLE
+        if changed == ["templates"]:
+            return PLAN_ASSEMBLE
+        
+        logger.info(f"Fingerprint changed: {', '.join(changed)}")
+        return PLAN_FULL
+    
+    def output_files(self) -> List[str]:
+        return list((self.load() or {}).get("outputs", {}).keys())
@@ -0,0 +1,199 @@
+import json
+from typing import Any, Optional, Tuple
+from metrics import metrics
+from utils import clean_json_response, logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CLOSERS = {"{": "}", "[": "]"}
+
+def loads(text: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def scan_json_value(text: str) -> Tuple[Optional[str], bool]:
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return None, False
+    start = min(starts)
+    
+    stack = []
+    quote = None
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+            continue
+        
+        if char in "\"'":
+            quote = char
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+        elif char in "}]":
+            if not stack or char != stack[-1]:
+                return text[start:index], False
+            stack.pop()
+            if not stack:
+                return text[start:index + 1], True
+    
+    return text[start:], False
+
+def next_significant(text: str, index: int) -> str:
+    while index < len(text) and text[index].isspace():
+        index += 1
+    return text[index] if index < len(text) else ""
+
+def repair_json(text: str) -> str:
+    output = []
+    quote = None
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == "\\" and index + 1 < len(text):
+                following = text[index + 1]
+                if quote == "'" and following == "'":
+                    output.append("'")
+                else:
+                    output.append(char + following)
+                index += 2
+                continue
+            if char == quote:
+                output.append('"')
+                quote = None
+            elif char == '"':
+                output.append('\\"')
+            elif char == "\n":
+                output.append("\\n")
+            else:
+                output.append(char)
+        elif char in "\"'":
+            output.append('"')
+            quote = char
+        elif char == "," and next_significant(text, index + 1) in ("}", "]"):
+            pass
+        else:
+            output.append(char)
+        index += 1
+    return "".join(output)
+
+def recover_array_items(text: str) -> list:
+    decoder = json.JSONDecoder()
+    items = []
+    index = text.find("[") + 1
+    while index:
+        while index < len(text) and (text[index].isspace() or text[index] == ","):
+            index += 1
+        if index >= len(text) or text[index] == "]":
+            break
+        try:
+            item, index = decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            break
+        if next_significant(text, index) not in (",", "]"):
+            break
+        items.append(item)
+    return items
+
+def extract_json(response: str) -> Any:
+    cleaned = clean_json_response(response)
+    try:
+        return loads(cleaned)
+    except ValueError:
+        pass
+    
+    candidate, complete = scan_json_value(cleaned)
+    if candidate is None:
+        raise json.JSONDecodeError("No JSON value found in response", cleaned, 0)
+    
+    if complete:
+        try:
+            value = loads(candidate)
+            metrics.increment("json_repairs_total", method="extract")
+            return value
+        except ValueError:
+            pass
+    
+    repaired = repair_json(candidate)
+    if complete:
+        try:
+            value = loads(repaired)
+            metrics.increment("json_repairs_total", method="repair")
+            return value
+        except ValueError:
+            pass
+    
+    if candidate.startswith("["):
+        items = recover_array_items(repaired)
+        if items:
+            logger.warning(f"Recovered {len(items)} complete items from a truncated JSON array")
+            metrics.increment("json_repairs_total", method="partial_array")
+            return items
+    
+    return json.loads(repaired)
+
+class StreamingArrayParser:
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.quote = None
+        self.escaped = False
+        self.item_start = None
+    
+    def parse_item(self, text: str) -> Any:
+        try:
+            return loads(text)
+        except ValueError:
+            pass
+        try:
+            return json.loads(repair_json(text))
+        except ValueError as e:
+            logger.warning(f"Skipping unparseable streamed item: {e}")
+            return None
+    
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        items = []
+        while self.position < len(self.buffer) and not self.finished:
+            char = self.buffer[self.position]
+            if not self.started:
+                if char == "[":
+                    self.started = True
+                    self.depth = 1
+            elif self.quote:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == self.quote:
+                    self.quote = None
+            elif char in "\"'":
+                self.quote = char
+            elif char in CLOSERS:
+                if self.depth == 1:
+                    self.item_start = self.position
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.item_start is not None:
+                    item = self.parse_item(self.buffer[self.item_start:self.position + 1])
+                    if item is not None:
+                        items.append(item)
+                    self.item_start = None
+                elif self.depth == 0:
+                    self.finished = True
+            self.position += 1
+        return items
@@ -0,0 +1,184 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult, Generation
+from config import Config
+from utils import ensure_directory, logger
+
+class PersistentLLMCache(BaseCache):
+    def __init__(self, path: str, max_bytes: int = 0, max_age_seconds: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        
+        ensure_directory(Path(path).parent)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.connection.commit()
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def encode_generations(generations: RETURN_VAL_TYPE) -> str:
+        return json.dumps([
+            {"chat": isinstance(g, ChatGeneration), "text": g.text}
+            for g in generations
+        ], separators=(",", ":"))
+    
+    @staticmethod
+    def decode_generations(payload: str) -> list:
+        return [
+            ChatGeneration(message=AIMessage(content=g["text"])) if g["chat"] else Generation(text=g["text"])
+            for g in json.loads(payload)
+        ]
+    
+    def is_expired(self, created_at: float, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - created_at > self.max_age_seconds
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT response, size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            response, size, created_at = row
+            if self.is_expired(created_at, now):
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.connection.commit()
+                self.total_bytes -= size
+                self.misses += 1
+                return None
+            
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+        
+        logger.info("LLM cache hit")
+        return self.decode_generations(response)
+    
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self.make_key(prompt, llm_string)
+        response = self.encode_generations(return_val)
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            previous = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now)
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            self.evict(now)
+            self.connection.commit()
+    
+    def evict(self, now: float) -> None:
+        if self.max_age_seconds:
+            cutoff = now - self.max_age_seconds
+            expired = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses WHERE created_at < ?", (cutoff,)
+            ).fetchone()[0]
+            if expired:
+                self.connection.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+                self.total_bytes -= expired
+        
+        if not self.max_bytes or self.total_bytes <= self.max_bytes:
+            return
+        
+        evicted = []
+        rows = self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC")
+        for key, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info(f"LLM cache evicted {len(evicted)} entries")
+    
+    def clear(self, **kwargs: Any) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            self.total_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+class UncachedChatModel(BaseChatModel):
+    llm: BaseChatModel
+    
+    @property
+    def _llm_type(self) -> str:
+        return self.llm._llm_type
+    
+    @property
+    def _identifying_params(self) -> dict:
+        return self.llm._identifying_params
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+def uncached(llm):
+    if not isinstance(llm, BaseChatModel):
+        return llm
+    return UncachedChatModel(llm=llm, cache=False)
+
+def store_response(llm, prompt: str, response: str) -> bool:
+    cache = get_llm_cache()
+    if cache is None or not isinstance(llm, BaseChatModel) or llm.cache is False:
+        return False
+    cache.update(
+        dumps([HumanMessage(content=prompt)]),
+        llm._get_llm_string(),
+        [ChatGeneration(message=AIMessage(content=response))]
+    )
+    return True
+
+def configure_llm_cache() -> Optional[PersistentLLMCache]:
+    if not Config.LLM_CACHE_ENABLED:
+        set_llm_cache(None)
+        return None
+    
+    cache = PersistentLLMCache(
+        Config.LLM_CACHE_PATH,
+        max_bytes=Config.LLM_CACHE_MAX_BYTES,
+        max_age_seconds=Config.LLM_CACHE_MAX_AGE_SECONDS
+    )
+    set_llm_cache(cache)
+    logger.info(f"LLM response cache enabled at {Config.LLM_CACHE_PATH}")
+    return cache
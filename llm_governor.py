@@ -0,0 +1,198 @@
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from config import Config
+from metrics import metrics
+from prompting import estimate_tokens
+from utils import logger
+
+PRIORITY_PARSE = 0
+PRIORITY_QUESTIONS = 1
+PRIORITY_BLOCKS = 2
+PRIORITY_COMPARISON = 3
+
+THROTTLE_MARKERS = ("429", "quota", "rate limit", "resourceexhausted", "resource_exhausted", "too many requests")
+
+def is_throttle_error(error: Exception) -> bool:
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in THROTTLE_MARKERS)
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+    
+    def charge(self, amount: float, now: float) -> None:
+        self.refill(now)
+        self.level -= amount
+
+class LLMGovernor:
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        initial_concurrency: int = None
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        initial = initial_concurrency or self.max_concurrency
+        self.limit = float(max(self.min_concurrency, min(initial, self.max_concurrency)))
+        self.in_flight = 0
+        self.epoch = 0
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+    
+    @classmethod
+    def from_config(cls) -> "LLMGovernor":
+        return cls(
+            requests_per_minute=Config.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=Config.LLM_TOKENS_PER_MINUTE,
+            max_concurrency=Config.LLM_MAX_CONCURRENCY,
+            min_concurrency=Config.LLM_MIN_CONCURRENCY,
+            initial_concurrency=Config.LLM_INITIAL_CONCURRENCY
+        )
+    
+    def bucket_wait(self, tokens: int, now: float) -> float:
+        waits = [0.0]
+        if self.request_bucket:
+            waits.append(self.request_bucket.wait_time(1, now))
+        if self.token_bucket:
+            waits.append(self.token_bucket.wait_time(tokens, now))
+        return max(waits)
+    
+    def acquire(self, priority: int, tokens: int = 0) -> int:
+        start = time.monotonic()
+        entry = (priority, next(self.sequence))
+        with self.condition:
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self.waiters[0] == entry and self.in_flight < int(self.limit):
+                        now = time.monotonic()
+                        timeout = self.bucket_wait(tokens, now)
+                        if timeout <= 0:
+                            heapq.heappop(self.waiters)
+                            if self.request_bucket:
+                                self.request_bucket.charge(1, now)
+                            if self.token_bucket:
+                                self.token_bucket.charge(tokens, now)
+                            self.in_flight += 1
+                            self.condition.notify_all()
+                            break
+                    self.condition.wait(timeout)
+            except BaseException:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+                raise
+            epoch = self.epoch
+        
+        metrics.observe("llm_governor_wait_seconds", time.monotonic() - start, priority=priority)
+        return epoch
+    
+    def release(self, epoch: int, throttled: bool = False, completion_tokens: int = 0) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            if self.token_bucket and completion_tokens:
+                self.token_bucket.charge(completion_tokens, time.monotonic())
+            
+            if throttled:
+                metrics.increment("llm_throttled_total")
+                if epoch == self.epoch:
+                    self.epoch += 1
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    logger.warning(f"LLM throttled, concurrency limit reduced to {int(self.limit)}")
+                    metrics.observe("llm_concurrency_limit", self.limit)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            
+            self.condition.notify_all()
+    
+    @contextmanager
+    def slot(self, priority: int, tokens: int = 0):
+        epoch = self.acquire(priority, tokens)
+        usage = {"completion_tokens": 0}
+        throttled = False
+        try:
+            yield usage
+        except Exception as e:
+            throttled = is_throttle_error(e)
+            raise
+        finally:
+            self.release(epoch, throttled=throttled, completion_tokens=usage["completion_tokens"])
+
+class GovernedChatModel(BaseChatModel):
+    llm: BaseChatModel
+    governor: LLMGovernor
+    priority: int = PRIORITY_PARSE
+    
+    @property
+    def _llm_type(self) -> str:
+        return self.llm._llm_type
+    
+    @property
+    def _identifying_params(self) -> dict:
+        return self.llm._identifying_params
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        tokens = estimate_tokens("".join(str(message.content) for message in messages))
+        with self.governor.slot(self.priority, tokens) as usage:
+            result = self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            usage["completion_tokens"] = sum(estimate_tokens(g.text) for g in result.generations)
+        return result
+    
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = estimate_tokens("".join(str(message.content) for message in messages))
+        with self.governor.slot(self.priority, tokens) as usage:
+            if type(self.llm)._stream == BaseChatModel._stream:
+                result = self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                for generation in result.generations:
+                    usage["completion_tokens"] += estimate_tokens(generation.text)
+                    yield ChatGenerationChunk(message=AIMessageChunk(content=generation.text))
+                return
+            for chunk in self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                usage["completion_tokens"] += estimate_tokens(chunk.text)
+                yield chunk
+
+def govern(llm, governor: Optional[LLMGovernor], priority: int):
+    if governor is None or not isinstance(llm, BaseChatModel):
+        return llm
+    return GovernedChatModel(llm=llm, governor=governor, priority=priority)
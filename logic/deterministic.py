@@ -1,4 +1,5 @@
-from typing import List, Dict
+import re
+from typing import Any, List, Dict
 
 def extract_concentration_value(concentration_str: str) -> float:
     digits = ''.join(filter(str.isdigit, concentration_str))
@@ -59,6 +60,27 @@ def normalize_price_format(price_value) -> int:
         return int(digits)
     raise TypeError(f"Price must be int or str, got {type(price_value)}")
 
+CURRENCY_PATTERN = r"(?:rs\.?|inr|₹|\$|usd)"
+PRICE_PATTERN = re.compile(
+    rf"^\s*(?:{CURRENCY_PATTERN}\s*)?(\d{{1,3}}(?:,\d{{3}})+|\d{{1,2}}(?:,\d{{2}})+,\d{{3}}|\d+)\s*(?:/-|{CURRENCY_PATTERN})?\s*$",
+    re.IGNORECASE
+)
+
+def parse_well_formed_price(price_value) -> int:
+    if isinstance(price_value, bool):
+        raise TypeError("Price must be int or str, got bool")
+    if isinstance(price_value, float) and price_value.is_integer():
+        return int(price_value)
+    if isinstance(price_value, int):
+        return price_value
+    if not isinstance(price_value, str):
+        raise TypeError(f"Price must be int or str, got {type(price_value)}")
+    
+    match = PRICE_PATTERN.match(price_value)
+    if match is None:
+        raise ValueError(f"Ambiguous price format: {price_value}")
+    return int(match.group(1).replace(",", ""))
+
 def categorize_price_range(price: int) -> str:
     if price < 500:
         return "Budget"
@@ -70,4 +92,59 @@ def categorize_price_range(price: int) -> str:
         return "Luxury"
 
 def calculate_benefit_score(benefits: List[str]) -> int:
-    return len(benefits) * 10
\ No newline at end of file
+    return len(benefits) * 10
+
+PRODUCT_TEXT_FIELDS = ["name", "concentration", "usage", "side_effects"]
+PRODUCT_LIST_FIELDS = ["skin_type", "ingredients", "benefits"]
+
+def normalize_skin_type(skin_type: str) -> str:
+    return " ".join(word.capitalize() for word in skin_type.split())
+
+def normalize_text_list(values: Any, field: str) -> List[str]:
+    if isinstance(values, str):
+        values = values.split(",")
+    if not isinstance(values, list):
+        raise TypeError(f"{field} must be a list, got {type(values)}")
+    if not all(isinstance(value, str) for value in values):
+        raise TypeError(f"{field} must contain only strings")
+    return [value.strip() for value in values if value.strip()]
+
+def normalize_product(raw_product: Dict) -> Dict[str, Any]:
+    if not isinstance(raw_product, dict):
+        raise TypeError(f"Product must be a dict, got {type(raw_product)}")
+    
+    product = {}
+    for field in PRODUCT_TEXT_FIELDS:
+        value = raw_product.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Missing or invalid {field}")
+        product[field] = value.strip()
+    
+    if extract_concentration_value(product["concentration"]) == 0:
+        raise ValueError(f"Cannot extract concentration from: {product['concentration']}")
+    
+    for field in PRODUCT_LIST_FIELDS:
+        product[field] = normalize_text_list(raw_product.get(field), field)
+    
+    skin_types = []
+    for skin_type in product["skin_type"]:
+        normalized = normalize_skin_type(skin_type)
+        if normalized not in skin_types:
+            skin_types.append(normalized)
+    product["skin_type"] = skin_types
+    
+    product["price"] = parse_well_formed_price(raw_product.get("price"))
+    
+    return product
+
+def build_content_blocks(product: Dict) -> Dict[str, Any]:
+    benefits = normalize_text_list(product.get("benefits", []), "benefits")
+    price = normalize_price_format(product["price"])
+    return {
+        "benefits": benefits,
+        "usage_block": (product.get("usage") or "").strip(),
+        "ingredients_block": normalize_text_list(product.get("ingredients", []), "ingredients"),
+        "price_block": {"price": price, "currency": "INR"},
+        "price_range": categorize_price_range(price),
+        "benefit_score": calculate_benefit_score(benefits)
+    }
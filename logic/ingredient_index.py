@@ -0,0 +1,114 @@
+import bisect
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+def normalize_ingredient(name: str) -> str:
+    return name.lower().strip()
+
+class IngredientIndex:
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.postings: List[array] = []
+        self.product_ids: Dict[str, int] = {}
+        self.product_keys: List[str] = []
+        self.product_ingredients: List[array] = []
+    
+    @classmethod
+    def from_products(cls, products: Iterable[Dict[str, Any]], key: str = "name") -> "IngredientIndex":
+        index = cls()
+        for product in products:
+            index.add(product[key], product.get("ingredients", []))
+        return index
+    
+    def intern(self, name: str) -> int:
+        normalized = normalize_ingredient(name)
+        ingredient_id = self.vocabulary.get(normalized)
+        if ingredient_id is None:
+            ingredient_id = len(self.names)
+            self.vocabulary[normalized] = ingredient_id
+            self.names.append(normalized)
+            self.postings.append(array('I'))
+        return ingredient_id
+    
+    def encode(self, ingredients: Iterable[str]) -> Tuple[array, int]:
+        known = set()
+        unknown = set()
+        for name in ingredients:
+            normalized = normalize_ingredient(name)
+            ingredient_id = self.vocabulary.get(normalized)
+            if ingredient_id is None:
+                unknown.add(normalized)
+            else:
+                known.add(ingredient_id)
+        return array('I', sorted(known)), len(unknown)
+    
+    def add(self, key: str, ingredients: Iterable[str]) -> int:
+        ids = array('I', sorted({self.intern(name) for name in ingredients}))
+        product_id = self.product_ids.get(key)
+        if product_id is not None:
+            for ingredient_id in self.product_ingredients[product_id]:
+                posting = self.postings[ingredient_id]
+                del posting[bisect.bisect_left(posting, product_id)]
+            self.product_ingredients[product_id] = ids
+        else:
+            product_id = len(self.product_keys)
+            self.product_ids[key] = product_id
+            self.product_keys.append(key)
+            self.product_ingredients.append(ids)
+        
+        for ingredient_id in ids:
+            bisect.insort(self.postings[ingredient_id], product_id)
+        return product_id
+    
+    def ingredients_of(self, key: str) -> List[str]:
+        return [self.names[i] for i in self.product_ingredients[self.product_ids[key]]]
+    
+    def containing(self, ingredient: str) -> List[str]:
+        ingredient_id = self.vocabulary.get(normalize_ingredient(ingredient))
+        if ingredient_id is None:
+            return []
+        return [self.product_keys[product_id] for product_id in self.postings[ingredient_id]]
+    
+    def shared_counts(self, ids: array) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for ingredient_id in ids:
+            for product_id in self.postings[ingredient_id]:
+                counts[product_id] = counts.get(product_id, 0) + 1
+        return counts
+    
+    def sharing_at_least(self, ingredients: Iterable[str], k: int, exclude: Optional[str] = None) -> List[Tuple[str, int]]:
+        ids, _ = self.encode(ingredients)
+        matches = [
+            (self.product_keys[product_id], count)
+            for product_id, count in self.shared_counts(ids).items()
+            if count >= k and self.product_keys[product_id] != exclude
+        ]
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+    
+    def overlap_percentages(self, ingredients: Iterable[str], exclude: Optional[str] = None) -> Dict[str, float]:
+        ids, unknown = self.encode(ingredients)
+        size = len(ids) + unknown
+        if not size:
+            return {}
+        return {
+            self.product_keys[product_id]: count / size * 100
+            for product_id, count in self.shared_counts(ids).items()
+            if self.product_keys[product_id] != exclude
+        }
+    
+    def overlap(self, key_a: str, key_b: str) -> Dict[str, Any]:
+        ids_a = self.product_ingredients[self.product_ids[key_a]]
+        ids_b = self.product_ingredients[self.product_ids[key_b]]
+        set_a = set(ids_a)
+        set_b = set(ids_b)
+        common = [self.names[i] for i in ids_a if i in set_b]
+        return {
+            "common_ingredients": common,
+            "unique_to_a": [self.names[i] for i in ids_a if i not in set_b],
+            "unique_to_b": [self.names[i] for i in ids_b if i not in set_a],
+            "overlap_percentage": len(common) / len(ids_a) * 100 if ids_a else 0
+        }
+    
+    def __len__(self) -> int:
+        return len(self.product_keys)
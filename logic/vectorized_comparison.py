@@ -0,0 +1,154 @@
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from logic.deterministic import extract_concentration_value, normalize_price_format
+
+MAX_SKIN_TYPES = 64
+DEFAULT_BLOCK_SIZE = 256
+
+STRONGER_A = 1
+STRONGER_B = -1
+STRONGER_EQUAL = 0
+
+BETTER_A = 0
+BETTER_B = 1
+BETTER_NEITHER = -1
+
+def expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total, dtype=np.int64)
+
+class ComparisonMatrix:
+    def __init__(self, products: List[Dict[str, Any]]):
+        self.names = [product["name"] for product in products]
+        self.concentrations = np.array(
+            [extract_concentration_value(product.get("concentration", "")) for product in products],
+            dtype=np.float64
+        )
+        self.prices = np.array([normalize_price_format(product["price"]) for product in products], dtype=np.int64)
+        
+        self.skin_types: Dict[str, int] = {}
+        for product in products:
+            for skin_type in product.get("skin_type", []):
+                self.skin_types.setdefault(skin_type, len(self.skin_types))
+        if len(self.skin_types) > MAX_SKIN_TYPES:
+            raise ValueError(f"At most {MAX_SKIN_TYPES} distinct skin types are supported, got {len(self.skin_types)}")
+        self.skin_bits = np.zeros(len(products), dtype=np.uint64)
+        for row, product in enumerate(products):
+            for skin_type in product.get("skin_type", []):
+                self.skin_bits[row] |= np.uint64(1) << np.uint64(self.skin_types[skin_type])
+        
+        ingredient_sets = [{i.lower().strip() for i in product.get("ingredients", [])} for product in products]
+        self.ingredients: Dict[str, int] = {}
+        for ingredient_set in ingredient_sets:
+            for ingredient in sorted(ingredient_set):
+                self.ingredients.setdefault(ingredient, len(self.ingredients))
+        self.ingredient_counts = np.array([len(ingredient_set) for ingredient_set in ingredient_sets], dtype=np.int64)
+        self.product_offsets = np.concatenate(([0], np.cumsum(self.ingredient_counts))).astype(np.int64)
+        self.product_ingredients = np.array(
+            [self.ingredients[i] for ingredient_set in ingredient_sets for i in sorted(ingredient_set)],
+            dtype=np.int64
+        )
+        
+        owners = np.repeat(np.arange(len(products), dtype=np.int64), self.ingredient_counts)
+        order = np.argsort(self.product_ingredients, kind="stable")
+        self.posting_products = owners[order]
+        self.posting_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.product_ingredients, minlength=len(self.ingredients))))
+        ).astype(np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def select(self, rows: Optional[Sequence[int]]) -> np.ndarray:
+        return np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+    
+    def price_differences(self, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        rows = self.select(rows)
+        return self.prices[rows, None] - self.prices[None, :]
+    
+    def stronger_formulation(self, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        rows = self.select(rows)
+        return np.sign(self.concentrations[rows, None] - self.concentrations[None, :]).astype(np.int8)
+    
+    def suitable_for(self, skin_type: str) -> np.ndarray:
+        if skin_type not in self.skin_types:
+            return np.zeros(len(self), dtype=bool)
+        bit = np.uint64(1) << np.uint64(self.skin_types[skin_type])
+        return (self.skin_bits & bit) != 0
+    
+    def better_for_skin_type(self, skin_type: str, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        rows = self.select(rows)
+        suitable = self.suitable_for(skin_type)
+        a_suitable = np.broadcast_to(suitable[rows, None], (len(rows), len(self)))
+        b_suitable = np.broadcast_to(suitable[None, :], (len(rows), len(self)))
+        return np.where(a_suitable, BETTER_A, np.where(b_suitable, BETTER_B, BETTER_NEITHER)).astype(np.int8)
+    
+    def common_ingredients(self, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        rows = self.select(rows)
+        starts = self.product_offsets[rows]
+        lengths = self.product_offsets[rows + 1] - starts
+        ingredients = self.product_ingredients[expand_ranges(starts, lengths)]
+        owners = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+        
+        posting_starts = self.posting_offsets[ingredients]
+        posting_lengths = self.posting_offsets[ingredients + 1] - posting_starts
+        columns = self.posting_products[expand_ranges(posting_starts, posting_lengths)]
+        cells = np.repeat(owners, posting_lengths) * len(self) + columns
+        return np.bincount(cells, minlength=len(rows) * len(self)).reshape(len(rows), len(self))
+    
+    def jaccard_from_common(self, common: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        union = self.ingredient_counts[rows, None] + self.ingredient_counts[None, :] - common
+        return np.divide(common, union, out=np.zeros(common.shape), where=union > 0)
+    
+    def ingredient_overlap(self, rows: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        rows = self.select(rows)
+        common = self.common_ingredients(rows)
+        counts_a = np.broadcast_to(self.ingredient_counts[rows, None], common.shape)
+        overlap_percentage = np.divide(common * 100, counts_a, out=np.zeros(common.shape), where=counts_a > 0)
+        return self.jaccard_from_common(common, rows), overlap_percentage
+    
+    def compare_all(self, rows: Optional[Sequence[int]] = None, skin_type: str = "Oily") -> Dict[str, np.ndarray]:
+        jaccard, overlap_percentage = self.ingredient_overlap(rows)
+        return {
+            "price_difference": self.price_differences(rows),
+            "stronger": self.stronger_formulation(rows),
+            "better_for_skin_type": self.better_for_skin_type(skin_type, rows),
+            "jaccard": jaccard,
+            "overlap_percentage": overlap_percentage
+        }
+    
+    def compare_blocks(self, block_size: int = DEFAULT_BLOCK_SIZE, skin_type: str = "Oily") -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        for start in range(0, len(self), block_size):
+            rows = np.arange(start, min(start + block_size, len(self)))
+            yield rows, self.compare_all(rows, skin_type)
+    
+    def top_k_similar(self, k: int, block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self) - 1)
+        indices = np.zeros((len(self), max(k, 0)), dtype=np.int64)
+        scores = np.zeros((len(self), max(k, 0)), dtype=np.float64)
+        if k <= 0:
+            return indices, scores
+        
+        for start in range(0, len(self), block_size):
+            rows = np.arange(start, min(start + block_size, len(self)))
+            jaccard = self.jaccard_from_common(self.common_ingredients(rows), rows)
+            jaccard[np.arange(len(rows)), rows] = -1.0
+            
+            candidates = np.argpartition(-jaccard, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(jaccard, candidates, axis=1)
+            order = np.lexsort((candidates, -candidate_scores), axis=1)
+            indices[rows] = np.take_along_axis(candidates, order, axis=1)
+            scores[rows] = np.take_along_axis(candidate_scores, order, axis=1)
+        return indices, scores
+    
+    def comparison(self, a: int, b: int) -> Dict[str, Any]:
+        stronger = int(np.sign(self.concentrations[a] - self.concentrations[b]))
+        better = int(self.better_for_skin_type("Oily", [a])[0, b])
+        return {
+            "stronger_formulation": {STRONGER_A: self.names[a], STRONGER_B: self.names[b]}.get(stronger, ""),
+            "price_difference": int(self.prices[a] - self.prices[b]),
+            "better_for_oily_skin": {BETTER_A: self.names[a], BETTER_B: self.names[b]}.get(better, "Neither")
+        }
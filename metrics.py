@@ -0,0 +1,165 @@
+import json
+import time
+import shutil
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from config import Config
+from utils import ensure_directory, logger
+
+def label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in key) + "}"
+
+class MetricsRegistry:
+    def __init__(self, max_events: int = None):
+        self.lock = threading.Lock()
+        self.max_events = max(1, Config.METRICS_MAX_EVENTS if max_events is None else max_events)
+        self.event_path: Optional[str] = None
+        self.event_file: Optional[TextIO] = None
+        self.reset()
+    
+    def reset(self) -> None:
+        with self.lock:
+            self.close_event_file()
+            self.events: deque = deque()
+            self.dropped_events = 0
+            self.counters: Dict[str, Dict[tuple, float]] = {}
+            self.summaries: Dict[str, Dict[tuple, Dict[str, float]]] = {}
+    
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            self.record_event({"ts": time.time(), "metric": name, "value": value, **labels})
+    
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = label_key(labels)
+        with self.lock:
+            series = self.summaries.setdefault(name, {})
+            stats = series.setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["max"] = max(stats["max"], value)
+            self.record_event({"ts": time.time(), "metric": name, "value": value, **labels})
+    
+    def record_event(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        if self.event_file is not None:
+            if len(self.events) >= self.max_events:
+                self.flush_events()
+        elif len(self.events) > self.max_events:
+            self.events.popleft()
+            self.dropped_events += 1
+    
+    def flush_events(self) -> None:
+        self.event_file.writelines(json.dumps(event, separators=(",", ":")) + "\n" for event in self.events)
+        self.event_file.flush()
+        self.events.clear()
+    
+    def close_event_file(self) -> None:
+        if self.event_file is not None:
+            self.event_file.close()
+        self.event_file = None
+        self.event_path = None
+    
+    def stream_events(self, path: str) -> None:
+        ensure_directory(Path(path).parent)
+        with self.lock:
+            self.close_event_file()
+            self.event_path = path
+            self.event_file = open(path, 'w')
+            self.flush_events()
+    
+    @contextmanager
+    def timer(self, name: str, **labels: Any):
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, status=status, **labels)
+    
+    def record_failure(self, agent: str, error: Exception) -> None:
+        if isinstance(error, json.JSONDecodeError):
+            self.increment("json_parse_failures_total", agent=agent)
+        elif isinstance(error, ValidationError):
+            self.increment("validation_failures_total", agent=agent)
+        else:
+            self.increment("agent_errors_total", agent=agent, error=type(error).__name__)
+    
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self.lock:
+            return self.counters.get(name, {}).get(label_key(labels), 0)
+    
+    def counter_total(self, name: str) -> float:
+        with self.lock:
+            return sum(self.counters.get(name, {}).values())
+    
+    def summary(self, name: str, **labels: Any) -> Dict[str, float]:
+        with self.lock:
+            return dict(self.summaries.get(name, {}).get(label_key(labels), {"count": 0, "sum": 0.0, "max": 0.0}))
+    
+    def to_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            for name in sorted(self.counters):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self.counters[name].items()):
+                    lines.append(f"{name}{format_labels(key)} {value:g}")
+            for name in sorted(self.summaries):
+                lines.append(f"# TYPE {name} summary")
+                for key, stats in sorted(self.summaries[name].items()):
+                    labels = format_labels(key)
+                    lines.append(f"{name}_count{labels} {stats['count']:g}")
+                    lines.append(f"{name}_sum{labels} {stats['sum']:.6f}")
+                    lines.append(f"{name}_max{labels} {stats['max']:.6f}")
+        return "\n".join(lines) + "\n"
+    
+    def write_jsonl(self, path: str) -> None:
+        with self.lock:
+            if self.event_file is not None:
+                self.flush_events()
+                if Path(self.event_path).resolve() != Path(path).resolve():
+                    ensure_directory(Path(path).parent)
+                    shutil.copyfile(self.event_path, path)
+                return
+            events = list(self.events)
+            dropped = self.dropped_events
+        if dropped:
+            logger.warning(f"Metrics buffer dropped the {dropped} oldest events")
+        ensure_directory(Path(path).parent)
+        with open(path, 'w') as f:
+            for event in events:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+    
+    def write_prometheus(self, path: str) -> None:
+        ensure_directory(Path(path).parent)
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus())
+    
+    def export(self, directory: str) -> None:
+        if not directory:
+            return
+        try:
+            self.write_jsonl(f"{directory}/metrics.jsonl")
+            self.write_prometheus(f"{directory}/metrics.prom")
+            logger.info(f"Metrics exported to {directory}/")
+        except Exception as e:
+            logger.error(f"Failed to export metrics: {e}")
+
+metrics = MetricsRegistry()
@@ -1,4 +1,6 @@
 import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -8,37 +10,80 @@ from agents.block_agent import BlockAgent
 from agents.comparison_agent import ComparisonAgent
 from agents.assembly_agent import AssemblyAgent
 from quality.quality_enforcer import QualityEnforcer
+from quality.near_duplicate import FAQStore
+from llm_cache import configure_llm_cache
+from llm_governor import (
+    LLMGovernor,
+    govern,
+    PRIORITY_PARSE,
+    PRIORITY_QUESTIONS,
+    PRIORITY_BLOCKS,
+    PRIORITY_COMPARISON
+)
+from incremental import ManifestStore, compute_fingerprint, compute_generation_key, PLAN_SKIP, PLAN_ASSEMBLE
+from checkpoints import CheckpointStore
+from competitor_pool import CompetitorPool
+from output_sink import open_sink
+from metrics import metrics
+from retry_policy import RetryBudget, RetryPolicy, ERROR_RECOVERABLE, ERROR_FATAL
 from config import Config
+from errors import RecoverableError, NonRecoverableError
 from utils import load_json_file, logger
 
-class RecoverableError(Exception):
-    pass
+FAQ_COUNT = 15
+MAX_QUALITY_ATTEMPTS = 3
 
-class NonRecoverableError(Exception):
-    pass
+def classify_quality_error(error: Exception) -> str:
+    return ERROR_RECOVERABLE if isinstance(error, RecoverableError) else ERROR_FATAL
 
 class PipelineOrchestrator:
-    def __init__(self):
+    def __init__(self, concurrent_stages: bool = None, incremental: bool = None, resume: bool = False, faq_repair: bool = None, stream_faqs: bool = None, competitor_pool: CompetitorPool = None, faq_store: FAQStore = None, output_sink=None):
         self.output_files = []
-        self.quality_enforcer = QualityEnforcer()
+        self.quality_enforcer = QualityEnforcer(faq_store)
+        self.concurrent_stages = Config.CONCURRENT_STAGES if concurrent_stages is None else concurrent_stages
+        self.incremental = Config.INCREMENTAL if incremental is None else incremental
+        self.resume = resume
+        self.faq_repair = Config.FAQ_REPAIR if faq_repair is None else faq_repair
+        self.stream_faqs = Config.STREAM_FAQS if stream_faqs is None else stream_faqs
+        self.competitor_pool = competitor_pool
+        self.quality_retry_budget = Config.QUALITY_RETRY_BUDGET
+        self.output_sink = output_sink
         
-    def initialize_agents(self):
+    def initialize_agents(self, llm=None):
         try:
-            Config.validate()
-            logger.info("Configuration validated")
+            if llm is None:
+                Config.validate()
+                logger.info("Configuration validated")
+                
+                configure_llm_cache()
+                
+                if self.competitor_pool is None:
+                    self.competitor_pool = CompetitorPool.from_config()
+                if self.quality_enforcer.store is None:
+                    self.quality_enforcer = QualityEnforcer(FAQStore.from_config())
+                
+                llm = ChatGoogleGenerativeAI(
+                    model=Config.MODEL_NAME,
+                    google_api_key=Config.GOOGLE_API_KEY,
+                    temperature=Config.TEMPERATURE
+                )
+                logger.info(f"Initialized LLM: {Config.MODEL_NAME}")
             
-            llm = ChatGoogleGenerativeAI(
-                model=Config.MODEL_NAME,
-                google_api_key=Config.GOOGLE_API_KEY,
-                temperature=Config.TEMPERATURE
-            )
-            logger.info(f"Initialized LLM: {Config.MODEL_NAME}")
+            self.governor = LLMGovernor.from_config() if Config.LLM_GOVERNOR_ENABLED else None
             
-            self.parser_agent = ProductParserAgent(llm, max_retries=Config.MAX_RETRIES)
-            self.question_agent = QuestionAgent(llm, max_retries=Config.MAX_RETRIES)
-            self.block_agent = BlockAgent(llm, max_retries=Config.MAX_RETRIES)
-            self.comparison_agent = ComparisonAgent(llm, max_retries=Config.MAX_RETRIES)
-            self.assembly_agent = AssemblyAgent()
+            self.parser_agent = ProductParserAgent(govern(llm, self.governor, PRIORITY_PARSE), max_retries=Config.MAX_RETRIES)
+            self.question_agent = QuestionAgent(govern(llm, self.governor, PRIORITY_QUESTIONS), max_retries=Config.MAX_RETRIES)
+            self.block_agent = BlockAgent(govern(llm, self.governor, PRIORITY_BLOCKS), max_retries=Config.MAX_RETRIES)
+            self.comparison_agent = ComparisonAgent(
+                govern(llm, self.governor, PRIORITY_COMPARISON),
+                max_retries=Config.MAX_RETRIES,
+                pool=self.competitor_pool
+            )
+            if self.output_sink is None:
+                self.output_sink = open_sink()
+            if self.incremental and not self.output_sink.writes_files:
+                raise NonRecoverableError("Incremental mode needs OUTPUT_SINK=files because manifests hash the output files")
+            self.assembly_agent = AssemblyAgent(sink=self.output_sink)
             logger.info("All agents initialized successfully")
             
         except Exception as e:
@@ -68,25 +113,47 @@ class PipelineOrchestrator:
             logger.error(f"Product parsing failed after retries: {e}")
             raise NonRecoverableError(f"Cannot parse product: {e}")
     
-    def generate_questions(self, product: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def generate_questions(self, product: Dict[str, Any], accepted: List[Dict[str, Any]] = None, prefetched: List[Dict[str, Any]] = None, fresh: bool = False) -> List[Dict[str, Any]]:
         try:
-            questions = self.question_agent.execute(product)
-            
-            if len(questions) != 15:
-                raise NonRecoverableError(f"FAQ count is {len(questions)}, must be exactly 15")
+            if self.stream_faqs and prefetched is None:
+                questions = self.stream_questions(product, accepted or [])
+                if len(questions) < FAQ_COUNT:
+                    raise RecoverableError(f"Streaming produced {len(questions)} of {FAQ_COUNT} acceptable questions", accepted=questions)
+            elif accepted:
+                needed = FAQ_COUNT - len(accepted)
+                logger.info(f"Repairing FAQ set: keeping {len(accepted)} questions, requesting {needed} replacements")
+                try:
+                    replacements = self.question_agent.execute(
+                        product,
+                        count=needed,
+                        exclude=[q['question'] for q in accepted]
+                    )
+                except RecoverableError as e:
+                    raise RecoverableError(str(e), accepted=accepted + e.accepted)
+                questions = accepted + replacements[:needed]
+            else:
+                if prefetched is not None:
+                    questions = prefetched
+                elif fresh:
+                    questions = self.question_agent.execute(product, fresh=True)
+                else:
+                    questions = self.question_agent.execute(product)
+                
+                if len(questions) != FAQ_COUNT:
+                    raise NonRecoverableError(f"FAQ count is {len(questions)}, must be exactly {FAQ_COUNT}")
             
-            deduplicated = self.quality_enforcer.deduplicate_questions(questions)
+            deduplicated = self.quality_enforcer.deduplicate_questions(questions, product.get('name'))
+            scored_questions = self.quality_enforcer.score_questions(deduplicated)
+            passing = [q for q in scored_questions if q['quality_passed']]
             
-            if len(deduplicated) < 15:
+            if len(deduplicated) < FAQ_COUNT:
                 logger.warning(f"Deduplication reduced count to {len(deduplicated)}, regenerating...")
-                raise RecoverableError("Question deduplication failed count check")
-            
-            scored_questions = self.quality_enforcer.score_questions(deduplicated)
+                raise RecoverableError("Question deduplication failed count check", accepted=passing)
             
-            low_quality = [q for q in scored_questions if q['quality_score'] < 50]
+            low_quality = [q for q in scored_questions if not q['quality_passed']]
             if low_quality:
                 logger.warning(f"Found {len(low_quality)} low quality questions")
-                raise RecoverableError("Low quality questions detected")
+                raise RecoverableError("Low quality questions detected", accepted=passing)
             
             logger.info(f"Generated and validated {len(deduplicated)} high-quality questions")
             return deduplicated
@@ -98,19 +165,90 @@ class PipelineOrchestrator:
             logger.error(f"Question generation failed: {e}")
             raise NonRecoverableError(f"Cannot generate questions: {e}")
     
-    def generate_blocks(self, product: Dict[str, Any]) -> Dict[str, Any]:
+    def stream_questions(self, product: Dict[str, Any], accepted: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        seen = self.quality_enforcer.duplicate_index(accepted, product.get('name'))
+        streamed = self.question_agent.stream(
+            product,
+            count=FAQ_COUNT - len(accepted),
+            exclude=[q['question'] for q in accepted],
+            check=lambda question: self.quality_enforcer.check_question(question, seen, product.get('name'))
+        )
+        return accepted + streamed
+    
+    def quality_policy(self, retry_metric: str, budget: RetryBudget = None) -> RetryPolicy:
+        return RetryPolicy(
+            max_attempts=MAX_QUALITY_ATTEMPTS,
+            classify=classify_quality_error,
+            retry_metric=retry_metric,
+            budget=budget
+        )
+    
+    def generate_validated_questions(self, product: Dict[str, Any], prefetched: List[Dict[str, Any]] = None, budget: RetryBudget = None) -> List[Dict[str, Any]]:
+        policy = self.quality_policy("faq_quality_retries_total", budget)
+        attempts = []
+        
+        def attempt(state):
+            attempts.append(state.attempt)
+            if state.attempt == 1 and prefetched is not None:
+                return self.generate_questions(product, prefetched=prefetched)
+            accepted = state.error.accepted if isinstance(state.error, RecoverableError) else []
+            return self.generate_questions(product, accepted if self.faq_repair else None, fresh=state.attempt > 1)
+        
+        try:
+            questions = policy.call(attempt, "QualityEnforcer")
+        except RecoverableError as e:
+            raise NonRecoverableError(f"Quality enforcement failed: {e}")
+        
+        if len(attempts) > 1 and not self.stream_faqs:
+            self.question_agent.remember(product, questions)
+        self.quality_enforcer.remember(product.get('name'), questions)
+        return questions
+    
+    def generate_blocks(self, product: Dict[str, Any], prefetched: Dict[str, Any] = None, budget: RetryBudget = None) -> Dict[str, Any]:
+        blocks = {}
+        
+        def attempt(state):
+            if not blocks:
+                blocks.update(self.block_agent.execute(product) if prefetched is None else prefetched)
+            else:
+                feedback = f"Your previous usage_block was rejected: {state.error}. Write a complete usage instruction."
+                blocks["usage_block"] = self.block_agent.usage_block(product, feedback)
+            
+            failed = self.quality_enforcer.failed_rules("blocks", blocks)
+            if not failed:
+                return dict(blocks)
+            if {rule.field for rule in failed} != {"usage_block"} or not self.block_agent.usage_llm:
+                raise NonRecoverableError(f"Content blocks failed quality gates: {', '.join(rule.name for rule in failed)}")
+            raise RecoverableError("; ".join(rule.message for rule in failed))
+        
         try:
-            blocks = self.block_agent.execute(product)
+            result = self.quality_policy("block_quality_retries_total", budget).call(attempt, "BlockQualityGate")
             logger.info("Content blocks created successfully")
-            return blocks
+            return result
             
+        except NonRecoverableError:
+            raise
         except Exception as e:
             logger.error(f"Block generation failed: {e}")
             raise NonRecoverableError(f"Cannot generate blocks: {e}")
     
-    def generate_comparison(self, product: Dict[str, Any]) -> tuple:
+    def generate_comparison(self, product: Dict[str, Any], budget: RetryBudget = None) -> tuple:
+        rejected = []
+        
+        def attempt(state):
+            feedback = ""
+            if rejected:
+                feedback = f"Do not reuse {', '.join(rejected)}: {state.error}. Create a different competitor with a different price and concentration."
+            product_b, comparison = self.comparison_agent.execute(product, exclude=rejected, feedback=feedback)
+            
+            failed = self.quality_enforcer.failed_rules("comparison", comparison, logger.warning)
+            if failed:
+                rejected.append(product_b['name'])
+                raise RecoverableError("; ".join(rule.message for rule in failed))
+            return product_b, comparison
+        
         try:
-            product_b, comparison = self.comparison_agent.execute(product)
+            product_b, comparison = self.quality_policy("comparison_quality_retries_total", budget).call(attempt, "ComparisonQualityGate")
             logger.info("Comparison generated successfully")
             return product_b, comparison
             
@@ -118,90 +256,208 @@ class PipelineOrchestrator:
             logger.error(f"Comparison generation failed: {e}")
             raise NonRecoverableError(f"Cannot generate comparison: {e}")
     
-    def assemble_outputs(self, parsed_product, questions, blocks, product_b, comparison):
-        output_paths = {
-            'faq': f"{Config.OUTPUT_DIR}/faq.json",
-            'product': f"{Config.OUTPUT_DIR}/product_page.json",
-            'comparison': f"{Config.OUTPUT_DIR}/comparison_page.json"
+    def run_checkpointed(self, checkpoints: CheckpointStore, stage: str, generate, product: Dict[str, Any]):
+        if checkpoints is not None:
+            stored = checkpoints.load(stage)
+            if stored is not None:
+                logger.info(f"Resuming {stage} from checkpoint")
+                return stored
+        
+        with metrics.timer("pipeline_stage_seconds", stage=stage):
+            result = generate(product)
+        
+        if checkpoints is not None:
+            checkpoints.save(stage, result)
+        return result
+    
+    def generate_content(self, product: Dict[str, Any], checkpoints: CheckpointStore = None, prefetched: Dict[str, Any] = None) -> tuple:
+        prefetched = prefetched or {}
+        budget = RetryBudget(self.quality_retry_budget)
+        stages = [
+            ("questions", lambda p: self.generate_validated_questions(p, prefetched.get("questions"), budget)),
+            ("blocks", lambda p: self.generate_blocks(p, prefetched.get("blocks"), budget)),
+            ("comparison", lambda p: self.generate_comparison(p, budget))
+        ]
+        
+        if not self.concurrent_stages:
+            questions, blocks, (product_b, comparison) = [
+                self.run_checkpointed(checkpoints, stage, generate, product) for stage, generate in stages
+            ]
+            return questions, blocks, product_b, comparison
+        
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="stage")
+        try:
+            futures = [
+                executor.submit(self.run_checkpointed, checkpoints, stage, generate, product)
+                for stage, generate in stages
+            ]
+            logger.info("Question, block and comparison stages running concurrently")
+            
+            questions, blocks, (product_b, comparison) = [future.result() for future in futures]
+            return questions, blocks, product_b, comparison
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def get_output_paths(self, output_dir: str = None) -> Dict[str, str]:
+        output_dir = output_dir or Config.OUTPUT_DIR
+        return {
+            'faq': f"{output_dir}/faq.json",
+            'product': f"{output_dir}/product_page.json",
+            'comparison': f"{output_dir}/comparison_page.json"
         }
+    
+    def assemble_outputs(self, parsed_product, questions, blocks, product_b, comparison, output_dir: str = None) -> List[str]:
+        output_paths = self.get_output_paths(output_dir)
         
         self.output_files = list(output_paths.values())
         
         try:
-            self.assembly_agent.assemble_faq(
-                questions,
-                f"{Config.TEMPLATES_DIR}/faq_template.json",
-                output_paths['faq']
-            )
-            
-            self.assembly_agent.assemble_product(
-                parsed_product,
-                blocks,
-                f"{Config.TEMPLATES_DIR}/product_template.json",
-                output_paths['product']
-            )
-            
-            self.assembly_agent.assemble_comparison(
-                parsed_product,
-                product_b,
-                comparison,
-                f"{Config.TEMPLATES_DIR}/comparison_template.json",
-                output_paths['comparison']
-            )
+            outputs = {
+                output_paths['faq']: self.assembly_agent.build_faq(
+                    questions,
+                    f"{Config.TEMPLATES_DIR}/faq_template.json"
+                ),
+                output_paths['product']: self.assembly_agent.build_product(
+                    parsed_product,
+                    blocks,
+                    f"{Config.TEMPLATES_DIR}/product_template.json"
+                ),
+                output_paths['comparison']: self.assembly_agent.build_comparison(
+                    parsed_product,
+                    product_b,
+                    comparison,
+                    f"{Config.TEMPLATES_DIR}/comparison_template.json"
+                )
+            }
             
+            self.assembly_agent.sink.write_many(outputs)
             logger.info("All outputs assembled and validated successfully")
+            return list(output_paths.values())
             
         except Exception as e:
             logger.error(f"Assembly failed: {e}")
             raise NonRecoverableError(f"Cannot assemble outputs: {e}")
     
-    def cleanup_outputs(self):
-        for output_file in self.output_files:
+    def cleanup_outputs(self, output_files: List[str] = None):
+        for output_file in (self.output_files if output_files is None else output_files):
             if Path(output_file).exists():
                 Path(output_file).unlink()
                 logger.info(f"Cleaned up: {output_file}")
     
+    def close_outputs(self):
+        if self.output_sink is not None:
+            self.output_sink.close()
+    
+    def abort_outputs(self):
+        try:
+            self.close_outputs()
+        except Exception as e:
+            logger.error(f"Closing outputs after a failure also failed: {e}")
+        self.cleanup_outputs()
+    
+    def get_prompt_templates(self) -> List[str]:
+        agents = [getattr(self, name, None) for name in ('parser_agent', 'question_agent', 'block_agent', 'comparison_agent')]
+        return [str(getattr(getattr(agent, 'prompt', None), 'template', '')) for agent in agents]
+    
+    def prefetch_content(self, raw_products: Dict[str, Dict[str, Any]], batch_size: int = None) -> Dict[str, Dict[str, Any]]:
+        parsed = {}
+        for product_id, raw_product in raw_products.items():
+            product = self.parser_agent.normalize(raw_product) if self.parser_agent.fast_path else None
+            if product is not None:
+                parsed[product_id] = product
+        if not parsed:
+            return {}
+        
+        with metrics.timer("pipeline_stage_seconds", stage="batched_prefetch"):
+            questions = self.question_agent.execute_batch(parsed, count=FAQ_COUNT, batch_size=batch_size)
+            blocks = self.block_agent.execute_batch(parsed, batch_size=batch_size)
+        
+        prefetched = {product_id: {} for product_id in parsed}
+        for product_id in parsed:
+            if product_id in questions:
+                prefetched[product_id]["questions"] = questions[product_id]
+            if product_id in blocks:
+                prefetched[product_id]["blocks"] = blocks[product_id]
+        logger.info(f"Batched prompts prefetched content for {len(parsed)} of {len(raw_products)} products")
+        return prefetched
+    
+    def process_product(self, raw_product: Dict[str, Any], output_dir: str = None, prefetched: Dict[str, Any] = None) -> List[str]:
+        output_dir = output_dir or Config.OUTPUT_DIR
+        prompt_templates = self.get_prompt_templates()
+        checkpoints = CheckpointStore(output_dir, compute_generation_key(raw_product, prompt_templates))
+        manifest = ManifestStore(output_dir) if self.incremental else None
+        
+        if manifest:
+            fingerprint = compute_fingerprint(raw_product, prompt_templates)
+            plan = manifest.plan(fingerprint)
+            
+            if plan == PLAN_SKIP:
+                logger.info(f"Inputs unchanged, skipping generation for {output_dir}")
+                return manifest.output_files()
+            
+            stored = checkpoints.load_all()
+            if plan == PLAN_ASSEMBLE and len(stored) == len(CheckpointStore.STAGES):
+                logger.info(f"Only templates changed, re-assembling {output_dir} from stored results")
+                product_b, comparison = stored["comparison"]
+                outputs = self.assemble_outputs(
+                    stored["parsed_product"], stored["questions"], stored["blocks"], product_b, comparison, output_dir
+                )
+                self.assembly_agent.sink.flush()
+                manifest.save(fingerprint, outputs)
+                return outputs
+        
+        if not self.resume:
+            checkpoints.clear()
+        
+        parsed_product = self.run_checkpointed(checkpoints, "parsed_product", self.parse_product, raw_product)
+        
+        questions, blocks, product_b, comparison = self.generate_content(parsed_product, checkpoints, prefetched)
+        
+        with metrics.timer("pipeline_stage_seconds", stage="assembly"):
+            outputs = self.assemble_outputs(parsed_product, questions, blocks, product_b, comparison, output_dir)
+        
+        self.assembly_agent.sink.flush()
+        if manifest:
+            manifest.save(fingerprint, outputs)
+        else:
+            checkpoints.clear()
+        
+        return outputs
+    
     def run(self, input_path: str):
         try:
             self.initialize_agents()
             
             raw_product = self.load_input(input_path)
             
-            parsed_product = self.parse_product(raw_product)
-            
-            max_quality_attempts = 3
-            for attempt in range(max_quality_attempts):
-                try:
-                    questions = self.generate_questions(parsed_product)
-                    break
-                except RecoverableError as e:
-                    if attempt == max_quality_attempts - 1:
-                        raise NonRecoverableError(f"Quality enforcement failed after {max_quality_attempts} attempts")
-                    logger.warning(f"Quality attempt {attempt + 1} failed, retrying...")
-                    continue
-            
-            blocks = self.generate_blocks(parsed_product)
-            
-            product_b, comparison = self.generate_comparison(parsed_product)
-            
-            self.assemble_outputs(parsed_product, questions, blocks, product_b, comparison)
+            self.process_product(raw_product)
+            self.close_outputs()
             
             logger.info(f"Pipeline completed successfully. Outputs in {Config.OUTPUT_DIR}/")
             return True
             
         except NonRecoverableError as e:
             logger.error(f"NON-RECOVERABLE ERROR: {e}")
-            self.cleanup_outputs()
+            self.abort_outputs()
             return False
             
         except Exception as e:
             logger.error(f"UNEXPECTED ERROR: {e}", exc_info=True)
-            self.cleanup_outputs()
+            self.abort_outputs()
             return False
 
 def main():
-    orchestrator = PipelineOrchestrator()
-    success = orchestrator.run(Config.INPUT_FILE)
+    parser = argparse.ArgumentParser(description="Generate content pages for a single product")
+    parser.add_argument("--input", default=Config.INPUT_FILE, help="Path to the product JSON file")
+    parser.add_argument("--incremental", action="store_true", default=None, help="Skip generation when inputs, templates, prompts and model are unchanged")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last completed stage of a failed run")
+    args = parser.parse_args()
+    if Config.METRICS_DIR:
+        metrics.stream_events(f"{Config.METRICS_DIR}/metrics.jsonl")
+    
+    orchestrator = PipelineOrchestrator(incremental=args.incremental, resume=args.resume)
+    success = orchestrator.run(args.input)
+    metrics.export(Config.METRICS_DIR)
     
     if not success:
         sys.exit(1)
@@ -0,0 +1,315 @@
+import io
+import json
+import time
+import queue
+import sqlite3
+import tarfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import Config
+from metrics import metrics
+from utils import ensure_directory, write_atomic, logger
+
+SINK_FILES = "files"
+SINK_JSONL = "jsonl"
+SINK_SQLITE = "sqlite"
+SINK_TAR = "tar"
+
+SHARD_PATTERN = "outputs-*.jsonl"
+SQLITE_BUNDLE = "outputs.sqlite"
+TAR_BUNDLE = "outputs.tar"
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+Record = Tuple[str, bytes]
+
+class OutputWriteError(RuntimeError):
+    def __init__(self, error: Exception, paths: List[str]):
+        super().__init__(f"Output writer failed after {len(paths)} unwritten pages ({', '.join(paths)}): {error}")
+        self.error = error
+        self.paths = paths
+
+def encode_json(data: Any, indent: Optional[int] = None) -> bytes:
+    if not indent:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, indent=indent).encode("utf-8")
+
+class OutputSink:
+    name = "sink"
+    writes_files = False
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.lock = threading.Lock()
+        self.closed = False
+    
+    def key(self, path: str) -> str:
+        try:
+            return Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+    
+    def encode(self, data: Any) -> bytes:
+        return encode_json(data)
+    
+    def write(self, path: str, data: Any) -> None:
+        self.write_many({path: data})
+    
+    def write_many(self, outputs: Dict[str, Any]) -> None:
+        self.write_records([(path, self.encode(data)) for path, data in outputs.items()])
+    
+    def write_records(self, records: List[Record]) -> None:
+        with self.lock:
+            if self.closed:
+                raise RuntimeError(f"Output sink {self.root} is closed")
+            self.store(records)
+        metrics.increment("output_records_total", len(records), sink=self.name)
+        metrics.increment("output_bytes_total", sum(len(payload) for _, payload in records), sink=self.name)
+    
+    def store(self, records: List[Record]) -> None:
+        raise NotImplementedError
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.finish()
+    
+    def finish(self) -> None:
+        pass
+
+class FileSink(OutputSink):
+    name = SINK_FILES
+    writes_files = True
+    
+    def __init__(self, root: str = "", indent: Optional[int] = 4, fsync: bool = False):
+        super().__init__(root)
+        self.indent = indent
+        self.fsync = fsync
+    
+    def encode(self, data: Any) -> bytes:
+        return encode_json(data, self.indent)
+    
+    def write_records(self, records: List[Record]) -> None:
+        for path, payload in records:
+            write_atomic(path, payload, self.fsync)
+            logger.info(f"Saved output to {path}")
+        metrics.increment("output_records_total", len(records), sink=self.name)
+        metrics.increment("output_bytes_total", sum(len(payload) for _, payload in records), sink=self.name)
+
+class JSONLSink(OutputSink):
+    name = SINK_JSONL
+    
+    def __init__(self, root: str, shard_size: int = 10000):
+        super().__init__(root)
+        self.shard_size = max(1, shard_size)
+        self.shard_number = len(list(self.root.glob(SHARD_PATTERN)))
+        self.shard_records = 0
+        self.file = None
+    
+    def open_shard(self) -> None:
+        ensure_directory(self.root)
+        shard = self.root / f"outputs-{self.shard_number:05d}.jsonl"
+        self.file = open(shard, 'ab', buffering=WRITE_BUFFER_BYTES)
+        self.shard_number += 1
+        self.shard_records = 0
+        logger.info(f"Writing outputs to {shard}")
+    
+    def store(self, records: List[Record]) -> None:
+        for path, payload in records:
+            if self.file is None or self.shard_records >= self.shard_size:
+                self.finish()
+                self.open_shard()
+            self.file.write(b'{"path":' + json.dumps(self.key(path)).encode("utf-8") + b',"data":' + payload + b'}\n')
+            self.shard_records += 1
+    
+    def flush(self) -> None:
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+    
+    def finish(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class SQLiteSink(OutputSink):
+    name = SINK_SQLITE
+    
+    def __init__(self, root: str, commit_records: int = 500):
+        super().__init__(root)
+        self.path = self.root / SQLITE_BUNDLE
+        self.commit_records = max(1, commit_records)
+        self.pending = 0
+        
+        ensure_directory(self.root)
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            "path TEXT PRIMARY KEY, data TEXT NOT NULL, written_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+    
+    def store(self, records: List[Record]) -> None:
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO outputs (path, data, written_at) VALUES (?, ?, ?)",
+            [(self.key(path), payload.decode("utf-8"), now) for path, payload in records]
+        )
+        self.pending += len(records)
+        if self.pending >= self.commit_records:
+            self.connection.commit()
+            self.pending = 0
+    
+    def flush(self) -> None:
+        with self.lock:
+            if not self.closed:
+                self.connection.commit()
+                self.pending = 0
+    
+    def finish(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+        logger.info(f"Saved outputs to {self.path}")
+
+class TarSink(OutputSink):
+    name = SINK_TAR
+    
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.path = self.root / TAR_BUNDLE
+        self.temp_path = self.root / f".{TAR_BUNDLE}.tmp"
+        
+        ensure_directory(self.root)
+        self.file = open(self.temp_path, 'wb', buffering=WRITE_BUFFER_BYTES)
+        self.archive = tarfile.open(fileobj=self.file, mode='w', format=tarfile.PAX_FORMAT)
+    
+    def store(self, records: List[Record]) -> None:
+        now = time.time()
+        for path, payload in records:
+            member = tarfile.TarInfo(self.key(path))
+            member.size = len(payload)
+            member.mtime = now
+            self.archive.addfile(member, io.BytesIO(payload))
+    
+    def finish(self) -> None:
+        self.archive.close()
+        self.file.close()
+        self.temp_path.replace(self.path)
+        logger.info(f"Saved outputs to {self.path}")
+
+class BackgroundWriter:
+    def __init__(self, sink: OutputSink, max_pending: int = 256):
+        self.sink = sink
+        self.writes_files = sink.writes_files
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self.error: Optional[Exception] = None
+        self.failed_paths: List[str] = []
+        self.closed = False
+        self.thread = threading.Thread(target=self.drain, name="output-writer", daemon=True)
+        self.thread.start()
+    
+    def write(self, path: str, data: Any) -> None:
+        self.write_many({path: data})
+    
+    def write_many(self, outputs: Dict[str, Any]) -> None:
+        if self.closed:
+            raise RuntimeError(f"Output sink {self.sink.root} is closed")
+        self.raise_error()
+        records = [(path, self.sink.encode(data)) for path, data in outputs.items()]
+        with metrics.timer("output_queue_wait_seconds", sink=self.sink.name):
+            self.queue.put(records)
+    
+    def drain(self) -> None:
+        while True:
+            records = self.queue.get()
+            try:
+                if records is None:
+                    return
+                if self.error is None:
+                    self.sink.write_records(records)
+                else:
+                    self.failed_paths.extend(path for path, _ in records)
+            except Exception as e:
+                logger.error(f"Background output write failed: {e}")
+                self.error = e
+                self.failed_paths.extend(path for path, _ in records)
+            finally:
+                self.queue.task_done()
+    
+    def raise_error(self) -> None:
+        if self.error is not None:
+            raise OutputWriteError(self.error, list(self.failed_paths)) from self.error
+    
+    def flush(self) -> None:
+        self.queue.join()
+        self.raise_error()
+        self.sink.flush()
+    
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.queue.put(None)
+            self.thread.join()
+            self.sink.close()
+        self.raise_error()
+
+def open_sink(output_dir: str = None, kind: str = None, background: bool = None):
+    output_dir = output_dir or Config.OUTPUT_DIR
+    kind = kind or Config.OUTPUT_SINK
+    
+    if kind == SINK_FILES:
+        sink = FileSink(output_dir, indent=Config.OUTPUT_JSON_INDENT, fsync=Config.OUTPUT_FSYNC)
+    elif kind == SINK_JSONL:
+        sink = JSONLSink(output_dir, Config.OUTPUT_SHARD_SIZE)
+    elif kind == SINK_SQLITE:
+        sink = SQLiteSink(output_dir, Config.OUTPUT_COMMIT_RECORDS)
+    elif kind == SINK_TAR:
+        sink = TarSink(output_dir)
+    else:
+        raise ValueError(f"Unknown output sink: {kind}")
+    
+    background = Config.OUTPUT_BACKGROUND if background is None else background
+    logger.info(f"Writing outputs with the {kind} sink{' in the background' if background else ''}")
+    return BackgroundWriter(sink, Config.OUTPUT_QUEUE_SIZE) if background else sink
+
+def iter_jsonl_outputs(directory: Path) -> Iterator[Tuple[str, Any]]:
+    for shard in sorted(directory.glob(SHARD_PATTERN)):
+        with open(shard, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn record on line {line_number} of {shard}")
+                    continue
+                yield record["path"], record["data"]
+
+def read_outputs(location: str) -> Dict[str, Any]:
+    path = Path(location)
+    if path.is_dir():
+        return dict(iter_jsonl_outputs(path))
+    
+    if path.suffix == ".sqlite":
+        connection = sqlite3.connect(str(path))
+        try:
+            rows = connection.execute("SELECT path, data FROM outputs").fetchall()
+        finally:
+            connection.close()
+        return {key: json.loads(data) for key, data in rows}
+    
+    if path.suffix == ".tar":
+        outputs = {}
+        with tarfile.open(path, 'r') as archive:
+            for member in archive.getmembers():
+                outputs[member.name] = json.loads(archive.extractfile(member).read())
+        return outputs
+    
+    raise ValueError(f"Unknown output bundle: {location}")
@@ -0,0 +1,68 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+from langchain.output_parsers import PydanticOutputParser
+from config import Config
+from metrics import metrics
+from utils import logger
+
+CHARS_PER_TOKEN = 4
+TRIMMABLE_FIELDS = ("ingredients", "benefits")
+
+def serialize_compact(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+@lru_cache(maxsize=None)
+def get_format_instructions(schema) -> str:
+    return PydanticOutputParser(pydantic_object=schema).get_format_instructions()
+
+class PromptRenderer:
+    def __init__(self, prompt, name: str, token_budget: int = None, trimmable_fields: Tuple[str, ...] = TRIMMABLE_FIELDS):
+        self.prompt = prompt
+        self.name = name
+        self.token_budget = Config.PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+        self.trimmable_fields = trimmable_fields
+    
+    def count_tokens(self, variables: Dict[str, Any]) -> int:
+        return estimate_tokens(self.prompt.format(**variables))
+    
+    def trim_longest_list(self, payload: Dict[str, Any]) -> bool:
+        candidates = [
+            field for field in self.trimmable_fields
+            if isinstance(payload.get(field), list) and len(payload[field]) > 1
+        ]
+        if not candidates:
+            return False
+        longest = max(candidates, key=lambda field: len(payload[field]))
+        payload[longest] = payload[longest][:-1]
+        return True
+    
+    def fit(self, payload_variable: str, payload: Any, **variables: Any) -> Tuple[Dict[str, Any], int, int]:
+        variables[payload_variable] = serialize_compact(payload)
+        tokens = self.count_tokens(variables)
+        trimmed = 0
+        
+        if self.token_budget and tokens > self.token_budget and isinstance(payload, dict):
+            payload = dict(payload)
+            while tokens > self.token_budget and self.trim_longest_list(payload):
+                trimmed += 1
+                variables[payload_variable] = serialize_compact(payload)
+                tokens = self.count_tokens(variables)
+        
+        return variables, tokens, trimmed
+    
+    def render(self, payload_variable: str, payload: Any, **variables: Any) -> Dict[str, Any]:
+        variables, tokens, trimmed = self.fit(payload_variable, payload, **variables)
+        
+        if trimmed:
+            logger.info(f"{self.name} prompt trimmed by {trimmed} list items to ~{tokens} tokens")
+        if self.token_budget and tokens > self.token_budget:
+            logger.warning(f"{self.name} prompt is ~{tokens} tokens, over the {self.token_budget} token budget")
+        
+        metrics.observe("llm_prompt_tokens", tokens, agent=self.name)
+        if trimmed:
+            metrics.increment("prompt_trimmed_items_total", trimmed, agent=self.name)
+        return variables
@@ -0,0 +1,222 @@
+import re
+import json
+import zlib
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from config import Config
+from utils import ensure_directory, write_atomic, logger
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+HASH_SEED = 1
+STOPWORDS = frozenset(
+    "a an the is are am be was were been do does did i me my we our you your it its this that these those "
+    "to of in on at by for from with and or can could should would will shall may might must there any some "
+    "key main need".split()
+)
+
+def stem(token: str) -> str:
+    return token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+
+def name_tokens(name: Optional[str]) -> FrozenSet[str]:
+    return frozenset(stem(token) for token in TOKEN_PATTERN.findall((name or "").lower()))
+
+def content_tokens(text: str, ignore: FrozenSet[str] = frozenset()) -> List[str]:
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    content = [stem(token) for token in tokens if token not in STOPWORDS and stem(token) not in ignore]
+    return content or [stem(token) for token in tokens]
+
+def number_tokens(text: str) -> FrozenSet[str]:
+    return frozenset(token for token in TOKEN_PATTERN.findall(text.lower()) if token.isdigit())
+
+def shingles(text: str, size: int, mode: str = "word", ignore: FrozenSet[str] = frozenset()) -> FrozenSet[str]:
+    words = content_tokens(text, ignore)
+    if mode == "word":
+        return frozenset(" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1)))
+    normalized = " ".join(words)
+    return frozenset(normalized[i:i + size] for i in range(max(1, len(normalized) - size + 1)))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+class MinHasher:
+    def __init__(self, num_perm: int = None, shingle_size: int = None, mode: str = None, seed: int = HASH_SEED):
+        self.num_perm = Config.NEAR_DUPLICATE_NUM_PERM if num_perm is None else num_perm
+        self.shingle_size = Config.NEAR_DUPLICATE_SHINGLE_SIZE if shingle_size is None else shingle_size
+        self.mode = Config.NEAR_DUPLICATE_SHINGLES if mode is None else mode
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(1, 2 ** 63, self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self.increments = rng.integers(0, 2 ** 63, self.num_perm, dtype=np.uint64)
+    
+    def features(self, text: str, ignore: FrozenSet[str] = frozenset()) -> FrozenSet[str]:
+        return shingles(text, self.shingle_size, self.mode, ignore)
+    
+    def signature(self, features: FrozenSet[str]) -> np.ndarray:
+        hashes = np.array([zlib.crc32(feature.encode("utf-8")) for feature in features], dtype=np.uint64)
+        permuted = (hashes[:, None] * self.multipliers[None, :] + self.increments[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = None, hasher: MinHasher = None):
+        self.threshold = Config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        self.hasher = hasher or MinHasher()
+        self.bands, self.rows = choose_bands(self.hasher.num_perm, self.threshold)
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self.keys: List[str] = []
+        self.texts: List[str] = []
+        self.numbers: List[FrozenSet[str]] = []
+        self.features: List[FrozenSet[str]] = []
+        self.signatures: List[np.ndarray] = []
+        self.positions: Dict[str, List[int]] = {}
+        self.removed: Set[int] = set()
+    
+    def band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def query(self, signature: np.ndarray, features: FrozenSet[str], numbers: FrozenSet[str], exclude_key: Optional[str] = None) -> Optional[Tuple[str, str, float]]:
+        candidates = set()
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        
+        best = None
+        for position in candidates:
+            if position in self.removed or self.numbers[position] != numbers or (exclude_key is not None and self.keys[position] == exclude_key):
+                continue
+            similarity = jaccard(self.features[position], features)
+            if similarity >= self.threshold and (best is None or similarity > best[2]):
+                best = (self.keys[position], self.texts[position], similarity)
+        return best
+    
+    def insert(self, key: str, text: str, signature: np.ndarray, features: FrozenSet[str]) -> None:
+        position = len(self.signatures)
+        self.keys.append(key)
+        self.texts.append(text)
+        self.numbers.append(number_tokens(text))
+        self.features.append(features)
+        self.signatures.append(signature)
+        self.positions.setdefault(key, []).append(position)
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            bucket.setdefault(band_key, []).append(position)
+    
+    def texts_of(self, key: str) -> List[str]:
+        return [self.texts[position] for position in self.positions.get(key, ())]
+    
+    def remove_key(self, key: str) -> None:
+        self.removed.update(self.positions.pop(key, ()))
+    
+    def compact(self) -> None:
+        live = [
+            (self.keys[position], self.texts[position], self.signatures[position], self.features[position])
+            for position in range(len(self.signatures)) if position not in self.removed
+        ]
+        self.buckets = [{} for _ in range(self.bands)]
+        self.keys, self.texts, self.numbers, self.features, self.signatures = [], [], [], [], []
+        self.positions = {}
+        self.removed = set()
+        for entry in live:
+            self.insert(*entry)
+    
+    def find(self, text: str, exclude_key: Optional[str] = None, ignore: FrozenSet[str] = frozenset()) -> Optional[Tuple[str, str, float]]:
+        features = self.hasher.features(text, ignore)
+        return self.query(self.hasher.signature(features), features, number_tokens(text), exclude_key)
+    
+    def add(self, key: str, text: str, ignore: FrozenSet[str] = frozenset()) -> None:
+        features = self.hasher.features(text, ignore)
+        self.insert(key, text, self.hasher.signature(features), features)
+    
+    def __len__(self) -> int:
+        return len(self.signatures) - len(self.removed)
+
+class FAQStore(NearDuplicateIndex):
+    def __init__(self, path: str, threshold: float = None, hasher: MinHasher = None):
+        super().__init__(threshold, hasher)
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.load()
+    
+    @classmethod
+    def from_config(cls) -> Optional["FAQStore"]:
+        if not Config.FAQ_STORE_ENABLED:
+            return None
+        return cls(Config.FAQ_STORE_PATH)
+    
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if record.get("cleared"):
+                        self.remove_key(record["key"])
+                        continue
+                    signature = np.array(record["signature"], dtype=np.uint32)
+                    if len(signature) != self.hasher.num_perm:
+                        raise ValueError(f"expected {self.hasher.num_perm} hashes, got {len(signature)}")
+                    self.insert(record["key"], record["question"], signature, self.hasher.features(record["question"], name_tokens(record["key"])))
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Skipping invalid FAQ on line {line_number} of {self.path}: {e}")
+        if self.removed:
+            self.compact()
+            self.rewrite()
+        logger.info(f"Loaded {len(self)} FAQs from {self.path}")
+    
+    def query(self, signature: np.ndarray, features: FrozenSet[str], numbers: FrozenSet[str], exclude_key: Optional[str] = None) -> Optional[Tuple[str, str, float]]:
+        with self.lock:
+            return super().query(signature, features, numbers, exclude_key)
+    
+    def record(self, position: int) -> Dict[str, Any]:
+        return {"key": self.keys[position], "question": self.texts[position], "signature": self.signatures[position].tolist()}
+    
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        ensure_directory(self.path.parent)
+        with open(self.path, 'a') as f:
+            f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    
+    def rewrite(self) -> None:
+        lines = [json.dumps(self.record(position), ensure_ascii=False) + "\n" for position in range(len(self.signatures))]
+        write_atomic(str(self.path), "".join(lines).encode("utf-8"))
+        logger.info(f"Compacted {self.path} to {len(lines)} FAQs")
+    
+    def entry(self, key: str, text: str) -> Tuple[str, str, np.ndarray, FrozenSet[str]]:
+        features = self.hasher.features(text, name_tokens(key))
+        return key, text, self.hasher.signature(features), features
+    
+    def add(self, key: str, text: str) -> None:
+        entry = self.entry(key, text)
+        with self.lock:
+            if text in self.texts_of(key):
+                return
+            self.insert(*entry)
+            self.append([self.record(len(self.signatures) - 1)])
+    
+    def replace(self, key: str, texts: List[str]) -> None:
+        entries = [self.entry(key, text) for text in dict.fromkeys(texts)]
+        with self.lock:
+            if set(self.texts_of(key)) == {entry[1] for entry in entries}:
+                return
+            
+            records = []
+            if key in self.positions:
+                self.remove_key(key)
+                records.append({"key": key, "cleared": True})
+            for entry in entries:
+                self.insert(*entry)
+                records.append(self.record(len(self.signatures) - 1))
+            
+            if len(self.removed) > len(self):
+                self.compact()
+                self.rewrite()
+            else:
+                self.append(records)
@@ -1,92 +1,105 @@
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from schemas import Question
+from metrics import metrics
+from quality.near_duplicate import FAQStore, MinHasher, NearDuplicateIndex, name_tokens, number_tokens
+from quality.rule_engine import QualityRules, Rule
 from utils import logger
 
 class QualityEnforcer:
     
-    def deduplicate_questions(self, questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        seen_questions = set()
+    def __init__(self, store: FAQStore = None, rules: QualityRules = None):
+        self.store = store
+        self.rules = rules if rules is not None else QualityRules.load()
+        self.hasher = store.hasher if store is not None else MinHasher()
+    
+    def duplicate_index(self, questions: List[Dict[str, Any]] = (), product_name: str = None) -> NearDuplicateIndex:
+        index = NearDuplicateIndex(hasher=self.hasher)
+        for q in questions:
+            index.add(q['question'], q['question'], name_tokens(product_name))
+        return index
+    
+    def find_duplicate(self, question_text: str, index: NearDuplicateIndex, product_name: str = None) -> Optional[Tuple[str, str, float]]:
+        features = self.hasher.features(question_text, name_tokens(product_name))
+        signature = self.hasher.signature(features)
+        numbers = number_tokens(question_text)
+        match = index.query(signature, features, numbers)
+        if match is not None:
+            metrics.increment("faq_near_duplicates_total", scope="product")
+            return match
+        
+        if self.store is not None:
+            match = self.store.query(signature, features, numbers, exclude_key=product_name)
+            if match is not None:
+                metrics.increment("faq_near_duplicates_total", scope="store")
+                return match
+        
+        index.insert(question_text, question_text, signature, features)
+        return None
+    
+    def deduplicate_questions(self, questions: List[Dict[str, Any]], product_name: str = None) -> List[Dict[str, Any]]:
+        index = self.duplicate_index()
         deduplicated = []
         
         for q in questions:
-            question_text = q['question'].lower().strip()
+            match = self.find_duplicate(q['question'], index, product_name)
             
-            if question_text not in seen_questions:
-                seen_questions.add(question_text)
+            if match is None:
                 deduplicated.append(q)
             else:
-                logger.warning(f"Duplicate question removed: {q['question']}")
+                logger.warning(f"Duplicate question removed: {q['question']} (matches {match[1]!r} from {match[0]}, similarity {match[2]:.2f})")
         
         logger.info(f"Deduplication: {len(questions)} -> {len(deduplicated)}")
         return deduplicated
     
+    def remember(self, product_name: str, questions: List[Dict[str, Any]]) -> None:
+        if self.store is None:
+            return
+        self.store.replace(product_name, [q['question'] for q in questions])
+    
     def score_questions(self, questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        scored = []
-        
-        for q in questions:
-            score = self._calculate_question_quality(q)
-            q['quality_score'] = score
-            scored.append(q)
+        reports = self.rules.evaluate("faq", questions, category_field='category')
+        scored = [
+            {**q, 'quality_score': report['score'], 'quality_passed': report['passed'], 'quality_rules': report['fired']}
+            for q, report in zip(questions, reports)
+        ]
         
         avg_score = sum(q['quality_score'] for q in scored) / len(scored) if scored else 0
         logger.info(f"Question quality scores: avg={avg_score:.1f}")
         
         return scored
     
+    def score_batch(self, questions: List[Dict[str, Any]]) -> np.ndarray:
+        return self.rules.score("faq", questions, category_field='category')
+    
     def _calculate_question_quality(self, question: Dict[str, Any]) -> int:
-        score = 100
-        
-        question_text = question['question']
-        answer_text = question['answer']
-        
-        if len(question_text) < 10:
-            score -= 30
-        
-        if len(answer_text) < 20:
-            score -= 20
-        
-        if question_text.count(' ') < 3:
-            score -= 20
-        
-        if not question_text.endswith('?'):
-            score -= 10
+        return int(self.score_batch([question])[0])
+    
+    def check_question(self, question: Any, seen: NearDuplicateIndex, product_name: str = None) -> Optional[str]:
+        try:
+            Question(**question)
+        except (TypeError, ValueError):
+            return "schema"
         
-        quality_words = ['how', 'what', 'why', 'when', 'which', 'can', 'should', 'does']
-        if not any(word in question_text.lower() for word in quality_words):
-            score -= 15
+        if not self.rules.evaluate("faq", [question], category_field='category')[0]['passed']:
+            return "low_quality"
         
-        if question_text.lower() == answer_text.lower():
-            score -= 50
+        if self.find_duplicate(question['question'], seen, product_name) is not None:
+            return "duplicate"
         
-        return max(0, score)
+        return None
+    
+    def failed_rules(self, target: str, item: Dict[str, Any], log=logger.error) -> List[Rule]:
+        rule_set = self.rules.rule_set(target)
+        report = rule_set.evaluate([item])[0]
+        fired = rule_set.fired_rules(report)
+        for rule in fired:
+            log(rule.message)
+        
+        return [] if report['passed'] else fired
     
     def validate_block_quality(self, blocks: Dict[str, Any]) -> bool:
-        benefits = blocks.get('benefits', [])
-        if len(benefits) < 2:
-            logger.error("Insufficient benefits in content blocks")
-            return False
-        
-        ingredients = blocks.get('ingredients_block', [])
-        if len(ingredients) < 1:
-            logger.error("Insufficient ingredients in content blocks")
-            return False
-        
-        usage = blocks.get('usage_block', '')
-        if len(usage) < 10:
-            logger.error("Usage block too short")
-            return False
-        
-        return True
+        return not self.failed_rules("blocks", blocks)
     
     def detect_low_quality_comparison(self, comparison: Dict[str, Any]) -> bool:
-        price_diff = comparison.get('price_difference', 0)
-        
-        if price_diff == 0:
-            logger.warning("Price difference is zero - low quality comparison")
-            return True
-        
-        stronger = comparison.get('stronger_formulation', '')
-        if not stronger:
-            logger.warning("No stronger formulation identified")
-            return True
-        
-        return False
\ No newline at end of file
+        return bool(self.failed_rules("comparison", comparison, logger.warning))
\ No newline at end of file
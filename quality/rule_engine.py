@@ -0,0 +1,177 @@
+import re
+import copy
+import operator
+import numpy as np
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from config import Config
+from metrics import metrics
+from utils import load_json_file
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+Column = Callable[[List[Any], Sequence[Dict[str, Any]]], np.ndarray]
+
+def lowered(values: List[str]) -> List[str]:
+    return list(map(str.lower, values))
+
+def value_feature(arg: Any) -> Column:
+    return lambda values, items: np.array(values)
+
+def length_feature(arg: Any) -> Column:
+    return lambda values, items: np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+
+def count_feature(arg: str) -> Column:
+    return lambda values, items: np.fromiter(map(str.count, values, repeat(arg)), dtype=np.int64, count=len(values))
+
+def truthy_feature(arg: Any) -> Column:
+    return lambda values, items: np.fromiter(map(bool, values), dtype=bool, count=len(values))
+
+def endswith_feature(arg: str) -> Column:
+    return lambda values, items: np.fromiter(map(str.endswith, values, repeat(arg)), dtype=bool, count=len(values))
+
+def contains_any_feature(arg: List[str]) -> Column:
+    pattern = re.compile("|".join(re.escape(word) for word in arg))
+    return lambda values, items: np.fromiter(
+        map(bool, map(pattern.search, lowered(values))), dtype=bool, count=len(values)
+    )
+
+def equals_field_feature(arg: str) -> Column:
+    return lambda values, items: np.fromiter(
+        map(str.__eq__, lowered(values), lowered([item[arg] for item in items])), dtype=bool, count=len(values)
+    )
+
+FEATURES = {
+    "value": value_feature,
+    "length": length_feature,
+    "count": count_feature,
+    "truthy": truthy_feature,
+    "endswith": endswith_feature,
+    "contains_any": contains_any_feature,
+    "equals_field": equals_field_feature
+}
+
+class Rule:
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec["name"]
+        if spec["feature"] not in FEATURES:
+            raise ValueError(f"Rule {self.name} uses unknown feature: {spec['feature']}")
+        if spec["op"] not in OPERATORS:
+            raise ValueError(f"Rule {self.name} uses unknown operator: {spec['op']}")
+        
+        self.field = spec["field"]
+        self.default = spec.get("default")
+        self.measure = FEATURES[spec["feature"]](spec.get("arg"))
+        self.compare = OPERATORS[spec["op"]]
+        self.value = spec["value"]
+        self.penalty = spec.get("penalty", 0)
+        self.message = spec.get("message", self.name)
+    
+    def fired(self, items: Sequence[Dict[str, Any]]) -> np.ndarray:
+        values = [item.get(self.field, self.default) for item in items]
+        return np.asarray(self.compare(self.measure(values, items), self.value), dtype=bool).reshape(len(items))
+
+class RuleSet:
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.base_score = spec.get("base_score", 100)
+        self.min_score = spec.get("min_score", 0)
+        self.pass_score = spec.get("pass_score", self.base_score)
+        self.rules = [Rule(rule) for rule in spec["rules"] if rule.get("enabled", True)]
+        self.penalties = np.array([rule.penalty for rule in self.rules], dtype=np.int64)
+    
+    def fired_matrix(self, items: Sequence[Dict[str, Any]]) -> np.ndarray:
+        fired = np.column_stack([rule.fired(items) for rule in self.rules])
+        for rule, count in zip(self.rules, fired.sum(axis=0)):
+            if count:
+                metrics.increment("quality_rules_fired_total", int(count), rule=rule.name, target=self.name)
+        return fired
+    
+    def scores_from(self, fired: np.ndarray) -> np.ndarray:
+        return np.maximum(self.base_score - fired.astype(np.int64) @ self.penalties, self.min_score)
+    
+    def score(self, items: Sequence[Dict[str, Any]]) -> np.ndarray:
+        if not items or not self.rules:
+            return np.full(len(items), self.base_score, dtype=np.int64)
+        return self.scores_from(self.fired_matrix(items))
+    
+    def evaluate(self, items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not items or not self.rules:
+            return [{"score": self.base_score, "passed": self.base_score >= self.pass_score, "fired": []} for _ in items]
+        
+        fired = self.fired_matrix(items)
+        scores = self.scores_from(fired)
+        
+        return [
+            {
+                "score": int(score),
+                "passed": bool(score >= self.pass_score),
+                "fired": [rule.name for rule, hit in zip(self.rules, row) if hit]
+            }
+            for score, row in zip(scores, fired)
+        ]
+    
+    def fired_rules(self, report: Dict[str, Any]) -> List[Rule]:
+        fired = set(report["fired"])
+        return [rule for rule in self.rules if rule.name in fired]
+
+class QualityRules:
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.compiled: Dict[Tuple[str, Optional[str]], RuleSet] = {}
+        for target in ("faq", "blocks", "comparison"):
+            self.rule_set(target)
+        for category in spec.get("categories", {}):
+            for target in spec["categories"][category]:
+                self.rule_set(target, category)
+    
+    @classmethod
+    def load(cls, path: str = None) -> "QualityRules":
+        return cls(load_json_file(path or Config.QUALITY_RULES_PATH))
+    
+    def rule_set(self, target: str, category: Optional[str] = None) -> RuleSet:
+        key = (target, category)
+        if key in self.compiled:
+            return self.compiled[key]
+        
+        override = self.spec.get("categories", {}).get(category, {}).get(target)
+        if override is None:
+            rule_set = self.compiled.get((target, None)) or RuleSet(target, self.spec[target])
+        else:
+            spec = copy.deepcopy(self.spec[target])
+            spec.update({field: value for field, value in override.items() if field != "rules"})
+            rules = {rule["name"]: rule for rule in spec["rules"]}
+            for name, changes in override.get("rules", {}).items():
+                rules[name] = {**rules.get(name, {"name": name}), **changes}
+            spec["rules"] = list(rules.values())
+            rule_set = RuleSet(target, spec)
+        
+        self.compiled[key] = rule_set
+        return rule_set
+    
+    def group(self, items: Sequence[Dict[str, Any]], category_field: str = None) -> Dict[Optional[str], List[int]]:
+        groups: Dict[Optional[str], List[int]] = {}
+        for position, item in enumerate(items):
+            groups.setdefault(item.get(category_field) if category_field else None, []).append(position)
+        return groups
+    
+    def score(self, target: str, items: Sequence[Dict[str, Any]], category_field: str = None) -> np.ndarray:
+        scores = np.empty(len(items), dtype=np.int64)
+        for category, positions in self.group(items, category_field).items():
+            scores[positions] = self.rule_set(target, category).score([items[position] for position in positions])
+        return scores
+    
+    def evaluate(self, target: str, items: Sequence[Dict[str, Any]], category_field: str = None) -> List[Dict[str, Any]]:
+        reports: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for category, positions in self.group(items, category_field).items():
+            group_reports = self.rule_set(target, category).evaluate([items[position] for position in positions])
+            for position, report in zip(positions, group_reports):
+                reports[position] = report
+        return reports
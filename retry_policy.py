@@ -0,0 +1,128 @@
+import json
+import time
+import random
+import threading
+from typing import Any, Callable, Optional
+from pydantic import ValidationError
+from config import Config
+from metrics import metrics
+from utils import logger
+
+ERROR_TRANSPORT = "transport"
+ERROR_MALFORMED = "malformed"
+ERROR_SCHEMA = "schema"
+ERROR_RECOVERABLE = "recoverable"
+ERROR_FATAL = "fatal"
+
+MAX_FEEDBACK_ERROR_LENGTH = 300
+
+def classify_error(error: Exception) -> str:
+    if isinstance(error, json.JSONDecodeError):
+        return ERROR_MALFORMED
+    if isinstance(error, (ValidationError, ValueError, TypeError, KeyError)):
+        return ERROR_SCHEMA
+    return ERROR_TRANSPORT
+
+def feedback_for(kind: str, error: Exception) -> str:
+    detail = str(error)[:MAX_FEEDBACK_ERROR_LENGTH]
+    if kind == ERROR_MALFORMED:
+        return f"Your previous reply was not valid JSON ({detail}). Reply again with only the JSON."
+    if kind == ERROR_SCHEMA:
+        return f"Your previous reply did not match the required structure ({detail}). Fix it and reply with only the JSON."
+    return ""
+
+class RetryState:
+    def __init__(self):
+        self.attempt = 0
+        self.error: Optional[Exception] = None
+        self.kind: Optional[str] = None
+        self.feedback = ""
+
+class RetryBudget:
+    def __init__(self, total: int):
+        self.remaining = total
+        self.lock = threading.Lock()
+    
+    def take(self) -> bool:
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        deadline: float = None,
+        schema_attempts: int = None,
+        classify: Callable[[Exception], str] = classify_error,
+        retry_metric: str = "agent_retries_total",
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random = None,
+        budget: RetryBudget = None
+    ):
+        self.max_attempts = max(1, Config.MAX_RETRIES if max_attempts is None else max_attempts)
+        self.base_delay = Config.RETRY_DELAY if base_delay is None else base_delay
+        self.max_delay = Config.RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = Config.RETRY_DEADLINE_SECONDS if deadline is None else deadline
+        self.schema_attempts = Config.SCHEMA_RETRY_ATTEMPTS if schema_attempts is None else schema_attempts
+        self.classify = classify
+        self.retry_metric = retry_metric
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.budget = budget
+    
+    def backoff(self, attempt: int, kind: str) -> float:
+        if kind in (ERROR_MALFORMED, ERROR_SCHEMA, ERROR_RECOVERABLE):
+            return 0.0
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter) + delay * self.jitter * self.rng.random()
+    
+    def should_stop(self, state: RetryState, schema_failures: int) -> bool:
+        if state.attempt >= self.max_attempts or state.kind == ERROR_FATAL:
+            return True
+        return state.kind == ERROR_SCHEMA and schema_failures >= self.schema_attempts
+    
+    def call(self, operation: Callable[[RetryState], Any], name: str) -> Any:
+        state = RetryState()
+        deadline_at = time.monotonic() + self.deadline if self.deadline else None
+        schema_failures = 0
+        
+        while True:
+            state.attempt += 1
+            logger.info(f"{name} attempt {state.attempt}")
+            try:
+                return operation(state)
+            except Exception as e:
+                state.error = e
+                state.kind = self.classify(e)
+                state.feedback = feedback_for(state.kind, e)
+                if state.kind == ERROR_SCHEMA:
+                    schema_failures += 1
+                
+                logger.error(f"{name} attempt {state.attempt} failed ({state.kind}): {e}")
+                metrics.record_failure(name, e)
+                
+                if self.should_stop(state, schema_failures):
+                    raise
+                
+                delay = self.backoff(state.attempt, state.kind)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    logger.error(f"{name} retry deadline of {self.deadline}s reached")
+                    raise
+                
+                if self.budget is not None and not self.budget.take():
+                    logger.error(f"{name} shared retry budget exhausted")
+                    raise
+                
+                metrics.increment(self.retry_metric, agent=name, kind=state.kind)
+                if delay:
+                    metrics.observe("retry_backoff_seconds", delay, agent=name)
+                    self.sleep(delay)
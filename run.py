@@ -7,6 +7,7 @@ from agents.block_agent import BlockAgent
 from agents.comparison_agent import ComparisonAgent
 from agents.assembly_agent import AssemblyAgent
 from config import Config
+from llm_cache import configure_llm_cache
 from utils import load_json_file, logger
 
 def main():
@@ -14,6 +15,8 @@ def main():
         Config.validate()
         logger.info("Configuration validated")
         
+        configure_llm_cache()
+        
         llm = ChatGoogleGenerativeAI(
             model=Config.MODEL_NAME,
             google_api_key=Config.GOOGLE_API_KEY,
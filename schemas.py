@@ -44,6 +44,8 @@ class ContentBlocks(BaseModel):
     usage_block: str
     ingredients_block: List[str]
     price_block: PriceBlock
+    price_range: Optional[str] = None
+    benefit_score: Optional[int] = None
 
 class Comparison(BaseModel):
     stronger_formulation: str
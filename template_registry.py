@@ -0,0 +1,80 @@
+import copy
+import json
+import hashlib
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type
+from pydantic import BaseModel, TypeAdapter
+from metrics import metrics
+from utils import logger
+
+FieldMap = Dict[str, Sequence[str]]
+
+@lru_cache(maxsize=None)
+def get_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+def compile_getter(source: Sequence[str]) -> Callable[[Dict[str, Any]], Any]:
+    def getter(sources: Dict[str, Any]) -> Any:
+        value = sources
+        for key in source:
+            value = value[key]
+        return value
+    return getter
+
+class CompiledTemplate:
+    def __init__(self, path: str, template: Dict[str, Any], fields: FieldMap, model: Type[BaseModel], digest: str):
+        self.path = path
+        self.digest = digest
+        self.adapter = get_adapter(model)
+        self.defaults = {key: value for key, value in template.items() if key not in fields}
+        self.getters = [(key, compile_getter(source)) for key, source in fields.items()]
+    
+    def assemble(self, sources: Dict[str, Any]) -> Dict[str, Any]:
+        data = copy.deepcopy(self.defaults)
+        for key, getter in self.getters:
+            data[key] = getter(sources)
+        return self.adapter.dump_python(self.adapter.validate_python(data))
+
+class TemplateRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+    
+    def get(self, path: str, fields: FieldMap, model: Type[BaseModel]) -> CompiledTemplate:
+        try:
+            stat = Path(path).stat()
+        except FileNotFoundError:
+            logger.error(f"File not found: {path}")
+            raise
+        signature = (stat.st_mtime_ns, stat.st_size)
+        
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == signature:
+                metrics.increment("template_cache_total", result="hit")
+                return entry[1]
+            
+            compiled = self.compile(path, fields, model, entry[1] if entry is not None else None)
+            self.entries[path] = (signature, compiled)
+            return compiled
+    
+    def compile(self, path: str, fields: FieldMap, model: Type[BaseModel], previous: Optional[CompiledTemplate]) -> CompiledTemplate:
+        content = Path(path).read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if previous is not None and previous.digest == digest:
+            metrics.increment("template_cache_total", result="unchanged")
+            return previous
+        
+        try:
+            template = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in {path}: {e}")
+            raise
+        metrics.increment("template_cache_total", result="compiled")
+        logger.info(f"Compiled template {path}")
+        return CompiledTemplate(path, template, fields, model, digest)
+    
+    def assemble(self, path: str, fields: FieldMap, model: Type[BaseModel], sources: Dict[str, Any]) -> Dict[str, Any]:
+        return self.get(path, fields, model).assemble(sources)
@@ -0,0 +1,128 @@
+import json
+import pytest
+from unittest.mock import Mock, patch
+from agents.product_parser_agent import ProductParserAgent
+from agents.question_agent import QuestionAgent
+from agents.block_agent import BlockAgent
+from agents.assembly_agent import AssemblyAgent
+from langchain_community.chat_models.fake import FakeListChatModel
+from benchmarks.fake_chat_model import FakeCatalogChatModel
+from errors import RecoverableError
+
+WELL_FORMED_PRODUCT = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": ["Oily", "Combination"],
+    "ingredients": ["Vitamin C", "Hyaluronic Acid"],
+    "benefits": ["Brightening", "Fades dark spots"],
+    "usage": "Apply 2-3 drops in the morning before sunscreen",
+    "side_effects": "Mild tingling for sensitive skin",
+    "price": "699"
+}
+
+@patch('agents.product_parser_agent.LLMChain')
+def test_product_parser_agent_success(mock_chain):
+    mock_llm = Mock()
+    mock_chain_instance = Mock()
+    mock_chain.return_value = mock_chain_instance
+    mock_chain_instance.run.return_value = '''
+    {
+        "name": "Test Product",
+        "concentration": "10%",
+        "skin_type": ["Oily"],
+        "ingredients": ["Vitamin C"],
+        "benefits": ["Brightening"],
+        "usage": "Apply daily",
+        "side_effects": "None",
+        "price": 500
+    }
+    '''
+    
+    agent = ProductParserAgent(mock_llm)
+    result = agent.execute({"name": "Raw Product", "price": "500"})
+    
+    assert result["name"] == "Test Product"
+    assert result["price"] == 500
+
+@patch('agents.question_agent.LLMChain')
+def test_question_agent_success(mock_chain):
+    mock_llm = Mock()
+    mock_chain_instance = Mock()
+    mock_chain.return_value = mock_chain_instance
+    
+    questions = [
+        {"question": f"Question {i}", "answer": f"Answer {i}", "category": "informational"}
+        for i in range(15)
+    ]
+    mock_chain_instance.run.return_value = json.dumps(questions)
+    
+    agent = QuestionAgent(mock_llm)
+    product = {
+        "name": "Test",
+        "concentration": "10%",
+        "skin_type": ["Oily"],
+        "ingredients": ["Vitamin C"],
+        "benefits": ["Brightening"],
+        "usage": "Apply",
+        "side_effects": "None",
+        "price": 500
+    }
+    result = agent.execute(product)
+    
+    assert len(result) == 15
+    assert result[0]["question"] == "Question 0"
+
+def test_assembly_agent():
+    agent = AssemblyAgent()
+    assert agent is not None
+
+
+def test_parser_fast_path_skips_llm_for_well_formed_input():
+    llm = FakeCatalogChatModel()
+    
+    assert ProductParserAgent(llm).execute(WELL_FORMED_PRODUCT)["price"] == 699
+    assert llm.call_counts == {}
+    
+    ProductParserAgent(llm).execute({**WELL_FORMED_PRODUCT, "price": "699.00"})
+    assert llm.call_counts == {"parse": 1}
+
+def test_block_agent_asks_llm_only_for_usage():
+    llm = FakeCatalogChatModel()
+    parsed = ProductParserAgent(llm).execute(WELL_FORMED_PRODUCT)
+    
+    blocks = BlockAgent(llm).execute(parsed)
+    assert blocks["usage_block"] == WELL_FORMED_PRODUCT["usage"]
+    assert blocks["benefits"] == WELL_FORMED_PRODUCT["benefits"]
+    assert llm.call_counts == {"blocks": 1}
+    
+    BlockAgent(llm, usage_llm=False).execute(parsed)
+    assert llm.call_counts == {"blocks": 1}
+
+def faq_reply(start, stop):
+    return json.dumps([
+        {"question": f"Question {i}?", "answer": f"Answer {i}", "category": "informational"}
+        for i in range(start, stop)
+    ])
+
+def test_question_agent_keeps_topping_up_short_replies():
+    llm = FakeListChatModel(responses=[faq_reply(0, 11), faq_reply(11, 13), faq_reply(13, 15)])
+    
+    questions = QuestionAgent(llm, max_retries=3).execute(WELL_FORMED_PRODUCT)
+    
+    assert [q["question"] for q in questions] == [f"Question {i}?" for i in range(15)]
+
+def test_question_agent_raises_recoverable_error_when_still_short():
+    llm = FakeListChatModel(responses=[faq_reply(0, 11), "[]", "[]"])
+    
+    with pytest.raises(RecoverableError) as exc_info:
+        QuestionAgent(llm, max_retries=2).execute(WELL_FORMED_PRODUCT)
+    
+    assert len(exc_info.value.accepted) == 11
+
+def test_question_agent_rejects_replies_that_are_not_question_lists():
+    llm = FakeListChatModel(responses=['{"question": "Q?"}', '[' + faq_reply(0, 3)[1:-1] + ', "stray", 7]'])
+    
+    questions = QuestionAgent(llm, max_retries=2).execute(WELL_FORMED_PRODUCT, count=3)
+    
+    assert len(questions) == 3
+    assert all(isinstance(q, dict) for q in questions)
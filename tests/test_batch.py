@@ -0,0 +1,115 @@
+import json
+import pytest
+import threading
+from unittest.mock import Mock
+from batch import BatchRunner, iter_products, slugify
+
+PRODUCT = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": ["Oily"],
+    "ingredients": ["Vitamin C"],
+    "benefits": ["Brightening"],
+    "usage": "Apply daily",
+    "side_effects": "None",
+    "price": 699
+}
+
+def test_slugify():
+    assert slugify("GlowBoost Vitamin C Serum") == "glowboost-vitamin-c-serum"
+    assert slugify("!!!") == "product"
+
+def test_iter_products_from_directory(tmp_path):
+    (tmp_path / "b.json").write_text(json.dumps(PRODUCT))
+    (tmp_path / "a.json").write_text("{broken")
+    
+    records = list(iter_products(str(tmp_path)))
+    
+    assert [r[0] for r in records] == ["a", "b"]
+    assert records[0][2] is not None
+    assert records[1][1]["price"] == 699
+
+def test_iter_products_from_json_array(tmp_path):
+    source = tmp_path / "catalog.json"
+    source.write_text(json.dumps([PRODUCT, PRODUCT]))
+    
+    records = list(iter_products(str(source)))
+    
+    assert len(records) == 2
+    assert all(error is None for _, _, error in records)
+
+def test_iter_products_from_jsonl(tmp_path):
+    source = tmp_path / "catalog.jsonl"
+    source.write_text(json.dumps(PRODUCT) + "\n\nnot json\n")
+    
+    records = list(iter_products(str(source)))
+    
+    assert len(records) == 2
+    assert records[0][1]["name"] == PRODUCT["name"]
+    assert records[1][0] == "line-3"
+    assert records[1][2] is not None
+
+def test_batch_runner_assigns_unique_product_ids():
+    runner = BatchRunner(orchestrator=Mock())
+    
+    first = runner.assign_product_id(None, PRODUCT, 0)
+    second = runner.assign_product_id(None, PRODUCT, 1)
+    sku = runner.assign_product_id(None, {"sku": "SKU-42"}, 2)
+    
+    assert first == "glowboost-vitamin-c-serum"
+    assert second == "glowboost-vitamin-c-serum-2"
+    assert sku == "sku-42"
+
+def test_batch_runner_isolates_product_failures(tmp_path):
+    source = tmp_path / "catalog.jsonl"
+    failing = dict(PRODUCT, name="Broken Serum")
+    source.write_text("\n".join(json.dumps(p) for p in [PRODUCT, failing, PRODUCT]))
+    
+    orchestrator = Mock()
+    orchestrator.get_output_paths.return_value = {}
+    
+    def process_product(raw_product, output_dir, prefetched=None):
+        if raw_product["name"] == "Broken Serum":
+            raise RuntimeError("LLM unavailable")
+        return [f"{output_dir}/faq.json"]
+    
+    orchestrator.process_product.side_effect = process_product
+    
+    runner = BatchRunner(orchestrator=orchestrator, workers=2, output_dir=str(tmp_path / "out"))
+    summary = runner.run(str(source))
+    
+    orchestrator.initialize_agents.assert_called_once_with(None)
+    assert summary["total"] == 3
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+    
+    failed = [r for r in summary["results"] if r["status"] == "failed"]
+    assert failed[0]["product_id"] == "broken-serum"
+    assert (tmp_path / "out" / "batch_summary.json").exists()
+
+def test_batch_runner_prefetches_chunks_in_parallel(tmp_path):
+    source = tmp_path / "catalog.jsonl"
+    source.write_text("\n".join(json.dumps(dict(PRODUCT, name=f"Serum {i}")) for i in range(4)))
+    
+    orchestrator = Mock(incremental=False, resume=False)
+    orchestrator.get_output_paths.return_value = {}
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def prefetch_content(raw_products, batch_size):
+        barrier.wait()
+        return {product_id: {"questions": [product_id]} for product_id in raw_products}
+    
+    received = {}
+    
+    def process_product(raw_product, output_dir, prefetched=None):
+        received[raw_product["name"]] = prefetched
+        return []
+    
+    orchestrator.prefetch_content.side_effect = prefetch_content
+    orchestrator.process_product.side_effect = process_product
+    
+    summary = BatchRunner(orchestrator=orchestrator, workers=2, output_dir=str(tmp_path / "out"), batch_size=2).run(str(source))
+    
+    assert summary["succeeded"] == 4
+    assert orchestrator.prefetch_content.call_count == 2
+    assert received == {f"Serum {i}": {"questions": [f"serum-{i}"]} for i in range(4)}
@@ -0,0 +1,56 @@
+import random
+from batch_prompting import BatchPrompter, plan_batches
+from retry_policy import RetryPolicy
+from benchmarks.pipeline_benchmark import run_benchmark
+
+def make_prompter(call, max_size=4, token_limit=1000):
+    def validate(item, response):
+        if response != item * 2:
+            raise ValueError(f"Expected {item * 2}, got {response}")
+        return response
+    
+    policy = RetryPolicy(max_attempts=1, sleep=lambda _: None, rng=random.Random(0))
+    return BatchPrompter("Test", call, validate, 0, policy, max_size=max_size, token_limit=token_limit)
+
+def test_plan_batches_respects_size_and_token_limit():
+    items = [(str(i), i) for i in range(7)]
+    
+    assert [len(b) for b in plan_batches(items, lambda _: 10, 1000, 3)] == [3, 3, 1]
+    assert [len(b) for b in plan_batches(items, lambda _: 10, 25, 5)] == [2, 2, 2, 1]
+    assert [len(b) for b in plan_batches(items, lambda _: 50, 25, 5)] == [1] * 7
+
+def test_batch_prompter_retries_only_failing_items():
+    calls = []
+    
+    def call(payload, feedback):
+        calls.append(sorted(payload))
+        return {
+            key: (-1 if key == "bad" and len(payload) > 1 else value * 2)
+            for key, value in payload.items()
+        }
+    
+    prompter = make_prompter(call)
+    results = prompter.run({"a": 1, "b": 2, "bad": 3, "c": 4})
+    
+    assert results == {"a": 2, "b": 4, "bad": 6, "c": 8}
+    assert calls == [["a", "b", "bad", "c"], ["bad"]]
+
+def test_batch_prompter_splits_failed_batches_and_gives_up_on_single_items():
+    calls = []
+    
+    def call(payload, feedback):
+        calls.append(len(payload))
+        if "broken" in payload:
+            raise ConnectionError("503")
+        return {key: value * 2 for key, value in payload.items()}
+    
+    results = make_prompter(call).run({"a": 1, "b": 2, "broken": 3, "c": 4})
+    
+    assert results == {"a": 2, "b": 4, "c": 8}
+    assert calls == [4, 2, 2, 1, 1]
+
+def test_batched_prompts_cut_llm_calls_in_batch_runs():
+    report = run_benchmark(8, workers=2, batch_size=4)
+    
+    assert report["succeeded"] == 8
+    assert report["llm_calls"] == 2 + 2 + 8
@@ -0,0 +1,64 @@
+import copy
+import random
+from quality.quality_enforcer import QualityEnforcer
+
+WORDS = ["How", "what", "WHY", "can", "Serum", "skin", "daily", "İs", "ß", "it", "a", "showcase", "does"]
+
+def make_questions(count, seed=5):
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(count):
+        question = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))) + rng.choice(["", "?", " ?", "? "])
+        answer = question if rng.random() < 0.1 else question.upper() if rng.random() < 0.1 else " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8)))
+        questions.append({"question": question, "answer": answer, "category": rng.choice(["informational", "usage", "safety", "purchase"])})
+    return questions
+
+def reference_score(question):
+    score = 100
+    
+    question_text = question['question']
+    answer_text = question['answer']
+    
+    if len(question_text) < 10:
+        score -= 30
+    
+    if len(answer_text) < 20:
+        score -= 20
+    
+    if question_text.count(' ') < 3:
+        score -= 20
+    
+    if not question_text.endswith('?'):
+        score -= 10
+    
+    quality_words = ['how', 'what', 'why', 'when', 'which', 'can', 'should', 'does']
+    if not any(word in question_text.lower() for word in quality_words):
+        score -= 15
+    
+    if question_text.lower() == answer_text.lower():
+        score -= 50
+    
+    return max(0, score)
+
+def test_score_batch_matches_reference_scores():
+    enforcer = QualityEnforcer()
+    questions = make_questions(2000)
+    
+    scores = enforcer.score_batch(questions)
+    
+    assert scores.tolist() == [reference_score(q) for q in questions]
+    assert [q['quality_score'] for q in enforcer.score_questions(questions)] == scores.tolist()
+    assert [enforcer._calculate_question_quality(q) for q in questions[:200]] == scores[:200].tolist()
+
+def test_score_batch_does_not_mutate_inputs():
+    enforcer = QualityEnforcer()
+    questions = make_questions(50)
+    original = copy.deepcopy(questions)
+    
+    enforcer.score_batch(questions)
+    enforcer.score_questions(questions)
+    
+    assert questions == original
+
+def test_score_batch_handles_empty_input():
+    assert QualityEnforcer().score_batch([]).tolist() == []
@@ -0,0 +1,71 @@
+import pytest
+from agents.product_parser_agent import ProductParserAgent
+from agents.question_agent import QuestionAgent
+from agents.block_agent import BlockAgent
+from agents.comparison_agent import ComparisonAgent
+from agents_lcel.parser_agent_lcel import ProductParserAgentLCEL
+from benchmarks.fake_chat_model import FakeCatalogChatModel, FakeTransportError
+from benchmarks.pipeline_benchmark import percentile, run_benchmark
+
+PRODUCT = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": ["Oily", "Combination"],
+    "ingredients": ["Vitamin C", "Hyaluronic Acid"],
+    "benefits": ["Brightening", "Fades dark spots"],
+    "usage": "Apply 2-3 drops in the morning before sunscreen",
+    "side_effects": "Mild tingling for sensitive skin",
+    "price": "699"
+}
+
+def test_fake_model_answers_every_agent():
+    llm = FakeCatalogChatModel()
+    
+    parsed = ProductParserAgent(llm, max_retries=1).execute(PRODUCT)
+    assert parsed["price"] == 699
+    assert ProductParserAgentLCEL(llm, max_retries=1).execute(PRODUCT)["name"] == PRODUCT["name"]
+    
+    questions = QuestionAgent(llm, max_retries=1).execute(parsed)
+    assert len(questions) == 15
+    assert len({q["question"] for q in questions}) == 15
+    
+    blocks = BlockAgent(llm, max_retries=1).execute(parsed)
+    assert blocks["price_block"]["price"] == 699
+    
+    product_b, comparison = ComparisonAgent(llm, max_retries=1).execute(parsed)
+    assert comparison["price_difference"] == -200
+    assert comparison["stronger_formulation"] == product_b["name"]
+
+def test_fake_model_honours_exclusions_and_count():
+    llm = FakeCatalogChatModel()
+    agent = QuestionAgent(llm, max_retries=1)
+    first = agent.execute(PRODUCT, count=3)
+    
+    replacements = agent.execute(PRODUCT, count=2, exclude=[q["question"] for q in first])
+    
+    assert len(replacements) == 2
+    assert not {q["question"] for q in first} & {q["question"] for q in replacements}
+
+def test_fake_model_simulates_failures():
+    with pytest.raises(FakeTransportError):
+        FakeCatalogChatModel(failure_rate=1.0).invoke("Create content blocks for this product.\n\nProduct: {}")
+    
+    with pytest.raises(ValueError):
+        BlockAgent(FakeCatalogChatModel(malformed_rate=1.0), max_retries=1).execute(PRODUCT)
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+def test_run_benchmark_reports_throughput_and_stage_latency():
+    report = run_benchmark(3, workers=2)
+    
+    assert report["succeeded"] == 3
+    assert report["llm_calls"] == 9
+    assert report["retries"] == 0
+    assert report["products_per_s"] > 0
+    assert report["peak_rss_mb"] > 0
+    assert report["stages"]["generate_blocks"]["count"] == 3
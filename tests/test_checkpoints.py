@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import Mock, patch
+from checkpoints import CheckpointStore
+from orchestrator import PipelineOrchestrator, NonRecoverableError
+
+PRODUCT = {"name": "GlowBoost Vitamin C Serum", "price": 699}
+
+def test_checkpoint_round_trip(tmp_path):
+    store = CheckpointStore(str(tmp_path), "hash-1")
+    
+    assert store.load("questions") is None
+    store.save("questions", [{"question": "What is it?"}])
+    
+    assert store.load("questions") == [{"question": "What is it?"}]
+    assert store.load_all() == {"questions": [{"question": "What is it?"}]}
+
+def test_checkpoint_ignores_other_inputs(tmp_path):
+    CheckpointStore(str(tmp_path), "hash-1").save("blocks", {"benefits": []})
+    
+    assert CheckpointStore(str(tmp_path), "hash-2").load("blocks") is None
+
+def test_checkpoint_rejects_unknown_stage(tmp_path):
+    with pytest.raises(ValueError):
+        CheckpointStore(str(tmp_path), "hash-1").save("assembly", {})
+
+def test_checkpoint_clear(tmp_path):
+    store = CheckpointStore(str(tmp_path), "hash-1")
+    store.save("parsed_product", PRODUCT)
+    store.clear()
+    
+    assert store.load_all() == {}
+
+def build_orchestrator(resume):
+    orchestrator = PipelineOrchestrator(resume=resume)
+    orchestrator.parse_product = Mock(return_value=PRODUCT)
+    orchestrator.generate_validated_questions = Mock(return_value=[{"question": "Q?"}])
+    orchestrator.generate_blocks = Mock(return_value={"benefits": ["Brightening"]})
+    orchestrator.generate_comparison = Mock(return_value=({"name": "B"}, {"price_difference": 100}))
+    orchestrator.assembly_agent = Mock()
+    return orchestrator
+
+def test_resume_continues_from_last_completed_stage(tmp_path):
+    failing = build_orchestrator(resume=False)
+    failing.generate_comparison.side_effect = NonRecoverableError("Comparison failed")
+    
+    with pytest.raises(NonRecoverableError):
+        failing.process_product(PRODUCT, str(tmp_path))
+    
+    resumed = build_orchestrator(resume=True)
+    with patch.object(resumed, 'assemble_outputs', return_value=[]) as mock_assemble:
+        resumed.process_product(PRODUCT, str(tmp_path))
+    
+    resumed.parse_product.assert_not_called()
+    resumed.generate_validated_questions.assert_not_called()
+    resumed.generate_blocks.assert_not_called()
+    resumed.generate_comparison.assert_called_once()
+    mock_assemble.assert_called_once_with(
+        PRODUCT, [{"question": "Q?"}], {"benefits": ["Brightening"]}, {"name": "B"}, {"price_difference": 100}, str(tmp_path)
+    )
+
+def test_run_without_resume_starts_from_scratch(tmp_path):
+    first = build_orchestrator(resume=False)
+    with patch.object(first, 'assemble_outputs', return_value=[]):
+        first.process_product(PRODUCT, str(tmp_path))
+    
+    second = build_orchestrator(resume=False)
+    with patch.object(second, 'assemble_outputs', return_value=[]):
+        second.process_product(PRODUCT, str(tmp_path))
+    
+    second.parse_product.assert_called_once()
+    second.generate_validated_questions.assert_called_once()
+
+def test_checkpoints_are_removed_after_success(tmp_path):
+    orchestrator = build_orchestrator(resume=False)
+    with patch.object(orchestrator, 'assemble_outputs', return_value=[]):
+        orchestrator.process_product(PRODUCT, str(tmp_path))
+    
+    assert not (tmp_path / CheckpointStore.CHECKPOINT_DIR).exists()
+
+def test_incremental_mode_keeps_checkpoints(tmp_path):
+    orchestrator = build_orchestrator(resume=False)
+    orchestrator.incremental = True
+    with patch.object(orchestrator, 'assemble_outputs', return_value=[]):
+        orchestrator.process_product(PRODUCT, str(tmp_path))
+    
+    assert len(list((tmp_path / CheckpointStore.CHECKPOINT_DIR).glob("*.json"))) == len(CheckpointStore.STAGES)
+
+def test_checkpoints_are_kept_until_outputs_are_flushed(tmp_path):
+    orchestrator = build_orchestrator(resume=False)
+    checkpoint_dir = tmp_path / CheckpointStore.CHECKPOINT_DIR
+    flushed_with_checkpoints = []
+    orchestrator.assembly_agent.sink.flush.side_effect = lambda: flushed_with_checkpoints.append(checkpoint_dir.exists())
+    
+    with patch.object(orchestrator, 'assemble_outputs', return_value=[]):
+        orchestrator.process_product(PRODUCT, str(tmp_path))
+    
+    assert flushed_with_checkpoints == [True]
+    assert not checkpoint_dir.exists()
@@ -0,0 +1,53 @@
+from competitor_pool import CompetitorPool, segment_keys
+from agents.comparison_agent import ComparisonAgent
+from benchmarks.fake_chat_model import FakeCatalogChatModel
+
+PRODUCT_A = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": ["Oily", "Combination"],
+    "ingredients": ["Vitamin C", "Hyaluronic Acid"],
+    "benefits": ["Brightening", "Fades dark spots"],
+    "usage": "Apply 2-3 drops in the morning before sunscreen",
+    "side_effects": "Mild tingling for sensitive skin",
+    "price": 699
+}
+
+def make_competitor(name, price, concentration="15% Vitamin C"):
+    return dict(PRODUCT_A, name=name, price=price, concentration=concentration, skin_type=["Dry"])
+
+def test_segment_keys_bucket_concentration_skin_type_and_tier():
+    assert segment_keys(PRODUCT_A) == [(2, "oily", "Mid-range"), (2, "combination", "Mid-range")]
+
+def test_find_returns_nearest_priced_competitor_in_segment(tmp_path):
+    pool = CompetitorPool(str(tmp_path / "pool.jsonl"))
+    pool.add(PRODUCT_A, make_competitor("Far", 990))
+    pool.add(PRODUCT_A, make_competitor("Near", 720))
+    pool.add(PRODUCT_A, make_competitor("Same Price", 699))
+    pool.add(PRODUCT_A, make_competitor("Same Strength", 710, concentration="10%"))
+    
+    assert pool.find(PRODUCT_A)["name"] == "Near"
+    assert pool.find(dict(PRODUCT_A, price=1500)) is None
+    assert pool.find(dict(PRODUCT_A, skin_type=["Dry"])) is None
+
+def test_pool_persists_between_instances(tmp_path):
+    path = tmp_path / "pool.jsonl"
+    CompetitorPool(str(path)).add(PRODUCT_A, make_competitor("Rival", 799))
+    path.write_text(path.read_text() + "not json\n")
+    
+    reloaded = CompetitorPool(str(path))
+    
+    assert len(reloaded) == 1
+    assert reloaded.find(PRODUCT_A)["name"] == "Rival"
+
+def test_comparison_agent_generates_only_on_miss(tmp_path):
+    llm = FakeCatalogChatModel()
+    agent = ComparisonAgent(llm, pool=CompetitorPool(str(tmp_path / "pool.jsonl")))
+    
+    first_b, first = agent.execute(PRODUCT_A)
+    second_b, second = agent.execute(dict(PRODUCT_A, name="GlowBoost Night Serum", price=650))
+    
+    assert llm.call_counts == {"comparison": 1}
+    assert second_b == first_b
+    assert second["price_difference"] == 650 - first_b["price"]
+    assert second["stronger_formulation"] == first_b["name"]
@@ -7,7 +7,10 @@ from logic.deterministic import (
     validate_ingredient_overlap,
     normalize_price_format,
     categorize_price_range,
-    calculate_benefit_score
+    calculate_benefit_score,
+    normalize_product,
+    parse_well_formed_price,
+    build_content_blocks
 )
 
 def test_extract_concentration_value():
@@ -57,4 +60,79 @@ def test_categorize_price_range():
 
 def test_calculate_benefit_score():
     assert calculate_benefit_score(["Benefit1", "Benefit2"]) == 20
-    assert calculate_benefit_score([]) == 0
\ No newline at end of file
+    assert calculate_benefit_score([]) == 0
+
+def test_normalize_product_coerces_and_trims():
+    raw = {
+        "name": "  GlowBoost Serum ",
+        "concentration": "10% Vitamin C",
+        "skin_type": ["oily", " COMBINATION", "Oily"],
+        "ingredients": "Vitamin C, Hyaluronic Acid",
+        "benefits": ["Brightening", " "],
+        "usage": "Apply daily",
+        "side_effects": "None",
+        "price": "Rs 699"
+    }
+    
+    product = normalize_product(raw)
+    
+    assert product["name"] == "GlowBoost Serum"
+    assert product["skin_type"] == ["Oily", "Combination"]
+    assert product["ingredients"] == ["Vitamin C", "Hyaluronic Acid"]
+    assert product["benefits"] == ["Brightening"]
+    assert product["price"] == 699
+
+def test_normalize_product_rejects_ambiguous_input():
+    raw = {
+        "name": "Serum",
+        "concentration": "10%",
+        "skin_type": ["Oily"],
+        "ingredients": ["Vitamin C"],
+        "benefits": ["Brightening"],
+        "usage": "Apply daily",
+        "side_effects": "None",
+        "price": 699
+    }
+    
+    with pytest.raises(ValueError):
+        normalize_product({**raw, "price": "699.50"})
+    with pytest.raises(ValueError):
+        normalize_product({**raw, "concentration": "Strong"})
+    with pytest.raises(ValueError):
+        normalize_product({k: v for k, v in raw.items() if k != "usage"})
+    with pytest.raises(TypeError):
+        normalize_product({**raw, "skin_type": [1]})
+
+@pytest.mark.parametrize("price, expected", [
+    ("Rs. 699", 699),
+    ("₹699", 699),
+    ("INR 1,299", 1299),
+    ("1,00,000", 100000),
+    ("699/-", 699),
+    (699.0, 699)
+])
+def test_parse_well_formed_price(price, expected):
+    assert parse_well_formed_price(price) == expected
+
+@pytest.mark.parametrize("price", ["699-999", "₹699 (MRP ₹999)", "699 for 30ml", "2 for 1199", "699.50", "1,2,3"])
+def test_parse_well_formed_price_rejects_multiple_or_partial_numbers(price):
+    with pytest.raises(ValueError):
+        parse_well_formed_price(price)
+
+def test_build_content_blocks_copies_product_fields():
+    product = {
+        "name": "Serum",
+        "benefits": ["Brightening", "Fades dark spots"],
+        "ingredients": ["Vitamin C"],
+        "usage": " Apply daily ",
+        "price": 699
+    }
+    
+    blocks = build_content_blocks(product)
+    
+    assert blocks["benefits"] == ["Brightening", "Fades dark spots"]
+    assert blocks["ingredients_block"] == ["Vitamin C"]
+    assert blocks["usage_block"] == "Apply daily"
+    assert blocks["price_block"] == {"price": 699, "currency": "INR"}
+    assert blocks["price_range"] == "Mid-range"
+    assert blocks["benefit_score"] == 20
@@ -0,0 +1,112 @@
+import json
+import shutil
+import pytest
+from unittest.mock import Mock
+from config import Config
+from incremental import ManifestStore, compute_fingerprint, PLAN_SKIP, PLAN_ASSEMBLE, PLAN_FULL
+from orchestrator import PipelineOrchestrator
+from agents.assembly_agent import AssemblyAgent
+
+PRODUCT = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": ["Oily", "Combination"],
+    "ingredients": ["Vitamin C", "Hyaluronic Acid"],
+    "benefits": ["Brightening", "Fades dark spots"],
+    "usage": "Apply 2-3 drops in the morning before sunscreen",
+    "side_effects": "Mild tingling for sensitive skin",
+    "price": 699
+}
+
+PRODUCT_B = dict(PRODUCT, name="RadiantGlow Serum", concentration="15% Vitamin C", price=899)
+
+@pytest.fixture
+def templates_dir(tmp_path, monkeypatch):
+    target = tmp_path / "templates"
+    shutil.copytree(Config.TEMPLATES_DIR, target)
+    monkeypatch.setattr(Config, "TEMPLATES_DIR", str(target))
+    return target
+
+def build_orchestrator():
+    orchestrator = PipelineOrchestrator(incremental=True)
+    orchestrator.parser_agent = Mock()
+    orchestrator.parser_agent.execute.return_value = dict(PRODUCT)
+    orchestrator.question_agent = Mock()
+    orchestrator.question_agent.execute.return_value = [
+        {"question": f"What is benefit number {i} of this serum?", "answer": f"Benefit {i} is brighter looking skin", "category": "informational"}
+        for i in range(15)
+    ]
+    orchestrator.block_agent = Mock()
+    orchestrator.block_agent.execute.return_value = {
+        "benefits": PRODUCT["benefits"],
+        "usage_block": PRODUCT["usage"],
+        "ingredients_block": PRODUCT["ingredients"],
+        "price_block": {"price": 699, "currency": "INR"}
+    }
+    orchestrator.comparison_agent = Mock()
+    orchestrator.comparison_agent.execute.return_value = (
+        PRODUCT_B,
+        {"stronger_formulation": PRODUCT_B["name"], "price_difference": -200, "better_for_oily_skin": PRODUCT["name"]}
+    )
+    orchestrator.assembly_agent = AssemblyAgent()
+    return orchestrator
+
+def test_fingerprint_tracks_input_prompts_and_templates(templates_dir):
+    base = compute_fingerprint(PRODUCT, ["prompt"])
+    
+    assert compute_fingerprint(dict(PRODUCT), ["prompt"]) == base
+    assert compute_fingerprint(dict(PRODUCT, price=700), ["prompt"])["input"] != base["input"]
+    assert compute_fingerprint(PRODUCT, ["new prompt"])["prompts"] != base["prompts"]
+    
+    (templates_dir / "faq_template.json").write_text('{"faqs": [], "version": 2}')
+    assert compute_fingerprint(PRODUCT, ["prompt"])["templates"] != base["templates"]
+
+def test_manifest_plan(tmp_path, templates_dir):
+    store = ManifestStore(str(tmp_path))
+    fingerprint = compute_fingerprint(PRODUCT, ["prompt"])
+    output = tmp_path / "faq.json"
+    output.write_text("{}")
+    
+    assert store.plan(fingerprint) == PLAN_FULL
+    
+    store.save(fingerprint, [str(output)])
+    assert store.plan(fingerprint) == PLAN_SKIP
+    assert store.plan(dict(fingerprint, templates="changed")) == PLAN_ASSEMBLE
+    assert store.plan(dict(fingerprint, input="changed")) == PLAN_FULL
+    
+    output.write_text('{"edited": true}')
+    assert store.plan(fingerprint) == PLAN_ASSEMBLE
+
+def test_incremental_run_skips_unchanged_product(tmp_path, templates_dir):
+    orchestrator = build_orchestrator()
+    output_dir = str(tmp_path / "out")
+    
+    first = orchestrator.process_product(PRODUCT, output_dir)
+    second = orchestrator.process_product(PRODUCT, output_dir)
+    
+    assert sorted(first) == sorted(second)
+    assert orchestrator.parser_agent.execute.call_count == 1
+    assert orchestrator.question_agent.execute.call_count == 1
+
+def test_incremental_run_reassembles_on_template_change(tmp_path, templates_dir):
+    orchestrator = build_orchestrator()
+    output_dir = tmp_path / "out"
+    orchestrator.process_product(PRODUCT, str(output_dir))
+    
+    (templates_dir / "product_template.json").write_text(json.dumps({
+        "name": "", "highlights": [], "usage_block": "", "ingredient_block": [], "pricing": {"currency": "INR"}
+    }))
+    orchestrator.process_product(PRODUCT, str(output_dir))
+    
+    assert orchestrator.parser_agent.execute.call_count == 1
+    assert orchestrator.block_agent.execute.call_count == 1
+    assert json.loads((output_dir / "product_page.json").read_text())["name"] == PRODUCT["name"]
+
+def test_incremental_run_regenerates_on_input_change(tmp_path, templates_dir):
+    orchestrator = build_orchestrator()
+    output_dir = str(tmp_path / "out")
+    
+    orchestrator.process_product(PRODUCT, output_dir)
+    orchestrator.process_product(dict(PRODUCT, price=749), output_dir)
+    
+    assert orchestrator.parser_agent.execute.call_count == 2
@@ -0,0 +1,72 @@
+import random
+import pytest
+from logic.deterministic import validate_ingredient_overlap
+from logic.ingredient_index import IngredientIndex
+
+INGREDIENTS = ["Vitamin C", "Niacinamide", "Hyaluronic Acid", "Retinol", "Zinc", "Ceramides", "Squalane"]
+
+def make_products(count, seed=11):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Product {index}",
+            "ingredients": [rng.choice([name, name.upper(), f" {name} "]) for name in rng.sample(INGREDIENTS, rng.randint(0, 5))]
+        }
+        for index in range(count)
+    ]
+
+def test_overlap_matches_reference():
+    products = make_products(20)
+    index = IngredientIndex.from_products(products)
+    
+    for product_a in products:
+        for product_b in products:
+            expected = validate_ingredient_overlap(product_a["ingredients"], product_b["ingredients"])
+            overlap = index.overlap(product_a["name"], product_b["name"])
+            for field in ("common_ingredients", "unique_to_a", "unique_to_b"):
+                assert sorted(overlap[field]) == sorted(expected[field])
+            assert overlap["overlap_percentage"] == pytest.approx(expected["overlap_percentage"])
+
+def test_interns_normalized_names_once():
+    index = IngredientIndex()
+    index.add("A", ["Vitamin C", " vitamin c", "Zinc"])
+    index.add("B", ["VITAMIN C"])
+    
+    assert index.names == ["vitamin c", "zinc"]
+    assert index.ingredients_of("A") == ["vitamin c", "zinc"]
+    assert index.containing("Vitamin C ") == ["A", "B"]
+    assert index.containing("Retinol") == []
+
+def test_sharing_at_least_and_overlap_percentages_match_scan():
+    products = make_products(50)
+    index = IngredientIndex.from_products(products)
+    query = ["Vitamin C", "Retinol", "Zinc", "Bakuchiol"]
+    
+    for k in (1, 2, 3):
+        expected = {
+            product["name"] for product in products
+            if len(validate_ingredient_overlap(query, product["ingredients"])["common_ingredients"]) >= k
+        }
+        assert {name for name, _ in index.sharing_at_least(query, k)} == expected
+    
+    percentages = index.overlap_percentages(query)
+    for product in products:
+        expected = validate_ingredient_overlap(query, product["ingredients"])["overlap_percentage"]
+        assert percentages.get(product["name"], 0) == pytest.approx(expected)
+
+def test_sharing_at_least_orders_by_count_and_excludes_self():
+    index = IngredientIndex()
+    index.add("A", ["Vitamin C", "Zinc", "Retinol"])
+    index.add("B", ["Vitamin C", "Zinc"])
+    index.add("C", ["Vitamin C"])
+    
+    assert index.sharing_at_least(index.ingredients_of("A"), 1, exclude="A") == [("B", 2), ("C", 1)]
+
+def test_re_adding_a_product_replaces_its_postings():
+    index = IngredientIndex()
+    index.add("A", ["Vitamin C", "Zinc"])
+    index.add("A", ["Retinol"])
+    
+    assert len(index) == 1
+    assert index.containing("Vitamin C") == []
+    assert index.containing("Retinol") == ["A"]
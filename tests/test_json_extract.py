@@ -0,0 +1,90 @@
+import json
+import pytest
+import json_extract
+from langchain_community.chat_models.fake import FakeListChatModel
+from agents.question_agent import QuestionAgent
+from json_extract import extract_json, scan_json_value, repair_json, recover_array_items, StreamingArrayParser
+
+def make_questions(start, count):
+    return [
+        {"question": f"Question number {i}?", "answer": f"Answer {i}", "category": "usage"}
+        for i in range(start, start + count)
+    ]
+
+def test_extract_plain_and_fenced_json():
+    assert extract_json('{"name": "Serum"}') == {"name": "Serum"}
+    assert extract_json('```json\n{"name": "Serum"}\n```') == {"name": "Serum"}
+
+def test_extract_skips_surrounding_prose():
+    response = 'Here is the product:\n{"name": "Serum", "note": "a } inside"}\nLet me know!'
+    assert extract_json(response) == {"name": "Serum", "note": "a } inside"}
+
+def test_scan_reports_truncated_values():
+    assert scan_json_value('x [1, [2, 3]] y') == ("[1, [2, 3]]", True)
+    assert scan_json_value('[{"a": 1}, {"b"') == ('[{"a": 1}, {"b"', False)
+    assert scan_json_value("no json here") == (None, False)
+
+def test_repair_trailing_commas_and_single_quotes():
+    repaired = repair_json("{'name': 'Serum', 'note': 'say \"hi\"', 'tags': ['it\\'s',],}")
+    assert json.loads(repaired) == {"name": "Serum", "note": 'say "hi"', "tags": ["it's"]}
+
+def test_repair_keeps_apostrophes_in_double_quoted_strings():
+    assert extract_json('{"usage": "Don\'t rinse",}') == {"usage": "Don't rinse"}
+
+def test_truncated_array_keeps_complete_items():
+    complete = make_questions(0, 14)
+    response = json.dumps(complete + make_questions(14, 1))
+    truncated = response[:response.rindex('"answer"')]
+    
+    assert extract_json(truncated) == complete
+    assert recover_array_items("[1, 2, 3") == [1, 2]
+
+def test_unrecoverable_response_raises_decode_error():
+    with pytest.raises(json.JSONDecodeError):
+        extract_json("not json at all")
+    with pytest.raises(json.JSONDecodeError):
+        extract_json('{"name": }')
+
+def test_pure_python_backend(monkeypatch):
+    monkeypatch.setattr(json_extract, "orjson", None)
+    assert extract_json("[{'a': 1,},]") == [{"a": 1}]
+
+def test_question_agent_tops_up_truncated_list():
+    response = json.dumps(make_questions(0, 15))
+    truncated = response[:response.rindex('{"question"')]
+    llm = FakeListChatModel(responses=[truncated, json.dumps(make_questions(14, 1))])
+    agent = QuestionAgent(llm, max_retries=1)
+    
+    questions = agent.execute({"name": "Serum"}, count=15)
+    
+    assert len(questions) == 15
+    assert questions[-1]["question"] == "Question number 14?"
+
+def test_streaming_parser_emits_items_as_they_close():
+    parser = StreamingArrayParser()
+    text = 'Here\'s the list: [{"question": "Does ] or { break it?"}, {"question": "b"}]'
+    
+    emitted = [(index, item) for index in range(len(text)) for item in parser.feed(text[index])]
+    
+    assert [item for _, item in emitted] == [{"question": "Does ] or { break it?"}, {"question": "b"}]
+    assert emitted[0][0] < text.index('{"question": "b"')
+    assert parser.finished
+
+def test_question_agent_stream_aborts_and_rerequests_missing():
+    first = make_questions(0, 3) + [make_questions(0, 1)[0]] + make_questions(3, 5)
+    llm = FakeListChatModel(responses=[json.dumps(first), json.dumps(make_questions(10, 2))])
+    agent = QuestionAgent(llm, max_retries=2)
+    seen = set()
+    
+    def check(question):
+        text = question["question"].lower()
+        if text in seen:
+            return "duplicate"
+        seen.add(text)
+    
+    questions = agent.stream({"name": "Serum"}, count=5, check=check)
+    
+    assert [q["question"] for q in questions] == [
+        "Question number 0?", "Question number 1?", "Question number 2?",
+        "Question number 10?", "Question number 11?"
+    ]
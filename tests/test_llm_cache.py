@@ -0,0 +1,116 @@
+import json
+import time
+import pytest
+from langchain_core.globals import set_llm_cache
+from langchain_community.chat_models.fake import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+from llm_cache import PersistentLLMCache, uncached
+
+def chat(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+def test_cache_round_trip(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"))
+    
+    assert cache.lookup("prompt", "gemini-0.0") is None
+    cache.update("prompt", "gemini-0.0", chat('{"price": 699}'))
+    
+    result = cache.lookup("prompt", "gemini-0.0")
+    assert isinstance(result, list)
+    assert result[0].text == '{"price": 699}'
+    assert isinstance(result[0], ChatGeneration)
+    assert cache.stats()["hits"] == 1
+
+def test_cache_key_includes_model_settings(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"))
+    cache.update("prompt", "model=a temperature=0", [Generation(text="A")])
+    
+    assert cache.lookup("prompt", "model=a temperature=0.7") is None
+    assert cache.lookup("other prompt", "model=a temperature=0") is None
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    PersistentLLMCache(path).update("prompt", "llm", chat("stored"))
+    
+    reopened = PersistentLLMCache(path)
+    
+    assert reopened.lookup("prompt", "llm")[0].text == "stored"
+    assert reopened.stats()["entries"] == 1
+
+def test_cache_expires_old_entries(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"), max_age_seconds=1)
+    cache.update("prompt", "llm", chat("old"))
+    cache.connection.execute("UPDATE responses SET created_at = ?", (time.time() - 10,))
+    
+    assert cache.lookup("prompt", "llm") is None
+    assert cache.stats()["entries"] == 0
+
+def test_cache_evicts_least_recently_used_over_size_limit(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"), max_bytes=150)
+    cache.update("first", "llm", chat("x" * 40))
+    time.sleep(0.01)
+    cache.update("second", "llm", chat("y" * 40))
+    time.sleep(0.01)
+    cache.lookup("first", "llm")
+    cache.update("third", "llm", chat("z" * 40))
+    
+    assert cache.lookup("second", "llm") is None
+    assert cache.lookup("first", "llm") is not None
+    assert cache.lookup("third", "llm") is not None
+    assert cache.stats()["bytes"] <= 150
+
+def test_cache_serves_chat_model_calls(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"))
+    llm = FakeListChatModel(responses=["first answer", "second answer"])
+    set_llm_cache(cache)
+    try:
+        assert llm.invoke("same prompt").content == "first answer"
+        assert llm.invoke("same prompt").content == "first answer"
+        assert llm.invoke("new prompt").content == "second answer"
+    finally:
+        set_llm_cache(None)
+    
+    assert cache.stats()["hits"] == 1
+
+def test_uncached_model_bypasses_the_cache(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"))
+    llm = FakeListChatModel(responses=["rejected answer", "new answer"])
+    set_llm_cache(cache)
+    try:
+        assert llm.invoke("same prompt").content == "rejected answer"
+        assert uncached(llm).invoke("same prompt").content == "new answer"
+        assert llm.invoke("same prompt").content == "rejected answer"
+    finally:
+        set_llm_cache(None)
+    
+    assert cache.stats()["entries"] == 1
+
+def test_accepted_faq_set_replaces_the_rejected_cached_reply(tmp_path):
+    from agents.question_agent import QuestionAgent
+    from orchestrator import PipelineOrchestrator
+    from quality.quality_enforcer import QualityEnforcer
+    
+    product = {"name": "GlowBoost Vitamin C Serum", "price": 699}
+    good_set = [
+        {"question": f"What is benefit number {i} of this serum?", "answer": f"Benefit {i} is a brighter and more even skin tone", "category": "informational"}
+        for i in range(15)
+    ]
+    bad_set = good_set[:14] + [{"question": "Bad", "answer": "Bad", "category": "informational"}]
+    llm = FakeListChatModel(responses=[json.dumps(bad_set)] + [json.dumps(good_set)] * 3)
+    
+    def run():
+        orchestrator = PipelineOrchestrator(faq_repair=False, stream_faqs=False)
+        orchestrator.quality_enforcer = QualityEnforcer()
+        orchestrator.question_agent = QuestionAgent(llm)
+        return orchestrator.generate_validated_questions(product)
+    
+    set_llm_cache(PersistentLLMCache(str(tmp_path / "cache.sqlite")))
+    try:
+        assert run() == good_set
+        calls = llm.i
+        assert run() == good_set
+    finally:
+        set_llm_cache(None)
+    
+    assert llm.i == calls
@@ -0,0 +1,117 @@
+import time
+import threading
+import pytest
+from langchain_community.chat_models.fake import FakeListChatModel
+from llm_governor import GovernedChatModel, LLMGovernor, TokenBucket, govern, is_throttle_error
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    
+    assert bucket.wait_time(1, now) == 0.0
+    bucket.charge(60, now)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == pytest.approx(0.0)
+
+def test_is_throttle_error():
+    assert is_throttle_error(Exception("429 Resource has been exhausted (e.g. check quota)."))
+    assert is_throttle_error(type("ResourceExhausted", (Exception,), {})("limit"))
+    assert not is_throttle_error(ValueError("Invalid JSON"))
+
+def test_aimd_halves_on_throttle_and_ramps_on_success():
+    governor = LLMGovernor(max_concurrency=8, min_concurrency=1, initial_concurrency=8)
+    
+    first = governor.acquire(0)
+    second = governor.acquire(0)
+    governor.release(first, throttled=True)
+    governor.release(second, throttled=True)
+    
+    assert governor.limit == 4
+    
+    epoch = governor.acquire(0)
+    governor.release(epoch)
+    assert governor.limit == pytest.approx(4.25)
+
+def test_aimd_never_drops_below_minimum():
+    governor = LLMGovernor(max_concurrency=4, min_concurrency=2, initial_concurrency=4)
+    for _ in range(5):
+        governor.release(governor.acquire(0), throttled=True)
+    
+    assert governor.limit == 2
+
+def test_governor_limits_in_flight_calls():
+    governor = LLMGovernor(max_concurrency=2, initial_concurrency=2)
+    active = [0]
+    peak = [0]
+    lock = threading.Lock()
+    
+    def call():
+        with governor.slot(1):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+    
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert peak[0] <= 2
+
+def test_governor_serves_higher_priority_first():
+    governor = LLMGovernor(max_concurrency=1, initial_concurrency=1)
+    holder = governor.acquire(0)
+    order = []
+    
+    def call(priority):
+        with governor.slot(priority):
+            order.append(priority)
+    
+    threads = []
+    for priority in (3, 1, 2):
+        thread = threading.Thread(target=call, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+    
+    governor.release(holder)
+    for thread in threads:
+        thread.join()
+    
+    assert order == [1, 2, 3]
+
+def test_governor_enforces_request_rate():
+    governor = LLMGovernor(requests_per_minute=60, max_concurrency=4)
+    governor.request_bucket.level = 1
+    
+    start = time.monotonic()
+    governor.release(governor.acquire(0))
+    governor.release(governor.acquire(0))
+    
+    assert time.monotonic() - start >= 0.9
+
+def test_governed_chat_model_delegates_to_wrapped_model():
+    inner = FakeListChatModel(responses=["hello"])
+    governor = LLMGovernor()
+    llm = govern(inner, governor, 2)
+    
+    assert isinstance(llm, GovernedChatModel)
+    assert llm.invoke("prompt").content == "hello"
+    assert llm._identifying_params == inner._identifying_params
+    assert governor.in_flight == 0
+    assert govern(inner, None, 2) is inner
+
+def test_governed_stream_releases_slot_when_closed_early():
+    governor = LLMGovernor(max_concurrency=1, min_concurrency=1, initial_concurrency=1)
+    llm = govern(FakeListChatModel(responses=["streamed response"]), governor, 0)
+    
+    stream = llm.stream("hello")
+    assert next(stream).content == "s"
+    assert governor.in_flight == 1
+    stream.close()
+    
+    assert governor.in_flight == 0
@@ -0,0 +1,97 @@
+import json
+import pytest
+from pydantic import ValidationError
+from metrics import MetricsRegistry
+from schemas import Product
+
+def test_counters_and_summaries():
+    registry = MetricsRegistry()
+    registry.increment("agent_retries_total", agent="BlockAgent")
+    registry.increment("agent_retries_total", agent="BlockAgent")
+    registry.observe("llm_prompt_tokens", 120, agent="QuestionAgent")
+    registry.observe("llm_prompt_tokens", 80, agent="QuestionAgent")
+    
+    assert registry.counter_value("agent_retries_total", agent="BlockAgent") == 2
+    assert registry.summary("llm_prompt_tokens", agent="QuestionAgent") == {"count": 2, "sum": 200, "max": 120}
+
+def test_timer_labels_status():
+    registry = MetricsRegistry()
+    
+    with registry.timer("pipeline_stage_seconds", stage="blocks"):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.timer("pipeline_stage_seconds", stage="blocks"):
+            raise RuntimeError("boom")
+    
+    assert registry.summary("pipeline_stage_seconds", stage="blocks", status="ok")["count"] == 1
+    assert registry.summary("pipeline_stage_seconds", stage="blocks", status="error")["count"] == 1
+
+def test_record_failure_classifies_errors():
+    registry = MetricsRegistry()
+    
+    with pytest.raises(json.JSONDecodeError) as parse_error:
+        json.loads("{broken")
+    with pytest.raises(ValidationError) as validation_error:
+        Product(name="x")
+    
+    registry.record_failure("BlockAgent", parse_error.value)
+    registry.record_failure("BlockAgent", validation_error.value)
+    registry.record_failure("BlockAgent", TimeoutError("slow"))
+    
+    assert registry.counter_value("json_parse_failures_total", agent="BlockAgent") == 1
+    assert registry.counter_value("validation_failures_total", agent="BlockAgent") == 1
+    assert registry.counter_value("agent_errors_total", agent="BlockAgent", error="TimeoutError") == 1
+
+def test_prometheus_export():
+    registry = MetricsRegistry()
+    registry.increment("json_parse_failures_total", agent='Quoted "Agent"')
+    registry.observe("llm_call_seconds", 0.5, agent="BlockAgent")
+    
+    text = registry.to_prometheus()
+    
+    assert "# TYPE json_parse_failures_total counter" in text
+    assert 'json_parse_failures_total{agent="Quoted \\"Agent\\""} 1' in text
+    assert "# TYPE llm_call_seconds summary" in text
+    assert 'llm_call_seconds_count{agent="BlockAgent"} 1' in text
+    assert 'llm_call_seconds_sum{agent="BlockAgent"} 0.500000' in text
+
+def test_export_writes_jsonl_and_prometheus(tmp_path):
+    registry = MetricsRegistry()
+    registry.observe("pipeline_stage_seconds", 1.25, stage="questions", status="ok")
+    registry.increment("agent_retries_total", agent="ComparisonAgent")
+    
+    registry.export(str(tmp_path / "metrics"))
+    
+    events = [json.loads(line) for line in (tmp_path / "metrics" / "metrics.jsonl").read_text().splitlines()]
+    assert events[0]["metric"] == "pipeline_stage_seconds"
+    assert events[0]["stage"] == "questions"
+    assert events[1]["agent"] == "ComparisonAgent"
+    assert "agent_retries_total" in (tmp_path / "metrics" / "metrics.prom").read_text()
+
+def test_event_buffer_is_capped_without_a_stream(tmp_path):
+    registry = MetricsRegistry(max_events=3)
+    for i in range(10):
+        registry.increment("agent_retries_total", attempt=i)
+    
+    registry.write_jsonl(str(tmp_path / "metrics.jsonl"))
+    
+    events = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [event["attempt"] for event in events] == [7, 8, 9]
+    assert registry.dropped_events == 7
+    assert registry.counter_total("agent_retries_total") == 10
+
+def test_streamed_events_are_written_as_they_happen(tmp_path):
+    registry = MetricsRegistry(max_events=4)
+    path = tmp_path / "metrics" / "metrics.jsonl"
+    registry.increment("agent_retries_total")
+    registry.stream_events(str(path))
+    for _ in range(9):
+        registry.observe("llm_call_seconds", 0.1)
+    
+    assert len(path.read_text().splitlines()) == 9
+    assert len(registry.events) == 1
+    
+    registry.export(str(tmp_path / "metrics"))
+    
+    assert len(path.read_text().splitlines()) == 10
+    assert registry.dropped_events == 0
@@ -0,0 +1,142 @@
+import pytest
+from quality.near_duplicate import FAQStore, NearDuplicateIndex, choose_bands, name_tokens, shingles
+from quality.quality_enforcer import QualityEnforcer
+
+NAME = "GlowBoost Vitamin C Serum"
+
+PARAPHRASES = [
+    ("How should I apply it?", "How do I apply it?"),
+    ("What are the key ingredients in this serum?", "What are the main ingredients in this serum?"),
+    (f"Is {NAME} safe for sensitive skin?", f"Is {NAME} safe to use on sensitive skin?"),
+    (f"Can I use {NAME} every day?", f"Should I use {NAME} every day?"),
+    (f"How often should I apply {NAME}?", f"How often do I need to apply {NAME}?"),
+    (f"What are the benefits of {NAME}?", f"What benefits does {NAME} offer?"),
+    (f"Does {NAME} cause irritation?", f"Can {NAME} cause irritation?"),
+    (f"How long does it take to see results with {NAME}?", f"How long until I see results from {NAME}?")
+]
+
+DISTINCT = [
+    (f"Is {NAME} suitable for oily skin?", f"Is {NAME} suitable for dry skin?"),
+    (f"Can I use {NAME} with retinol?", f"Can I use {NAME} with niacinamide?"),
+    (f"When should I apply {NAME}?", f"How should I apply {NAME}?"),
+    (f"Can I use {NAME} during pregnancy?", f"Can I use {NAME} while breastfeeding?"),
+    (f"Is {NAME} safe for sensitive skin?", f"Is {NAME} safe for acne-prone skin?"),
+    (f"What is the price of {NAME}?", f"What is the shelf life of {NAME}?"),
+    (f"Can I use {NAME} in the morning?", f"Can I use {NAME} at night?"),
+    (f"How much does {NAME} cost?", f"How much {NAME} should I apply?"),
+    (f"Does {NAME} contain fragrance?", f"Does {NAME} contain alcohol?")
+]
+
+def test_shingles_drop_stopwords_product_name_and_plurals():
+    assert shingles("What's  IT?", 1) == shingles("what s it", 1)
+    assert shingles(f"What are the ingredients of {NAME}?", 1, ignore=name_tokens(NAME)) == {"what", "ingredient"}
+    assert shingles("Is it?", 1) == {"is", "it"}
+    assert shingles("How do I apply it", 2) == {"how apply"}
+
+def test_choose_bands_puts_threshold_at_or_below_target():
+    bands, rows = choose_bands(128, 0.7)
+    
+    assert bands * rows <= 128
+    assert (1 / bands) ** (1 / rows) <= 0.7
+
+@pytest.mark.parametrize("first, second", PARAPHRASES)
+def test_index_matches_paraphrases(first, second):
+    index = NearDuplicateIndex()
+    index.add(NAME, first, name_tokens(NAME))
+    
+    assert index.find(second, ignore=name_tokens(NAME)) is not None
+
+@pytest.mark.parametrize("first, second", DISTINCT)
+def test_index_keeps_distinct_questions_about_the_same_product(first, second):
+    index = NearDuplicateIndex()
+    index.add(NAME, first, name_tokens(NAME))
+    
+    assert index.find(second, ignore=name_tokens(NAME)) is None
+
+def test_index_keeps_questions_that_differ_by_number():
+    index = NearDuplicateIndex()
+    index.add(NAME, "Can I apply 2 drops of the serum at night?")
+    
+    assert index.find("Can I apply 3 drops of the serum at night?") is None
+    assert index.find("Can I apply 2 drops of this serum at night?") is not None
+
+def test_faq_store_persists_and_skips_same_product(tmp_path):
+    path = tmp_path / "faqs.jsonl"
+    FAQStore(str(path)).add("Product A", "Is this serum safe for sensitive skin?")
+    
+    store = FAQStore(str(path))
+    assert len(store) == 1
+    assert store.find("Is the serum safe for sensitive skin?")[0] == "Product A"
+    assert store.find("Is the serum safe for sensitive skin?", exclude_key="Product A") is None
+
+def test_faq_store_skips_invalid_lines(tmp_path):
+    path = tmp_path / "faqs.jsonl"
+    path.write_text('{"key": "A", "question": "Q", "signature": [1, 2]}\nnot json\n')
+    
+    assert len(FAQStore(str(path))) == 0
+
+def test_enforcer_deduplicates_against_store_across_products(tmp_path):
+    enforcer = QualityEnforcer(FAQStore(str(tmp_path / "faqs.jsonl")))
+    question = {"question": "Is this serum safe for sensitive skin?", "answer": "Yes", "category": "safety"}
+    
+    enforcer.remember("Product A", [question])
+    
+    assert enforcer.deduplicate_questions([question], "Product A") == [question]
+    assert enforcer.deduplicate_questions([question], "Product B") == []
+
+def test_enforcer_removes_paraphrases_within_product():
+    enforcer = QualityEnforcer()
+    questions = [
+        {"question": "What are the key ingredients in this serum?", "answer": "A", "category": "informational"},
+        {"question": "What are the main ingredients in this serum?", "answer": "B", "category": "informational"},
+        {"question": "How much does this serum cost?", "answer": "C", "category": "purchase"}
+    ]
+    
+    result = enforcer.deduplicate_questions(questions)
+    
+    assert [q["answer"] for q in result] == ["A", "C"]
+
+def test_enforcer_ignores_product_name_when_deduplicating():
+    enforcer = QualityEnforcer()
+    questions = [
+        {"question": first, "answer": "A", "category": "informational"}
+        for pair in DISTINCT[:2] for first in pair
+    ]
+    
+    assert enforcer.deduplicate_questions(questions, NAME) == questions
+
+def test_faq_store_does_not_grow_on_repeated_runs(tmp_path):
+    path = tmp_path / "faqs.jsonl"
+    questions = ["Is this serum safe for sensitive skin?", "How often should I apply it?"]
+    store = FAQStore(str(path))
+    
+    for _ in range(3):
+        store.replace("Product A", questions)
+        store.add("Product A", questions[0])
+    
+    assert len(store) == 2
+    assert len(path.read_text().splitlines()) == 2
+
+def test_faq_store_replaces_a_products_questions(tmp_path):
+    path = tmp_path / "faqs.jsonl"
+    store = FAQStore(str(path))
+    store.replace("Product A", ["Is this serum safe for sensitive skin?"])
+    store.replace("Product B", ["Can I use it with retinol?"])
+    store.replace("Product A", ["Does it contain fragrance?"])
+    
+    reloaded = FAQStore(str(path))
+    
+    assert len(reloaded) == 2
+    assert reloaded.find("Is the serum safe for sensitive skin?") is None
+    assert reloaded.find("Does this contain fragrance?")[0] == "Product A"
+    assert len(path.read_text().splitlines()) == 2
+
+def test_faq_store_compacts_when_replaced_entries_dominate(tmp_path):
+    path = tmp_path / "faqs.jsonl"
+    store = FAQStore(str(path))
+    for version in range(10):
+        store.replace("Product A", [f"What changed in batch {version}?"])
+        assert len(store.signatures) <= 2
+        assert len(path.read_text().splitlines()) <= 3
+    
+    assert len(FAQStore(str(path)).signatures) == len(store) == 1
@@ -1,4 +1,5 @@
 import pytest
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 from orchestrator import PipelineOrchestrator, RecoverableError, NonRecoverableError
@@ -66,7 +67,7 @@ def test_orchestrator_retries_on_recoverable_error():
     
     attempt_count = [0]
     
-    def side_effect_generator(*args):
+    def side_effect_generator(*args, **kwargs):
         attempt_count[0] += 1
         if attempt_count[0] < 2:
             raise RecoverableError("Try again")
@@ -120,4 +121,142 @@ def test_orchestrator_cleanup_removes_all_output_files(tmp_path):
     orchestrator.cleanup_outputs()
     
     for f in output_files:
-        assert not f.exists()
\ No newline at end of file
+        assert not f.exists()
+
+def test_orchestrator_runs_content_stages_concurrently():
+    orchestrator = PipelineOrchestrator(concurrent_stages=True)
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def gated(result):
+        def stage(product, *args):
+            barrier.wait()
+            return result
+        return stage
+    
+    with patch.object(orchestrator, 'generate_validated_questions', side_effect=gated(["q"])):
+        with patch.object(orchestrator, 'generate_blocks', side_effect=gated({"b": 1})):
+            with patch.object(orchestrator, 'generate_comparison', side_effect=gated(({"name": "B"}, {"c": 1}))):
+                result = orchestrator.generate_content({})
+    
+    assert result == (["q"], {"b": 1}, {"name": "B"}, {"c": 1})
+
+def test_orchestrator_concurrent_stage_failure_is_non_recoverable():
+    orchestrator = PipelineOrchestrator(concurrent_stages=True)
+    orchestrator.quality_enforcer = Mock()
+    orchestrator.question_agent = Mock()
+    orchestrator.question_agent.execute.side_effect = RecoverableError("Always fails")
+    
+    with patch.object(orchestrator, 'initialize_agents'):
+        with patch.object(orchestrator, 'load_input', return_value={}):
+            with patch.object(orchestrator, 'parse_product', return_value={}):
+                with patch.object(orchestrator, 'generate_blocks', return_value={}):
+                    with patch.object(orchestrator, 'generate_comparison', return_value=({}, {})):
+                        with patch.object(orchestrator, 'assemble_outputs') as mock_assemble:
+                            result = orchestrator.run("input.json")
+    
+    assert result is False
+    mock_assemble.assert_not_called()
+
+def make_question(i, text=None):
+    return {
+        "question": text or f"What is benefit number {i} of this serum?",
+        "answer": f"Benefit {i} is a brighter and more even skin tone",
+        "category": "informational"
+    }
+
+def test_orchestrator_repairs_only_failed_questions():
+    from quality.quality_enforcer import QualityEnforcer
+    orchestrator = PipelineOrchestrator(faq_repair=True)
+    orchestrator.quality_enforcer = QualityEnforcer()
+    orchestrator.question_agent = Mock()
+    
+    first_set = [make_question(i) for i in range(13)] + [make_question(0), make_question(13, "Bad")]
+    replacements = [make_question(20), make_question(21)]
+    orchestrator.question_agent.execute.side_effect = [first_set, replacements]
+    
+    questions = orchestrator.generate_validated_questions({})
+    
+    assert len(questions) == 15
+    assert questions[-2:] == replacements
+    repair_call = orchestrator.question_agent.execute.call_args_list[1]
+    assert repair_call.kwargs["count"] == 2
+    assert len(repair_call.kwargs["exclude"]) == 13
+
+def test_orchestrator_regenerates_full_set_without_repair_mode():
+    from quality.quality_enforcer import QualityEnforcer
+    orchestrator = PipelineOrchestrator(faq_repair=False)
+    orchestrator.quality_enforcer = QualityEnforcer()
+    orchestrator.question_agent = Mock()
+    
+    bad_set = [make_question(i) for i in range(14)] + [make_question(14, "Bad")]
+    good_set = [make_question(i) for i in range(15)]
+    orchestrator.question_agent.execute.side_effect = [bad_set, good_set]
+    
+    questions = orchestrator.generate_validated_questions({})
+    
+    assert len(questions) == 15
+    assert orchestrator.question_agent.execute.call_args_list[0].kwargs == {}
+    assert orchestrator.question_agent.execute.call_args_list[1].kwargs == {"fresh": True}
+
+def make_gated_orchestrator():
+    orchestrator = PipelineOrchestrator()
+    orchestrator.block_agent = Mock()
+    orchestrator.block_agent.usage_llm = True
+    orchestrator.comparison_agent = Mock()
+    return orchestrator
+
+GOOD_BLOCKS = {
+    "benefits": ["Brightening", "Evens tone"],
+    "usage_block": "Apply two drops every morning",
+    "ingredients_block": ["Vitamin C"],
+    "price_block": {"price": 699, "currency": "INR"}
+}
+
+def test_block_gate_re_requests_only_the_usage_block():
+    orchestrator = make_gated_orchestrator()
+    orchestrator.block_agent.execute.return_value = {**GOOD_BLOCKS, "usage_block": "Use"}
+    orchestrator.block_agent.usage_block.return_value = "Apply two drops after cleansing"
+    
+    blocks = orchestrator.generate_blocks({"name": "Serum"})
+    
+    assert blocks["usage_block"] == "Apply two drops after cleansing"
+    assert blocks["benefits"] == GOOD_BLOCKS["benefits"]
+    assert orchestrator.block_agent.execute.call_count == 1
+    feedback = orchestrator.block_agent.usage_block.call_args[0][1]
+    assert "Usage block too short" in feedback
+
+def test_block_gate_fails_fast_on_deterministic_fields():
+    orchestrator = make_gated_orchestrator()
+    orchestrator.block_agent.execute.return_value = {**GOOD_BLOCKS, "benefits": ["Brightening"]}
+    
+    with pytest.raises(NonRecoverableError, match="few_benefits"):
+        orchestrator.generate_blocks({"name": "Serum"})
+    orchestrator.block_agent.usage_block.assert_not_called()
+
+def test_comparison_gate_requests_a_different_competitor():
+    orchestrator = make_gated_orchestrator()
+    orchestrator.comparison_agent.execute.side_effect = [
+        ({"name": "Twin"}, {"price_difference": 0, "stronger_formulation": "Serum"}),
+        ({"name": "Rival"}, {"price_difference": -200, "stronger_formulation": "Rival"})
+    ]
+    
+    product_b, comparison = orchestrator.generate_comparison({"name": "Serum"})
+    
+    assert product_b == {"name": "Rival"}
+    retry = orchestrator.comparison_agent.execute.call_args_list[1]
+    assert retry.kwargs["exclude"] == ["Twin"]
+    assert "Twin" in retry.kwargs["feedback"]
+
+def test_quality_gates_share_one_retry_budget():
+    orchestrator = make_gated_orchestrator()
+    orchestrator.quality_retry_budget = 1
+    orchestrator.block_agent.execute.return_value = {**GOOD_BLOCKS, "usage_block": "Use"}
+    orchestrator.block_agent.usage_block.return_value = "Apply two drops after cleansing"
+    orchestrator.comparison_agent.execute.return_value = ({"name": "Twin"}, {"price_difference": 0, "stronger_formulation": "Serum"})
+    
+    with patch.object(orchestrator, 'generate_validated_questions', return_value=[]):
+        with pytest.raises(NonRecoverableError):
+            orchestrator.generate_content({"name": "Serum"})
+    
+    assert orchestrator.block_agent.usage_block.call_count == 1
+    assert orchestrator.comparison_agent.execute.call_count == 1
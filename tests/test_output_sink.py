@@ -0,0 +1,170 @@
+import json
+import pytest
+import threading
+from unittest.mock import Mock, patch
+from langchain_community.chat_models.fake import FakeListChatModel
+from output_sink import BackgroundWriter, FileSink, JSONLSink, OutputWriteError, SQLiteSink, TarSink, open_sink, read_outputs
+from metrics import metrics
+from utils import save_json_file, write_atomic
+
+PAGE = {"faqs": [{"question": "How do I apply it?", "answer": "Two drops every morning"}]}
+
+def test_atomic_write_keeps_previous_file_on_failure(tmp_path):
+    target = tmp_path / "faq.json"
+    save_json_file({"version": 1}, str(target))
+    
+    with patch("utils.os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            write_atomic(str(target), b'{"version": 2}')
+    
+    assert json.loads(target.read_text()) == {"version": 1}
+    assert [path.name for path in tmp_path.iterdir()] == ["faq.json"]
+
+def test_file_sink_matches_save_json_file(tmp_path):
+    FileSink(str(tmp_path)).write(str(tmp_path / "a" / "faq.json"), PAGE)
+    save_json_file(PAGE, str(tmp_path / "b" / "faq.json"))
+    
+    assert (tmp_path / "a" / "faq.json").read_bytes() == (tmp_path / "b" / "faq.json").read_bytes()
+
+def test_jsonl_sink_rotates_append_only_shards(tmp_path):
+    sink = JSONLSink(str(tmp_path), shard_size=2)
+    sink.write_many({str(tmp_path / f"p{i}" / "faq.json"): dict(PAGE, index=i) for i in range(5)})
+    sink.close()
+    
+    reopened = JSONLSink(str(tmp_path), shard_size=2)
+    reopened.write(str(tmp_path / "p0" / "faq.json"), dict(PAGE, index=9))
+    reopened.close()
+    
+    shards = sorted(path.name for path in tmp_path.glob("outputs-*.jsonl"))
+    assert shards == ["outputs-00000.jsonl", "outputs-00001.jsonl", "outputs-00002.jsonl", "outputs-00003.jsonl"]
+    outputs = read_outputs(str(tmp_path))
+    assert len(outputs) == 5
+    assert outputs["p0/faq.json"]["index"] == 9
+
+def test_jsonl_reader_skips_torn_trailing_record(tmp_path):
+    sink = JSONLSink(str(tmp_path))
+    sink.write(str(tmp_path / "faq.json"), PAGE)
+    sink.close()
+    with open(tmp_path / "outputs-00000.jsonl", "a") as f:
+        f.write('{"path": "product_page.json", "da')
+    
+    assert read_outputs(str(tmp_path)) == {"faq.json": PAGE}
+
+def test_sqlite_sink_replaces_rows_per_path(tmp_path):
+    sink = SQLiteSink(str(tmp_path), commit_records=100)
+    sink.write(str(tmp_path / "p1" / "faq.json"), PAGE)
+    sink.write(str(tmp_path / "p1" / "faq.json"), dict(PAGE, version=2))
+    sink.flush()
+    
+    assert read_outputs(str(tmp_path / "outputs.sqlite")) == {"p1/faq.json": dict(PAGE, version=2)}
+    sink.close()
+
+def test_tar_bundle_appears_only_when_closed(tmp_path):
+    sink = TarSink(str(tmp_path))
+    sink.write_many({str(tmp_path / "p1" / "faq.json"): PAGE, str(tmp_path / "p1" / "comparison_page.json"): {"c": 1}})
+    assert not (tmp_path / "outputs.tar").exists()
+    
+    sink.close()
+    
+    assert read_outputs(str(tmp_path / "outputs.tar")) == {"p1/faq.json": PAGE, "p1/comparison_page.json": {"c": 1}}
+    assert not (tmp_path / ".outputs.tar.tmp").exists()
+
+def test_background_writer_drains_before_flush_returns(tmp_path):
+    metrics.reset()
+    writer = BackgroundWriter(JSONLSink(str(tmp_path)), max_pending=2)
+    for i in range(20):
+        writer.write(str(tmp_path / f"p{i}" / "faq.json"), PAGE)
+    writer.flush()
+    
+    assert len(read_outputs(str(tmp_path))) == 20
+    writer.close()
+    assert metrics.counter_value("output_records_total", sink="jsonl") == 20
+
+def test_background_writer_stays_failed_and_reports_dropped_pages(tmp_path):
+    sink = JSONLSink(str(tmp_path))
+    writer = BackgroundWriter(sink)
+    queued = threading.Event()
+    
+    def fail(records):
+        queued.wait(5)
+        raise OSError("disk full")
+    
+    with patch.object(sink, "store", side_effect=fail):
+        writer.write(str(tmp_path / "p1" / "faq.json"), PAGE)
+        writer.write(str(tmp_path / "p2" / "faq.json"), PAGE)
+        queued.set()
+        with pytest.raises(OutputWriteError) as first:
+            writer.flush()
+    
+    assert first.value.paths == [str(tmp_path / "p1" / "faq.json"), str(tmp_path / "p2" / "faq.json")]
+    with pytest.raises(OutputWriteError):
+        writer.write(str(tmp_path / "p3" / "faq.json"), PAGE)
+    with pytest.raises(OutputWriteError):
+        writer.flush()
+    with pytest.raises(OutputWriteError):
+        writer.close()
+    with pytest.raises(RuntimeError):
+        writer.write(str(tmp_path / "p4" / "faq.json"), PAGE)
+
+def test_batch_fails_when_queued_outputs_were_dropped(tmp_path):
+    from batch import BatchRunner
+    from orchestrator import NonRecoverableError
+    orchestrator = Mock()
+    orchestrator.close_outputs.side_effect = OutputWriteError(OSError("disk full"), ["p1/faq.json"])
+    source = tmp_path / "catalog.jsonl"
+    source.write_text(json.dumps({"name": "Serum"}))
+    
+    with pytest.raises(NonRecoverableError, match="p1/faq.json"):
+        BatchRunner(orchestrator=orchestrator, workers=1, output_dir=str(tmp_path / "out")).run(str(source))
+    assert not (tmp_path / "out" / "batch_summary.json").exists()
+
+def test_open_sink_rejects_unknown_kind(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path), kind="zip")
+    assert isinstance(open_sink(str(tmp_path), kind="files", background=False), FileSink)
+
+def test_incremental_mode_requires_file_outputs(tmp_path):
+    from orchestrator import PipelineOrchestrator, NonRecoverableError
+    orchestrator = PipelineOrchestrator(incremental=True, output_sink=JSONLSink(str(tmp_path)))
+    
+    with pytest.raises(NonRecoverableError, match="OUTPUT_SINK=files"):
+        orchestrator.initialize_agents(FakeListChatModel(responses=[]))
+
+def test_failed_assembly_writes_no_pages(tmp_path):
+    from orchestrator import PipelineOrchestrator, NonRecoverableError
+    from agents.assembly_agent import AssemblyAgent
+    orchestrator = PipelineOrchestrator()
+    sink = JSONLSink(str(tmp_path))
+    orchestrator.assembly_agent = AssemblyAgent(sink=sink)
+    questions = [{"question": f"Q{i}?", "answer": f"A{i}", "category": "informational"} for i in range(15)]
+    blocks = {"benefits": ["a", "b"], "usage_block": "Apply daily", "ingredients_block": ["x"], "price_block": {"price": 1}}
+    
+    with pytest.raises(NonRecoverableError):
+        orchestrator.assemble_outputs({"name": "Serum"}, questions, blocks, {"name": "Rival"}, {"bad": True}, str(tmp_path))
+    sink.close()
+    
+    assert read_outputs(str(tmp_path)) == {}
+
+def test_atomic_write_keeps_umask_file_mode(tmp_path):
+    reference = tmp_path / "reference.json"
+    reference.write_text("{}")
+    target = tmp_path / "faq.json"
+    
+    save_json_file(PAGE, str(target))
+    
+    assert target.stat().st_mode & 0o777 == reference.stat().st_mode & 0o777
+
+def test_failed_run_closes_the_sink_before_cleanup(tmp_path):
+    from orchestrator import PipelineOrchestrator, NonRecoverableError
+    events = []
+    sink = Mock()
+    sink.close.side_effect = lambda: events.append("close")
+    orchestrator = PipelineOrchestrator(output_sink=sink)
+    
+    with patch.object(orchestrator, 'initialize_agents'):
+        with patch.object(orchestrator, 'load_input', return_value={}):
+            with patch.object(orchestrator, 'process_product', side_effect=NonRecoverableError("Comparison failed")):
+                with patch.object(orchestrator, 'cleanup_outputs', side_effect=lambda: events.append("cleanup")):
+                    assert orchestrator.run("input.json") is False
+    
+    assert events == ["close", "cleanup"]
@@ -0,0 +1,88 @@
+import json
+import pytest
+from langchain.prompts import PromptTemplate
+from langchain_community.chat_models.fake import FakeListChatModel
+from schemas import Product
+from prompting import (
+    PromptRenderer,
+    estimate_tokens,
+    get_format_instructions,
+    serialize_compact
+)
+from agents_lcel.parser_agent_lcel import ProductParserAgentLCEL
+from metrics import metrics
+
+PRODUCT = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": ["Oily", "Combination"],
+    "ingredients": ["Vitamin C", "Hyaluronic Acid", "Niacinamide", "Ferulic Acid", "Vitamin E"],
+    "benefits": ["Brightening", "Fades dark spots", "Hydration"],
+    "usage": "Apply 2-3 drops in the morning before sunscreen",
+    "side_effects": "Mild tingling for sensitive skin",
+    "price": 699
+}
+
+PROMPT = PromptTemplate(input_variables=["product"], template="Describe this product: {product}")
+
+def test_serialize_compact_has_no_whitespace_padding():
+    assert serialize_compact({"a": [1, 2], "b": "Vitamin C"}) == '{"a":[1,2],"b":"Vitamin C"}'
+    assert len(serialize_compact(PRODUCT)) < len(json.dumps(PRODUCT, indent=2))
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+def test_format_instructions_are_cached_per_schema():
+    first = get_format_instructions(Product)
+    
+    assert get_format_instructions(Product) is first
+    assert "concentration" in first
+
+def test_renderer_without_budget_keeps_payload():
+    renderer = PromptRenderer(PROMPT, "test-full", token_budget=0)
+    
+    variables = renderer.render("product", PRODUCT)
+    
+    assert json.loads(variables["product"]) == PRODUCT
+
+def test_renderer_trims_longest_list_deterministically():
+    full_tokens = estimate_tokens(PROMPT.format(product=serialize_compact(PRODUCT)))
+    renderer = PromptRenderer(PROMPT, "test-trim", token_budget=full_tokens - 10)
+    
+    first = json.loads(renderer.render("product", PRODUCT)["product"])
+    second = json.loads(renderer.render("product", PRODUCT)["product"])
+    
+    assert first == second
+    assert first["ingredients"] == PRODUCT["ingredients"][:len(first["ingredients"])]
+    assert len(first["ingredients"]) < len(PRODUCT["ingredients"])
+    assert first["benefits"] == PRODUCT["benefits"]
+    assert len(PRODUCT["ingredients"]) == 5
+
+def test_renderer_never_empties_lists():
+    renderer = PromptRenderer(PROMPT, "test-floor", token_budget=1)
+    
+    trimmed = json.loads(renderer.render("product", PRODUCT)["product"])
+    
+    assert trimmed["ingredients"] == ["Vitamin C"]
+    assert trimmed["benefits"] == ["Brightening"]
+
+def test_renderer_records_token_metrics():
+    renderer = PromptRenderer(PROMPT, "test-metrics", token_budget=0)
+    renderer.render("product", PRODUCT)
+    renderer.render("product", PRODUCT)
+    
+    stats = metrics.summary("llm_prompt_tokens", agent="test-metrics")
+    
+    assert stats["count"] == 2
+    assert stats["sum"] == 2 * stats["max"]
+
+def test_lcel_parser_uses_cached_format_instructions():
+    llm = FakeListChatModel(responses=[json.dumps(PRODUCT)])
+    agent = ProductParserAgentLCEL(llm)
+    
+    result = agent.execute(PRODUCT)
+    
+    assert agent.format_instructions is get_format_instructions(Product)
+    assert result["price"] == 699
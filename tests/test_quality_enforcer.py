@@ -141,4 +141,14 @@ def test_comparison_quality_accepts_valid_comparison():
     
     valid = {"price_difference": 100, "stronger_formulation": "Product A"}
     
-    assert not enforcer.detect_low_quality_comparison(valid)
\ No newline at end of file
+    assert not enforcer.detect_low_quality_comparison(valid)
+
+def test_check_question_rejects_schema_duplicate_and_low_quality():
+    enforcer = QualityEnforcer()
+    seen = enforcer.duplicate_index()
+    good = {"question": "How should I apply this serum daily?", "answer": "Apply two drops after cleansing in the morning.", "category": "usage"}
+    
+    assert enforcer.check_question(good, seen) is None
+    assert enforcer.check_question(dict(good), seen) == "duplicate"
+    assert enforcer.check_question({**good, "category": "other"}, seen) == "schema"
+    assert enforcer.check_question({"question": "Price", "answer": "Price", "category": "purchase"}, seen) == "low_quality"
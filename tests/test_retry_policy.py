@@ -0,0 +1,136 @@
+import json
+import random
+import pytest
+from pydantic import ValidationError
+from langchain_community.chat_models.fake import FakeListChatModel
+from agents.block_agent import BlockAgent
+from metrics import metrics
+from schemas import Product
+from retry_policy import (
+    RetryBudget,
+    RetryPolicy,
+    classify_error,
+    ERROR_TRANSPORT,
+    ERROR_MALFORMED,
+    ERROR_SCHEMA
+)
+
+VALID_BLOCKS = json.dumps({
+    "benefits": ["Brightening"],
+    "usage_block": "Apply 2-3 drops in the morning",
+    "ingredients_block": ["Vitamin C"],
+    "price_block": {"price": 699, "currency": "INR"}
+})
+
+def make_policy(**kwargs):
+    sleeps = []
+    options = dict(max_attempts=4, base_delay=1.0, max_delay=30, jitter=0, deadline=0, schema_attempts=2)
+    options.update(kwargs)
+    return RetryPolicy(sleep=sleeps.append, rng=random.Random(0), **options), sleeps
+
+def failing(errors, result="ok"):
+    errors = list(errors)
+    def operation(state):
+        if errors:
+            raise errors.pop(0)
+        return result
+    return operation
+
+def test_classify_error():
+    with pytest.raises(ValidationError) as validation_error:
+        Product(name="x")
+    
+    assert classify_error(json.JSONDecodeError("bad", "{", 0)) == ERROR_MALFORMED
+    assert classify_error(validation_error.value) == ERROR_SCHEMA
+    assert classify_error(ValueError("Invalid price format")) == ERROR_SCHEMA
+    assert classify_error(ConnectionError("503 Service Unavailable")) == ERROR_TRANSPORT
+
+def test_transport_errors_back_off_exponentially():
+    policy, sleeps = make_policy()
+    
+    assert policy.call(failing([ConnectionError("503")] * 3), "Test") == "ok"
+    assert sleeps == [1.0, 2.0, 4.0]
+
+def test_backoff_is_capped_and_jittered():
+    policy, _ = make_policy(max_delay=5, jitter=0.5)
+    
+    for attempt in range(1, 8):
+        delay = policy.backoff(attempt, ERROR_TRANSPORT)
+        cap = min(5, 2 ** (attempt - 1))
+        assert cap * 0.5 <= delay <= cap
+
+def test_malformed_json_reprompts_with_feedback_and_no_sleep():
+    policy, sleeps = make_policy()
+    feedback = []
+    
+    def operation(state):
+        feedback.append(state.feedback)
+        if state.attempt == 1:
+            json.loads("{not json")
+        return "ok"
+    
+    assert policy.call(operation, "Test") == "ok"
+    assert sleeps == []
+    assert feedback[0] == ""
+    assert "not valid JSON" in feedback[1]
+
+def test_schema_errors_fail_fast():
+    policy, sleeps = make_policy(schema_attempts=2)
+    calls = []
+    
+    def operation(state):
+        calls.append(state.attempt)
+        raise ValueError("Invalid price format")
+    
+    with pytest.raises(ValueError):
+        policy.call(operation, "Test")
+    assert calls == [1, 2]
+    assert sleeps == []
+
+def test_deadline_stops_retries_before_sleeping_past_it():
+    policy, sleeps = make_policy(base_delay=10, deadline=5)
+    
+    with pytest.raises(ConnectionError):
+        policy.call(failing([ConnectionError("503")] * 3), "Test")
+    assert sleeps == []
+
+def test_retries_are_recorded_in_metrics():
+    metrics.reset()
+    policy, _ = make_policy()
+    
+    policy.call(failing([ConnectionError("503"), json.JSONDecodeError("bad", "{", 0)]), "Test")
+    
+    assert metrics.counter_value("agent_retries_total", agent="Test", kind=ERROR_TRANSPORT) == 1
+    assert metrics.counter_value("agent_retries_total", agent="Test", kind=ERROR_MALFORMED) == 1
+    assert metrics.counter_value("json_parse_failures_total", agent="Test") == 1
+
+def test_agent_reprompt_changes_prompt_after_malformed_reply():
+    llm = FakeListChatModel(responses=["{not json", VALID_BLOCKS])
+    policy, sleeps = make_policy()
+    agent = BlockAgent(llm, retry_policy=policy)
+    prompts = []
+    original_render = agent.renderer.render
+    
+    def recording_render(*args, **kwargs):
+        variables = original_render(*args, **kwargs)
+        prompts.append(agent.prompt.format(**variables))
+        return variables
+    agent.renderer.render = recording_render
+    
+    blocks = agent.execute({"name": "Serum", "price": 699})
+    
+    assert blocks["price_block"]["price"] == 699
+    assert len(prompts) == 2
+    assert prompts[0] != prompts[1]
+    assert "not valid JSON" in prompts[1]
+    assert sleeps == []
+
+def test_shared_budget_caps_retries_across_policies():
+    budget = RetryBudget(2)
+    first, _ = make_policy(budget=budget)
+    second, _ = make_policy(budget=budget)
+    
+    assert first.call(failing([ConnectionError("503"), ConnectionError("503")]), "First") == "ok"
+    with pytest.raises(ConnectionError):
+        second.call(failing([ConnectionError("503")]), "Second")
+    assert budget.remaining == 0
@@ -0,0 +1,82 @@
+import json
+import random
+import pytest
+from quality.quality_enforcer import QualityEnforcer
+from quality.rule_engine import QualityRules
+
+WORDS = ["How", "what", "WHY", "can", "Serum", "skin", "daily", "it", "a", "showcase", "does"]
+
+def make_questions(count, seed=9):
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(count):
+        question = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))) + rng.choice(["", "?"])
+        answer = question.upper() if rng.random() < 0.15 else " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8)))
+        questions.append({"question": question, "answer": answer, "category": rng.choice(["usage", "safety"])})
+    return questions
+
+def test_default_faq_rules_report_the_batch_scores():
+    questions = make_questions(500)
+    
+    reports = QualityRules.load().evaluate("faq", questions, category_field="category")
+    
+    assert [r["score"] for r in reports] == QualityRules.load().score("faq", questions, category_field="category").tolist()
+    assert [r["passed"] for r in reports] == [r["score"] >= 50 for r in reports]
+
+def test_reports_list_fired_rules():
+    reports = QualityRules.load().evaluate("faq", [
+        {"question": "Price", "answer": "price", "category": "purchase"},
+        {"question": "How should I apply this serum?", "answer": "Two drops after cleansing.", "category": "usage"}
+    ])
+    
+    assert reports[0]["fired"] == [
+        "short_question", "short_answer", "few_words", "missing_question_mark", "no_question_word", "answer_repeats_question"
+    ]
+    assert reports[0]["score"] == 0
+    assert reports[1] == {"score": 100, "passed": True, "fired": []}
+
+def test_default_block_and_comparison_rules():
+    rules = QualityRules.load()
+    good_blocks = {"benefits": ["A", "B"], "ingredients_block": ["C"], "usage_block": "Apply twice daily"}
+    
+    assert rules.evaluate("blocks", [good_blocks])[0]["passed"]
+    assert rules.evaluate("blocks", [{}])[0]["fired"] == ["few_benefits", "no_ingredients", "short_usage"]
+    assert rules.evaluate("comparison", [{"price_difference": 0, "stronger_formulation": None}])[0]["fired"] == [
+        "zero_price_difference", "missing_stronger_formulation"
+    ]
+
+def test_category_overrides_tune_rules_without_code(tmp_path):
+    spec = json.loads(open("quality/quality_rules.json").read())
+    spec["categories"] = {
+        "purchase": {
+            "faq": {
+                "pass_score": 90,
+                "rules": {
+                    "short_answer": {"value": 40},
+                    "few_words": {"enabled": False},
+                    "mentions_discount": {"field": "answer", "feature": "contains_any", "arg": ["discount"], "op": "==", "value": True, "penalty": 5}
+                }
+            }
+        }
+    }
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(spec))
+    rules = QualityRules.load(str(path))
+    question = {"question": "What does it cost?", "answer": "699 rupees with a discount", "category": "purchase"}
+    
+    purchase, usage = rules.evaluate("faq", [question, {**question, "category": "usage"}], category_field="category")
+    
+    assert purchase == {"score": 75, "passed": False, "fired": ["short_answer", "mentions_discount"]}
+    assert usage == {"score": 100, "passed": True, "fired": []}
+
+def test_invalid_rules_are_rejected():
+    spec = {"faq": {"rules": [{"name": "bad", "field": "question", "feature": "sentiment", "op": "<", "value": 1}]}, "blocks": {"rules": []}, "comparison": {"rules": []}}
+    
+    with pytest.raises(ValueError):
+        QualityRules(spec)
+
+def test_enforcer_reports_rules_on_scored_questions():
+    scored = QualityEnforcer().score_questions([{"question": "Price", "answer": "Around 699 rupees per bottle", "category": "purchase"}])
+    
+    assert scored[0]["quality_passed"] is False
+    assert scored[0]["quality_rules"] == ["short_question", "few_words", "missing_question_mark", "no_question_word"]
@@ -0,0 +1,69 @@
+import os
+import json
+import pytest
+from pydantic import ValidationError
+from agents.assembly_agent import PRODUCT_FIELDS, FAQ_FIELDS, AssemblyAgent
+from metrics import metrics
+from schemas import FAQOutput, ProductPageOutput
+from template_registry import TemplateRegistry, get_adapter
+
+BLOCKS = {
+    "benefits": ["Brightening", "Evens tone"],
+    "usage_block": "Apply two drops every morning",
+    "ingredients_block": ["Vitamin C"],
+    "price_block": {"price": 699, "currency": "INR"}
+}
+
+def write_template(path, data, mtime=None):
+    path.write_text(json.dumps(data))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+def test_assembles_same_output_as_model_dict(tmp_path):
+    path = tmp_path / "product_template.json"
+    write_template(path, {"name": "", "highlights": [], "usage_block": "", "ingredient_block": [], "pricing": {}, "extra": "kept"})
+    
+    output = TemplateRegistry().assemble(str(path), PRODUCT_FIELDS, ProductPageOutput, {"model": {"name": "Serum"}, "blocks": BLOCKS})
+    
+    expected = ProductPageOutput(
+        name="Serum",
+        highlights=BLOCKS["benefits"],
+        usage_block=BLOCKS["usage_block"],
+        ingredient_block=BLOCKS["ingredients_block"],
+        pricing=BLOCKS["price_block"]
+    ).dict()
+    assert output == expected
+
+def test_templates_are_compiled_once_until_they_change(tmp_path):
+    metrics.reset()
+    registry = TemplateRegistry()
+    path = tmp_path / "faq_template.json"
+    write_template(path, {"faqs": []}, mtime=1_000_000_000)
+    
+    first = registry.get(str(path), FAQ_FIELDS, FAQOutput)
+    assert registry.get(str(path), FAQ_FIELDS, FAQOutput) is first
+    
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert registry.get(str(path), FAQ_FIELDS, FAQOutput) is first
+    
+    write_template(path, {"faqs": [], "title": "FAQ"}, mtime=3_000_000_000)
+    assert registry.get(str(path), FAQ_FIELDS, FAQOutput) is not first
+    
+    assert metrics.counter_value("template_cache_total", result="compiled") == 2
+    assert metrics.counter_value("template_cache_total", result="unchanged") == 1
+    assert metrics.counter_value("template_cache_total", result="hit") == 1
+
+def test_validation_still_enforces_output_schema(tmp_path):
+    path = tmp_path / "faq_template.json"
+    write_template(path, {"faqs": []})
+    
+    with pytest.raises(ValidationError):
+        AssemblyAgent().assemble_faq([], str(path), str(tmp_path / "faq.json"))
+    assert not (tmp_path / "faq.json").exists()
+
+def test_missing_template_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        TemplateRegistry().get(str(tmp_path / "missing.json"), FAQ_FIELDS, FAQOutput)
+
+def test_adapters_are_shared_per_model():
+    assert get_adapter(FAQOutput) is get_adapter(FAQOutput)
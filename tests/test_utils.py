@@ -1,6 +1,6 @@
 import pytest
 import json
-from utils import clean_json_response, parse_json_with_retry, calculate_price_difference
+from utils import clean_json_response, calculate_price_difference
 
 def test_clean_json_response_with_markdown():
     response = "```json\n{\"key\": \"value\"}\n```"
@@ -12,22 +12,6 @@ def test_clean_json_response_plain():
     cleaned = clean_json_response(response)
     assert cleaned == '{"key": "value"}'
 
-def test_parse_json_with_retry_valid():
-    response = '{"name": "Product", "price": 500}'
-    result = parse_json_with_retry(response)
-    assert result["name"] == "Product"
-    assert result["price"] == 500
-
-def test_parse_json_with_retry_with_markdown():
-    response = '```json\n{"name": "Product"}\n```'
-    result = parse_json_with_retry(response)
-    assert result["name"] == "Product"
-
-def test_parse_json_with_retry_invalid():
-    response = 'not json at all'
-    with pytest.raises(ValueError):
-        parse_json_with_retry(response)
-
 def test_calculate_price_difference():
     diff = calculate_price_difference(1000, 800)
     assert diff == 200
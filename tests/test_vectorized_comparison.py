@@ -0,0 +1,98 @@
+import random
+import numpy as np
+from logic.deterministic import (
+    calculate_price_difference,
+    compare_concentrations,
+    determine_better_for_skin_type,
+    validate_ingredient_overlap
+)
+from logic.vectorized_comparison import BETTER_A, BETTER_B, BETTER_NEITHER, ComparisonMatrix
+
+SKIN_TYPES = ["Oily", "Dry", "Combination", "Sensitive"]
+INGREDIENTS = ["Vitamin C", "Niacinamide", "Hyaluronic Acid", "Retinol", "Zinc", " vitamin c ", "Ceramides"]
+
+def make_products(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Product {index}",
+            "concentration": f"{rng.choice([0, 2, 5, 10, 12.5])}% Active",
+            "skin_type": rng.sample(SKIN_TYPES, rng.randint(0, 3)),
+            "ingredients": rng.sample(INGREDIENTS, rng.randint(0, 4)),
+            "price": rng.choice([299, 499, "₹699", 999])
+        }
+        for index in range(count)
+    ]
+
+def test_matches_reference_implementation_for_all_pairs():
+    products = make_products(25)
+    matrix = ComparisonMatrix(products)
+    grid = matrix.compare_all()
+    stronger = {1: "a", -1: "b", 0: "equal"}
+    better = {BETTER_A: "a", BETTER_B: "b", BETTER_NEITHER: "Neither"}
+    
+    for a, product_a in enumerate(products):
+        for b, product_b in enumerate(products):
+            assert stronger[int(grid["stronger"][a, b])] == compare_concentrations(product_a["concentration"], product_b["concentration"])
+            assert grid["price_difference"][a, b] == calculate_price_difference(int(matrix.prices[a]), int(matrix.prices[b]))
+            
+            expected = determine_better_for_skin_type(product_a, product_b, "Oily")
+            winner = better[int(grid["better_for_skin_type"][a, b])]
+            assert {"a": product_a["name"], "b": product_b["name"]}.get(winner, winner) == expected
+            
+            overlap = validate_ingredient_overlap(product_a["ingredients"], product_b["ingredients"])
+            assert np.isclose(grid["overlap_percentage"][a, b], overlap["overlap_percentage"])
+            set_a = {i.lower().strip() for i in product_a["ingredients"]}
+            set_b = {i.lower().strip() for i in product_b["ingredients"]}
+            expected_jaccard = len(set_a & set_b) / len(set_a | set_b) if set_a | set_b else 0.0
+            assert np.isclose(grid["jaccard"][a, b], expected_jaccard)
+
+def test_row_blocks_match_full_grid():
+    matrix = ComparisonMatrix(make_products(30))
+    full = matrix.compare_all()
+    block = matrix.compare_all(rows=[3, 17, 29])
+    
+    for key, values in full.items():
+        assert np.array_equal(block[key], values[[3, 17, 29]])
+
+def test_compare_blocks_cover_the_full_grid():
+    matrix = ComparisonMatrix(make_products(30))
+    full = matrix.compare_all()
+    blocks = list(matrix.compare_blocks(block_size=7))
+    
+    assert [len(rows) for rows, _ in blocks] == [7, 7, 7, 7, 2]
+    for key, values in full.items():
+        assert np.array_equal(np.concatenate([grid[key] for _, grid in blocks]), values)
+
+def test_top_k_similar_excludes_self_and_orders_by_jaccard():
+    matrix = ComparisonMatrix(make_products(40))
+    jaccard, _ = matrix.ingredient_overlap()
+    
+    indices, scores = matrix.top_k_similar(5, block_size=7)
+    
+    assert indices.shape == (40, 5)
+    for row in range(40):
+        assert row not in indices[row]
+        assert np.allclose(scores[row], jaccard[row, indices[row]])
+        assert all(scores[row][i] >= scores[row][i + 1] for i in range(4))
+        others = np.delete(jaccard[row], row)
+        assert np.isclose(scores[row][0], others.max())
+
+def test_comparison_record_matches_schema_fields():
+    products = make_products(2, seed=3)
+    products[0].update(concentration="10%", skin_type=["Oily"], price=699)
+    products[1].update(concentration="5%", skin_type=["Dry"], price=899)
+    
+    record = ComparisonMatrix(products).comparison(0, 1)
+    
+    assert record == {
+        "stronger_formulation": "Product 0",
+        "price_difference": -200,
+        "better_for_oily_skin": "Product 0"
+    }
+
+def test_unknown_skin_type_is_never_suitable():
+    matrix = ComparisonMatrix(make_products(5))
+    
+    assert not matrix.suitable_for("Mature").any()
+    assert (matrix.better_for_skin_type("Mature") == BETTER_NEITHER).all()
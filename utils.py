@@ -1,6 +1,7 @@
+import os
 import json
-import time
 import logging
+import tempfile
 from typing import Any, Dict
 from pathlib import Path
 
@@ -21,24 +22,35 @@ def clean_json_response(response: str) -> str:
         cleaned = cleaned[:-3]
     return cleaned.strip()
 
-def parse_json_with_retry(response: str, max_attempts: int = 3) -> Dict[str, Any]:
-    for attempt in range(max_attempts):
-        try:
-            cleaned = clean_json_response(response)
-            return json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            logger.warning(f"JSON parse attempt {attempt + 1} failed: {e}")
-            if attempt == max_attempts - 1:
-                raise
-            time.sleep(1)
-    raise ValueError("Failed to parse JSON after all attempts")
-
 def calculate_price_difference(price_a: int, price_b: int) -> int:
     return price_a - price_b
 
 def ensure_directory(path: str) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
+def default_file_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+FILE_MODE = default_file_mode()
+
+def write_atomic(filepath: str, payload: bytes, fsync: bool = False) -> None:
+    target = Path(filepath)
+    ensure_directory(target.parent)
+    descriptor, temp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            os.fchmod(f.fileno(), FILE_MODE)
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, target)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
 def load_json_file(filepath: str) -> Dict[str, Any]:
     try:
         with open(filepath, 'r') as f:
@@ -52,9 +64,7 @@ def load_json_file(filepath: str) -> Dict[str, Any]:
 
 def save_json_file(data: Dict[str, Any], filepath: str) -> None:
     try:
-        ensure_directory(Path(filepath).parent)
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+        write_atomic(filepath, json.dumps(data, indent=4).encode("utf-8"))
         logger.info(f"Saved output to {filepath}")
     except Exception as e:
         logger.error(f"Failed to save {filepath}: {e}")